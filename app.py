@@ -1,4 +1,5 @@
 import base64
+from functools import lru_cache
 from pathlib import Path
 
 import streamlit as st
@@ -9,6 +10,18 @@ from src.pages.layout_3d import render_layout_3d_page
 from src.pages.metrics import render_metrics_page
 from src.pages.documentation import render_documentation_page
 from src.pages.about import render_about_page
+from src.components.jobs import record_job_metrics, render_jobs_sidebar
+from src.components.profiler import (
+    current_session_id, profiling_enabled, render_graph_panel, render_memory_panel, render_profiling_panel,
+    session_active
+)
+from src.utils.instrumentation import begin_rerun, end_rerun
+from src.utils.jobs import get_job_runner
+from src.utils.prefetch import foreground_rerun
+from src.utils.result_cache import start_warmup
+from src.utils import memory_profiling
+from src.utils.tracing import export_profile, tracing_enabled
+@lru_cache(maxsize=None)
 def _svg_to_data_uri(file_path: str) -> str:
     svg_path = Path(file_path)
     svg_content = svg_path.read_text(encoding="utf-8")
@@ -26,6 +39,15 @@ st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
 if 'page' not in st.session_state:
     st.session_state.page = 'Home'
 
+# Load the most used configurations from the persistent result cache (once per process)
+start_warmup()
+
+# Developer profiling and trace export (no-op unless HABITAT_PROFILE/?profile=1 or HABITAT_TRACE_FILE)
+show_profile = profiling_enabled()
+begin_rerun(st.session_state.page, show_profile or tracing_enabled())
+if memory_profiling.memory_profiling_requested():
+    memory_profiling.start()
+
 # Header com Logo
 encoded_logo = _svg_to_data_uri("src/logo/AEGIS LOGO BRANCO.svg")
 st.markdown(f"""
@@ -97,24 +119,46 @@ with menu_col7:
 
 st.markdown("---")
 
-# Page routing
-if st.session_state.page == 'Home':
-    render_home_page()
-
-elif st.session_state.page == '2D Layout':
-    render_layout_2d_page()
-
-elif st.session_state.page == '3D Layout':
-    render_layout_3d_page()
-
-elif st.session_state.page == 'NASA Metrics':
-    render_metrics_page()
-
-elif st.session_state.page == 'Documentation':
-    render_documentation_page()
-
-elif st.session_state.page == 'About':
-    render_about_page()
+# Page routing (background prefetching pauses while it runs)
+with foreground_rerun():
+    if st.session_state.page == 'Home':
+        render_home_page()
+
+    elif st.session_state.page == '2D Layout':
+        render_layout_2d_page()
+
+    elif st.session_state.page == '3D Layout':
+        render_layout_3d_page()
+
+    elif st.session_state.page == 'NASA Metrics':
+        render_metrics_page()
+
+    elif st.session_state.page == 'Documentation':
+        render_documentation_page()
+
+    elif st.session_state.page == 'About':
+        render_about_page()
+
+# Background jobs of the session (they keep running across pages)
+render_jobs_sidebar()
+record_job_metrics()
+get_job_runner().prune_owners(session_active)
+
+# Trace export and developer panel (before the footer so they only cover the page)
+rerun_profile = end_rerun()
+memory_report = {}
+if memory_profiling.memory_profiling_requested():
+    memory_profiling.prune_sessions(session_active)
+    memory_report = memory_profiling.take_rerun_report(current_session_id(), st.session_state)
+    if rerun_profile is not None:
+        rerun_profile.counters["memory.traced_bytes"] = memory_report["traced_bytes"]
+        rerun_profile.counters["memory.estimated_session_bytes"] = memory_report["estimated_session_bytes"]
+export_profile(rerun_profile, current_session_id())
+if show_profile:
+    render_profiling_panel(rerun_profile)
+    validator = st.session_state.get("incremental_validator")
+    render_graph_panel(validator.graph if validator is not None else None)
+render_memory_panel(memory_report)
 
 # Footer (on all pages)
 st.markdown("---")
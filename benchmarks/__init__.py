@@ -0,0 +1,3 @@
+"""
+Performance benchmarks for the habitat calculations, validation and visualizations
+"""
@@ -0,0 +1,198 @@
+"""
+Shared timing, result storage and baseline comparison for the benchmark suites
+
+Results are plain JSON documents:
+    {"suite": ..., "environment": {...}, "benchmarks": {name: {stats...}}}
+so they can be diffed, archived by CI and compared against a stored baseline.
+"""
+import json
+import math
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+
+def percentile(samples: Sequence[float], q: float) -> float:
+    """
+    Percentile with linear interpolation between closest ranks.
+
+    Args:
+        samples: Measured values
+        q: Percentile in [0, 100]
+
+    Returns:
+        Interpolated percentile (nan for no samples)
+    """
+    if not samples:
+        return math.nan
+    ordered = sorted(samples)
+    position = (len(ordered) - 1) * q / 100
+    low = math.floor(position)
+    high = math.ceil(position)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def summarize(samples: Sequence[float]) -> Dict[str, float]:
+    """Summary statistics of a list of samples (seconds or any other unit)."""
+    return {
+        "samples": len(samples),
+        "min": min(samples),
+        "mean": statistics.fmean(samples),
+        "median": statistics.median(samples),
+        "p95": percentile(samples, 95),
+        "max": max(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0
+    }
+
+
+def _autorange(func: Callable[[], object], min_time: float) -> int:
+    """Smallest number of calls (1, 2, 5, 10, ...) that runs for at least min_time."""
+    number = 1
+    while True:
+        for factor in (1, 2, 5):
+            loops = number * factor
+            start = time.perf_counter()
+            for _ in range(loops):
+                func()
+            if time.perf_counter() - start >= min_time:
+                return loops
+        number *= 10
+
+
+def time_call(func: Callable[[], object], repeat: int = 7, min_time: float = 0.02) -> Dict[str, float]:
+    """
+    Times a zero-argument callable.
+
+    Each sample runs the callable enough times to last at least min_time and
+    records the mean time per call, so fast functions are not dominated by
+    timer resolution.
+
+    Args:
+        func: Callable to measure
+        repeat: Number of samples
+        min_time: Minimum duration of one sample (seconds)
+
+    Returns:
+        Statistics of the per-call time in seconds, plus loops per sample
+    """
+    loops = _autorange(func, min_time)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        samples.append((time.perf_counter() - start) / loops)
+    stats = summarize(samples)
+    stats["loops"] = loops
+    return stats
+
+
+def environment_info() -> Dict[str, str]:
+    """Interpreter, platform and library versions recorded with the results."""
+    info = {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z")
+    }
+    for module in ("numpy", "plotly", "streamlit"):
+        try:
+            info[module] = __import__(module).__version__
+        except ImportError:
+            info[module] = None
+    return info
+
+
+def write_results(path: Path, suite: str, benchmarks: Dict[str, Dict]) -> Dict:
+    """
+    Writes a results document as JSON.
+
+    Args:
+        path: Output file (parent directories are created)
+        suite: Suite name
+        benchmarks: Statistics per benchmark name
+
+    Returns:
+        The written document
+    """
+    document = {"suite": suite, "environment": environment_info(), "benchmarks": benchmarks}
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(document, indent=2, sort_keys=True), encoding="utf-8")
+    return document
+
+
+def load_results(path: Path) -> Optional[Dict]:
+    """Loads a results document (None if the file does not exist)."""
+    path = Path(path)
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def compare_results(current: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float,
+                    thresholds: Optional[Dict[str, float]] = None,
+                    metric: str = "median") -> List[Dict]:
+    """
+    Compares benchmark statistics against a baseline.
+
+    A benchmark regresses when its metric grows by more than its threshold
+    (relative, e.g. 0.15 = 15 % slower). Benchmarks missing from either side
+    are reported with status "new" or "missing".
+
+    Args:
+        current: Statistics per benchmark name
+        baseline: Baseline statistics per benchmark name
+        threshold: Default relative threshold
+        thresholds: Per-benchmark overrides
+        metric: Statistic to compare
+
+    Returns:
+        One row per benchmark with name, baseline, current, ratio, threshold and status
+        ("ok", "improved", "regression", "new", "missing")
+    """
+    thresholds = thresholds or {}
+    rows = []
+    for name in sorted(set(current) | set(baseline)):
+        limit = thresholds.get(name, threshold)
+        row = {"name": name, "threshold": limit, "baseline": None, "current": None, "ratio": None}
+        if name not in baseline:
+            row.update(current=current[name][metric], status="new")
+        elif name not in current:
+            row.update(baseline=baseline[name][metric], status="missing")
+        else:
+            old, new = baseline[name][metric], current[name][metric]
+            ratio = new / old if old > 0 else math.inf
+            if ratio > 1 + limit:
+                status = "regression"
+            elif ratio < 1 / (1 + limit):
+                status = "improved"
+            else:
+                status = "ok"
+            row.update(baseline=old, current=new, ratio=ratio, status=status)
+        rows.append(row)
+    return rows
+
+
+def format_seconds(value: Optional[float]) -> str:
+    """Human-readable duration (ns/µs/ms/s)."""
+    if value is None or math.isnan(value):
+        return "-"
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("µs", 1e-6)):
+        if value >= scale:
+            return f"{value / scale:.3g} {unit}"
+    return f"{value / 1e-9:.3g} ns"
+
+
+def print_comparison(rows: List[Dict], formatter: Callable[[Optional[float]], str] = format_seconds) -> None:
+    """Prints a comparison table produced by compare_results."""
+    width = max((len(row["name"]) for row in rows), default=10)
+    print(f"{'benchmark':<{width}}  {'baseline':>10}  {'current':>10}  {'ratio':>7}  status")
+    for row in rows:
+        ratio = "-" if row["ratio"] is None else f"{row['ratio']:.2f}x"
+        print(f"{row['name']:<{width}}  {formatter(row['baseline']):>10}  "
+              f"{formatter(row['current']):>10}  {ratio:>7}  {row['status']}")
@@ -0,0 +1,508 @@
+"""
+Local multi-session load test of the Streamlit server
+
+Starts app.py with `streamlit run` (or targets --url) and drives it through
+Streamlit's own websocket protocol, exactly like browser tabs do: every
+simulated session opens /_stcore/stream, renders the initial page and then
+alternates between navigation clicks and configuration changes, pausing for
+an exponentially distributed think time between interactions. Like the
+browser, a change to a widget inside an st.fragment requests a rerun of that
+fragment only.
+
+The load is ramped through the --levels concurrency steps (--duration
+seconds each). Per level the report contains:
+- rerun latency (send -> script finished, as seen by the client) p50/p95/p99
+- websocket traffic per rerun (bytes the server sent for it)
+- throughput (completed reruns per second) and errors
+- server CPU (% of one core) and RSS sampled from /proc over time
+
+The saturation point is the first level where adding sessions no longer
+raises throughput by --min-gain, or where p95 latency exceeds --slo.
+
+Usage:
+    python -m benchmarks.loadtest
+    python -m benchmarks.loadtest --levels 1,4,16,32 --duration 60 --think-mean 3
+    python -m benchmarks.loadtest --url ws://localhost:8501 --levels 8
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+from .harness import percentile, write_results
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+APP_PATH = BENCHMARK_DIR.parent / "app.py"
+DEFAULT_OUTPUT = BENCHMARK_DIR / "results" / "loadtest.json"
+
+PAGES = ["2D Layout", "3D Layout", "NASA Metrics"]
+FINISHED_EARLY_FOR_RERUN = 2  # st.rerun() - the script starts again on the same request
+FINISHED_FRAGMENT_RUN = 3
+
+# Element types whose state the client sends back with every rerun
+WIDGET_TYPES = ("button", "number_input", "slider", "selectbox", "radio", "checkbox")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int, env: Optional[Dict[str, str]] = None, timeout: float = 60) -> subprocess.Popen:
+    """
+    Launches `streamlit run app.py` headless and waits for its health check.
+
+    Args:
+        port: Server port
+        env: Extra environment variables (e.g. HABITAT_TRACE_FILE)
+        timeout: Seconds to wait for the server
+
+    Returns:
+        The server process
+    """
+    process = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", str(APP_PATH),
+         "--server.headless", "true", "--server.port", str(port),
+         "--browser.gatherUsageStats", "false", "--server.fileWatcherType", "none"],
+        cwd=str(APP_PATH.parent),
+        env={**os.environ, **(env or {})},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"streamlit exited with code {process.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as response:
+                if response.status == 200:
+                    return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"streamlit did not answer on port {port} within {timeout:.0f}s")
+
+
+class ProcessSampler(threading.Thread):
+    """
+    Samples CPU and RSS of a process from /proc at a fixed interval.
+
+    CPU is reported as percent of one core over each interval (Linux only;
+    on other platforms the samples stay empty).
+    """
+
+    def __init__(self, pid: int, interval: float = 0.5):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.samples: List[Dict[str, float]] = []
+        self._stop_event = threading.Event()
+        self._ticks = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+        self._origin = time.monotonic()
+
+    def _read(self) -> Optional[Tuple[float, int]]:
+        try:
+            with open(f"/proc/{self.pid}/stat") as handle:
+                fields = handle.read().rsplit(")", 1)[1].split()
+            with open(f"/proc/{self.pid}/status") as handle:
+                rss = next(int(line.split()[1]) * 1024 for line in handle if line.startswith("VmRSS:"))
+        except (OSError, StopIteration, IndexError):
+            return None
+        # utime and stime are fields 14 and 15 of stat (11 and 12 after the command name)
+        return (int(fields[11]) + int(fields[12])) / self._ticks, rss
+
+    def run(self) -> None:
+        previous = self._read()
+        previous_time = time.monotonic()
+        while previous is not None and not self._stop_event.wait(self.interval):
+            current = self._read()
+            now = time.monotonic()
+            if current is None:
+                break
+            self.samples.append({
+                "t": round(now - self._origin, 3),
+                "cpu_percent": round(100 * (current[0] - previous[0]) / (now - previous_time), 1),
+                "rss_bytes": current[1]
+            })
+            previous, previous_time = current, now
+
+    def window(self, start: float, end: float) -> List[Dict[str, float]]:
+        """Samples taken between two time.monotonic() values."""
+        return [s for s in self.samples if start - self._origin <= s["t"] <= end - self._origin]
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+class Session:
+    """
+    One simulated browser tab.
+
+    Keeps the widgets of the last rendered page and sends their full state
+    with every rerun, as the frontend does. Widgets rendered inside a fragment
+    remember its id so that changing them reruns only that fragment.
+    """
+
+    def __init__(self, url: str, timeout: float = 60):
+        self.url = url.rstrip("/") + "/_stcore/stream"
+        self.timeout = timeout
+        self.widgets: Dict[str, Tuple[str, object]] = {}  # key or label -> (element type, proto)
+        self.states: Dict[str, object] = {}  # widget id -> WidgetState set by this session
+        self.fragments: Dict[str, str] = {}  # widget id -> id of the fragment that rendered it
+        self.page = "Home"
+        self.last_bytes = 0  # bytes received for the last rerun
+        self._socket = None
+
+    async def connect(self) -> None:
+        self._socket = await websockets.connect(self.url, subprotocols=["streamlit"], max_size=None)
+
+    async def close(self) -> None:
+        if self._socket is not None:
+            await self._socket.close()
+
+    async def rerun(self, change: Optional[Callable[["Session", object], None]] = None) -> float:
+        """
+        Requests a rerun and waits for the script to finish.
+
+        Args:
+            change: Adds the interaction to the widget states (None = plain rerun)
+
+        Returns:
+            Seconds from sending the request to the final script_finished
+        """
+        triggers = {}
+        before = dict(self.states)
+        if change is not None:
+            change(self, triggers)
+        changed = [widget_id for widget_id, state in {**self.states, **triggers}.items()
+                   if before.get(widget_id) is not state]
+        fragment_ids = {self.fragments.get(widget_id, "") for widget_id in changed}
+        fragment_id = fragment_ids.pop() if len(fragment_ids) == 1 else ""
+        message = BackMsg()
+        message.rerun_script.query_string = ""
+        message.rerun_script.fragment_id = fragment_id
+        for state in {**self.states, **triggers}.values():
+            message.rerun_script.widget_states.widgets.add().CopyFrom(state)
+
+        start = time.perf_counter()
+        await self._socket.send(message.SerializeToString())
+        seen, seen_fragments = {}, {}
+        received = 0
+        while True:
+            raw = await asyncio.wait_for(self._socket.recv(), self.timeout)
+            received += len(raw)
+            forward = ForwardMsg()
+            forward.ParseFromString(raw)
+            kind = forward.WhichOneof("type")
+            if kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+                element = forward.delta.new_element
+                element_type = element.WhichOneof("type")
+                if element_type in WIDGET_TYPES:
+                    proto = getattr(element, element_type)
+                    seen[self._widget_name(proto)] = (element_type, proto)
+                    if forward.delta.fragment_id:
+                        seen_fragments[proto.id] = forward.delta.fragment_id
+            elif kind == "script_finished":
+                if forward.script_finished == FINISHED_EARLY_FOR_RERUN:
+                    seen, seen_fragments = {}, {}
+                    fragment_id = ""  # st.rerun() restarts the whole script
+                    continue
+                if forward.script_finished not in (0, FINISHED_FRAGMENT_RUN):
+                    raise RuntimeError(f"script finished with status {forward.script_finished}")
+                break
+        elapsed = time.perf_counter() - start
+        self.last_bytes = received
+
+        if fragment_id:
+            # Only the fragment was rendered again: keep the widgets of the rest of the page
+            kept = {name: widget for name, widget in self.widgets.items()
+                    if self.fragments.get(widget[1].id) != fragment_id}
+            seen = {**kept, **seen}
+            seen_fragments = {**{widget_id: fragment for widget_id, fragment in self.fragments.items()
+                                 if fragment != fragment_id}, **seen_fragments}
+        self.widgets = seen
+        self.fragments = seen_fragments
+        live_ids = {proto.id for _, proto in seen.values()}
+        self.states = {widget_id: state for widget_id, state in self.states.items() if widget_id in live_ids}
+        return elapsed
+
+    @staticmethod
+    def _widget_name(proto) -> str:
+        # Keyed widget ids end with "-<key>"; unkeyed ones (navigation) end with "-None"
+        key = proto.id.rsplit("-", 1)[-1]
+        return proto.label if key == "None" else key
+
+    def set_state(self, triggers: Dict[str, object], name: str, **value) -> bool:
+        """
+        Sets one widget value (e.g. double_value=8.0).
+
+        Trigger values (button clicks) only apply to the next rerun and go to
+        triggers; other values are kept for the following reruns.
+
+        Returns:
+            False if the widget is not on the current page
+        """
+        if name not in self.widgets:
+            return False
+        _, proto = self.widgets[name]
+        state = WidgetState()
+        state.id = proto.id
+        for field, field_value in value.items():
+            if field.endswith("_array_value"):
+                getattr(state, field).data[:] = field_value
+            else:
+                setattr(state, field, field_value)
+        (triggers if "trigger_value" in value else self.states)[proto.id] = state
+        return True
+
+
+def _navigate(page: str):
+    def change(session: Session, triggers) -> None:
+        session.set_state(triggers, page, trigger_value=True)
+        session.page = page
+    return change
+
+
+def _number(key: str, values: List[float]):
+    def change(session: Session, triggers) -> None:
+        _, proto = session.widgets.get(key, (None, None))
+        value = random.choice(values)
+        if proto is not None and proto.data_type == proto.INT:
+            session.set_state(triggers, key, int_value=int(value))
+        else:
+            session.set_state(triggers, key, double_value=float(value))
+    return change
+
+
+def _slider(key: str, values: List[float]):
+    return lambda session, triggers: session.set_state(triggers, key, double_array_value=[random.choice(values)])
+
+
+def _select(key: str):
+    def change(session: Session, triggers) -> None:
+        _, proto = session.widgets.get(key, (None, None))
+        if proto is not None:
+            session.set_state(triggers, key, string_value=random.choice(list(proto.options)))
+    return change
+
+
+# (weight, interaction) - navigation between the heavy pages plus the edits of the configuration panel
+INTERACTIONS: List[Tuple[float, Callable]] = [(1.0, _navigate(page)) for page in PAGES] + [
+    (2.0, _number("diameter", [4.0, 5.0, 6.0, 8.0, 10.0, 12.0])),
+    (1.5, _number("height", [4.0, 6.0, 8.0, 10.0, 14.0])),
+    (1.5, _slider("crew", [4, 5, 6])),
+    (1.5, _number("duration", [30, 90, 180, 365, 730])),
+    (1.0, _select("gravity")),
+    (1.0, _slider("usable", [0.6, 0.7, 0.8])),
+    (0.5, _select("shape")),
+]
+
+
+async def run_session(url: str, deadline: float, think_mean: float, latencies: List[Tuple[float, float, int]],
+                      errors: List[str], seed: int) -> None:
+    """
+    Plays random interactions until the deadline.
+
+    Args:
+        url: Server base URL (ws://host:port)
+        deadline: time.monotonic() at which the session stops
+        think_mean: Mean think time between interactions (seconds)
+        latencies: Receives (finish time, latency, bytes received) per rerun
+        errors: Receives error descriptions
+        seed: Random seed of the session
+    """
+    rng = random.Random(seed)
+    weights = [weight for weight, _ in INTERACTIONS]
+    session = Session(url)
+    try:
+        await session.connect()
+        latencies.append((time.monotonic(), await session.rerun(), session.last_bytes))
+        latencies.append((time.monotonic(), await session.rerun(_navigate(rng.choice(PAGES))), session.last_bytes))
+        while True:
+            think = rng.expovariate(1 / think_mean) if think_mean > 0 else 0
+            if time.monotonic() + think >= deadline:
+                break
+            await asyncio.sleep(think)
+            _, interaction = rng.choices(INTERACTIONS, weights)[0]
+            latencies.append((time.monotonic(), await session.rerun(interaction), session.last_bytes))
+    except Exception as exc:  # noqa: BLE001 - counted and reported, the level keeps running
+        errors.append(f"{type(exc).__name__}: {exc}")
+    finally:
+        await session.close()
+
+
+async def run_level(url: str, sessions: int, duration: float, think_mean: float,
+                    ramp_up: float, seed: int) -> Tuple[List[Tuple[float, float, int]], List[str], float, float]:
+    """Runs one concurrency level; sessions start spread over ramp_up seconds."""
+    latencies, errors = [], []
+    start = time.monotonic()
+    deadline = start + duration
+
+    async def delayed(index):
+        await asyncio.sleep(ramp_up * index / max(sessions, 1))
+        await run_session(url, deadline, think_mean, latencies, errors, seed + index)
+
+    await asyncio.gather(*(delayed(index) for index in range(sessions)))
+    return latencies, errors, start, time.monotonic()
+
+
+def summarize_level(sessions: int, latencies: List[Tuple[float, float, int]], errors: List[str],
+                    start: float, end: float, samples: List[Dict], ramp_up: float) -> Dict:
+    """Latency, throughput and resource statistics of one level (the ramp-up is excluded)."""
+    steady_runs = [run for run in latencies if run[0] >= start + ramp_up] or latencies
+    steady = [latency for _, latency, _ in steady_runs]
+    traffic = [received for _, _, received in steady_runs]
+    window = max(end - start - ramp_up, 1e-9)
+    steady_count = sum(1 for finished, _, _ in latencies if finished >= start + ramp_up)
+    cpu = [sample["cpu_percent"] for sample in samples]
+    rss = [sample["rss_bytes"] for sample in samples]
+    return {
+        "sessions": sessions,
+        "reruns": len(latencies),
+        "errors": len(errors),
+        "error_samples": sorted(set(errors))[:5],
+        "throughput": steady_count / window,
+        "p50": percentile(steady, 50) if steady else None,
+        "p95": percentile(steady, 95) if steady else None,
+        "p99": percentile(steady, 99) if steady else None,
+        "max": max(steady) if steady else None,
+        "bytes_per_rerun_mean": sum(traffic) / len(traffic) if traffic else None,
+        "bytes_per_rerun_p50": percentile(traffic, 50) if traffic else None,
+        "cpu_percent_mean": sum(cpu) / len(cpu) if cpu else None,
+        "cpu_percent_max": max(cpu) if cpu else None,
+        "rss_bytes_max": max(rss) if rss else None,
+        "timeline": samples
+    }
+
+
+def find_saturation(levels: List[Dict], min_gain: float, slo: float) -> Optional[Dict]:
+    """
+    First level where throughput stops scaling or p95 breaks the SLO.
+
+    Args:
+        levels: Summaries in increasing concurrency order
+        min_gain: Minimum relative throughput gain expected from the next level
+        slo: p95 latency limit in seconds
+
+    Returns:
+        Dictionary with the saturated level, the reason and the last healthy
+        level (None if the ramp never saturated)
+    """
+    previous = None
+    for level in levels:
+        reason = None
+        if level["errors"]:
+            reason = f"{level['errors']} error(s)"
+        elif level["p95"] is not None and level["p95"] > slo:
+            reason = f"p95 {level['p95'] * 1e3:.0f} ms > SLO {slo * 1e3:.0f} ms"
+        elif previous is not None and level["throughput"] < previous["throughput"] * (1 + min_gain):
+            reason = f"throughput +{(level['throughput'] / max(previous['throughput'], 1e-9) - 1) * 100:.0f}%"
+        if reason:
+            return {
+                "sessions": level["sessions"],
+                "reason": reason,
+                "capacity_sessions": previous["sessions"] if previous else None,
+                "capacity_throughput": previous["throughput"] if previous else None
+            }
+        previous = level
+    return None
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Target a running server (ws://host:port) instead of starting one")
+    parser.add_argument("--pid", type=int, help="Server process id for CPU/RSS sampling (with --url)")
+    parser.add_argument("--levels", default="1,2,4,8,16", help="Comma-separated concurrent session counts")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds per level")
+    parser.add_argument("--ramp-up", type=float, default=5, help="Seconds over which a level's sessions start")
+    parser.add_argument("--think-mean", type=float, default=2.0, help="Mean think time between interactions")
+    parser.add_argument("--slo", type=float, default=1.0, help="p95 rerun latency limit in seconds")
+    parser.add_argument("--min-gain", type=float, default=0.10,
+                        help="Relative throughput gain below which a level counts as saturated")
+    parser.add_argument("--sample-interval", type=float, default=0.5, help="CPU/RSS sampling period")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT, help="JSON results file")
+    args = parser.parse_args(argv)
+
+    process = None
+    if args.url:
+        url, pid = args.url, args.pid
+    else:
+        port = _free_port()
+        process = start_server(port)
+        url, pid = f"ws://127.0.0.1:{port}", process.pid
+        print(f"Started streamlit on port {port} (pid {pid})")
+
+    sampler = ProcessSampler(pid, args.sample_interval) if pid else None
+    if sampler:
+        sampler.start()
+
+    levels = []
+    try:
+        print(f"{'sessions':>8} {'reruns':>7} {'rerun/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} "
+              f"{'kB/rerun':>8} {'cpu avg':>8} {'cpu max':>8} {'rss max':>8} {'errors':>6}")
+        for index, sessions in enumerate(int(value) for value in args.levels.split(",")):
+            latencies, errors, start, end = asyncio.run(run_level(
+                url, sessions, args.duration, args.think_mean, min(args.ramp_up, args.duration / 2),
+                args.seed + 1000 * index
+            ))
+            samples = sampler.window(start, end) if sampler else []
+            level = summarize_level(sessions, latencies, errors, start, end, samples,
+                                    min(args.ramp_up, args.duration / 2))
+            levels.append(level)
+
+            def fmt(value, scale=1e3, unit="ms"):
+                return "-" if value is None else f"{value * scale:.0f}{unit}"
+            print(f"{sessions:>8} {level['reruns']:>7} {level['throughput']:>8.2f} {fmt(level['p50']):>8} "
+                  f"{fmt(level['p95']):>8} {fmt(level['p99']):>8} {fmt(level['bytes_per_rerun_mean'], 1e-3, ''):>8} "
+                  f"{fmt(level['cpu_percent_mean'], 1, '%'):>8} "
+                  f"{fmt(level['cpu_percent_max'], 1, '%'):>8} {fmt(level['rss_bytes_max'], 1e-6, 'MB'):>8} "
+                  f"{level['errors']:>6}")
+    finally:
+        if sampler:
+            sampler.stop()
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+
+    saturation = find_saturation(levels, args.min_gain, args.slo)
+    if saturation is None:
+        print("\nNo saturation within the tested levels")
+    else:
+        capacity = saturation["capacity_sessions"]
+        print(f"\nSaturated at {saturation['sessions']} sessions ({saturation['reason']}); "
+              f"last healthy level: {capacity if capacity is not None else 'none'}")
+
+    results = {
+        f"loadtest/{level['sessions']}_sessions": level for level in levels
+    }
+    results["saturation"] = {
+        **(saturation or {}),
+        "slo": args.slo,
+        "min_gain": args.min_gain,
+        "think_mean": args.think_mean,
+        "duration": args.duration
+    }
+    results["timeline"] = sampler.samples if sampler else []
+    write_results(args.output, "loadtest", results)
+    print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
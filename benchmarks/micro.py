@@ -0,0 +1,270 @@
+"""
+Micro-benchmarks for the calculation, validation and figure-building hot paths
+
+Every benchmark runs at several input scales (crew size, mission duration,
+dimensions, number of zones, batch size). Results are written as JSON and,
+when a baseline exists, compared against it; the exit code is 1 if any
+benchmark regressed beyond its threshold.
+
+Usage:
+    python -m benchmarks.micro
+    python -m benchmarks.micro --filter figures --scales small,large
+    python -m benchmarks.micro --save-baseline
+    python -m benchmarks.micro --threshold 0.10 --threshold-for figures.3d_cylinder[large]=0.4
+"""
+import argparse
+import fnmatch
+import sys
+from pathlib import Path
+from typing import Callable, Dict
+
+import numpy as np
+
+from src.config.constants import INCOMPATIBLE_ZONES, ZONE_COLORS, ZONE_MIN_AREA, ZONE_NAMES
+from src.utils.calculations import (
+    allocate_zones,
+    calculate_box_floor_area,
+    calculate_box_volume,
+    calculate_cylinder_floor_area,
+    calculate_cylinder_volume,
+    calculate_nhv,
+)
+from src.utils.nasa_calculations import (
+    calculate_mission_resources,
+    calculate_nhv_per_person,
+    calculate_storage_volume,
+    generate_layout_recommendations,
+)
+from src.utils.rule_engine import evaluate_rules
+from src.utils.validators import (
+    calculate_layout_efficiency,
+    validate_dimensions,
+    validate_environmental_conditions,
+    validate_nasa_standards,
+    validate_zone_incompatibilities,
+)
+from src.visualizations.layout_2d import create_2d_layout_plotly
+from src.visualizations.layout_3d import create_3d_habitat_view
+
+from .harness import compare_results, load_results, print_comparison, time_call, write_results
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+DEFAULT_OUTPUT = BENCHMARK_DIR / "results" / "micro.json"
+DEFAULT_BASELINE = BENCHMARK_DIR / "baseline" / "micro.json"
+DEFAULT_THRESHOLD = 0.15  # 15 % slower median = regression
+
+# Input scales: single-design parameters and batch size for the vectorized paths
+SCALES = {
+    "small": {
+        "crew_size": 2, "duration": 30, "diameter": 4.0, "length": 4.0, "width": 3.0, "height": 3.0,
+        "zones": 2, "batch": 1_000
+    },
+    "medium": {
+        "crew_size": 6, "duration": 365, "diameter": 8.0, "length": 10.0, "width": 6.0, "height": 8.0,
+        "zones": 4, "batch": 100_000
+    },
+    "large": {
+        "crew_size": 12, "duration": 1000, "diameter": 15.0, "length": 20.0, "width": 15.0, "height": 20.0,
+        "zones": 6, "batch": 1_000_000
+    }
+}
+
+# Figure builds allocate many Python objects and are noisier than arithmetic
+GROUP_THRESHOLDS = {
+    "figures": 0.25
+}
+
+
+def _zone_config(scale: Dict) -> Dict[str, float]:
+    return dict(list(ZONE_MIN_AREA.items())[:scale["zones"]])
+
+
+def _calculation_cases(scale: Dict) -> Dict[str, Callable[[], object]]:
+    d, h, l, w = scale["diameter"], scale["height"], scale["length"], scale["width"]
+    crew = scale["crew_size"]
+    zone_config = _zone_config(scale)
+    floor_area = calculate_cylinder_floor_area(d, h)
+
+    rng = np.random.default_rng(0)
+    n = scale["batch"]
+    diameters = rng.uniform(2.0, 15.0, n)
+    heights = rng.uniform(2.0, 20.0, n)
+
+    return {
+        "cylinder_volume": lambda: calculate_cylinder_volume(d, h),
+        "cylinder_floor_area": lambda: calculate_cylinder_floor_area(d, h),
+        "box_volume": lambda: calculate_box_volume(l, w, h),
+        "box_floor_area": lambda: calculate_box_floor_area(l, w),
+        "nhv": lambda: calculate_nhv(calculate_cylinder_volume(d, h), 0.7),
+        "allocate_zones": lambda: allocate_zones(floor_area, crew, zone_config),
+        "cylinder_batch": lambda: calculate_nhv(calculate_cylinder_volume(diameters, heights), 0.7),
+    }
+
+
+def _nasa_calculation_cases(scale: Dict) -> Dict[str, Callable[[], object]]:
+    crew, duration = scale["crew_size"], scale["duration"]
+    return {
+        "nhv_per_person": lambda: calculate_nhv_per_person(duration),
+        "mission_resources": lambda: calculate_mission_resources(crew, duration),
+        "storage_volume": lambda: calculate_storage_volume(crew, duration),
+        "layout_recommendations": lambda: generate_layout_recommendations(crew, duration, "lunar", "rigid"),
+    }
+
+
+def _validator_cases(scale: Dict) -> Dict[str, Callable[[], object]]:
+    crew = scale["crew_size"]
+    zone_config = _zone_config(scale)
+    zones = {zone: {"area": area * crew} for zone, area in zone_config.items()}
+    floor_area = calculate_box_floor_area(scale["length"], scale["width"])
+    nhv_per_person = calculate_nhv(calculate_box_volume(scale["length"], scale["width"], scale["height"])) / crew
+
+    rng = np.random.default_rng(0)
+    n = scale["batch"]
+    batch = {
+        "nhv_per_person": rng.uniform(5.0, 60.0, n),
+        "floor_area_per_person": rng.uniform(2.0, 30.0, n),
+        "min_nhv": np.full(n, calculate_nhv_per_person(scale["duration"])),
+        "min_floor_area": np.full(n, 10.0),
+        "mission_type": np.full(n, "surface"),
+        "ceiling_height": rng.uniform(1.5, 4.0, n),
+    }
+
+    return {
+        "nasa_standards": lambda: validate_nasa_standards(
+            nhv_per_person, floor_area / crew, calculate_nhv_per_person(scale["duration"]), 10, "transit"
+        ),
+        "dimensions": lambda: validate_dimensions(scale["height"], 0.9, (0.8, 2.0)),
+        "environment": lambda: validate_environmental_conditions(22, 45, 3.0, 55, "sleep"),
+        "zone_incompatibilities": lambda: validate_zone_incompatibilities(
+            list(zone_config), list(INCOMPATIBLE_ZONES)
+        ),
+        "layout_efficiency": lambda: calculate_layout_efficiency(zones, floor_area),
+        "rule_engine_batch": lambda: evaluate_rules(batch),
+    }
+
+
+def _figure_cases(scale: Dict) -> Dict[str, Callable[[], object]]:
+    crew = scale["crew_size"]
+    zone_config = _zone_config(scale)
+    cylinder = {"diameter": scale["diameter"], "height": scale["height"]}
+    box = {"length": scale["length"], "width": scale["width"], "height": scale["height"]}
+    cylinder_zones = allocate_zones(calculate_cylinder_floor_area(cylinder["diameter"], cylinder["height"]),
+                                    crew, zone_config)
+    box_area = calculate_box_floor_area(box["length"], box["width"])
+    box_zones = allocate_zones(box_area, crew, zone_config)
+    cylinder_area = calculate_cylinder_floor_area(cylinder["diameter"], cylinder["height"])
+
+    return {
+        "2d_cylinder": lambda: create_2d_layout_plotly(
+            cylinder_zones, cylinder_area, "Cylinder", cylinder, ZONE_COLORS, ZONE_NAMES
+        ),
+        "2d_box": lambda: create_2d_layout_plotly(
+            box_zones, box_area, "Rectangular", box, ZONE_COLORS, ZONE_NAMES
+        ),
+        "3d_cylinder": lambda: create_3d_habitat_view("Cylinder", cylinder, cylinder_zones, ZONE_COLORS, ZONE_NAMES),
+        "3d_box": lambda: create_3d_habitat_view("Rectangular", box, box_zones, ZONE_COLORS, ZONE_NAMES),
+    }
+
+
+BENCHMARK_GROUPS = {
+    "calculations": _calculation_cases,
+    "nasa_calculations": _nasa_calculation_cases,
+    "validators": _validator_cases,
+    "figures": _figure_cases,
+}
+
+
+def collect_benchmarks(scales, pattern: str = "*") -> Dict[str, Callable[[], object]]:
+    """
+    Builds the benchmark callables named "<group>.<case>[<scale>]".
+
+    Args:
+        scales: Names of SCALES to include
+        pattern: fnmatch pattern (or substring) the names must match
+
+    Returns:
+        Callable per benchmark name
+    """
+    if not any(char in pattern for char in "*?["):
+        pattern = f"*{pattern}*"
+    benchmarks = {}
+    for scale_name in scales:
+        for group, factory in BENCHMARK_GROUPS.items():
+            for case, func in factory(SCALES[scale_name]).items():
+                name = f"{group}.{case}[{scale_name}]"
+                if fnmatch.fnmatchcase(name, pattern):
+                    benchmarks[name] = func
+    return benchmarks
+
+
+def _parse_thresholds(overrides) -> Dict[str, float]:
+    thresholds = {}
+    for item in overrides:
+        name, _, value = item.rpartition("=")
+        if not name:
+            raise argparse.ArgumentTypeError(f"Expected NAME=VALUE, got '{item}'")
+        thresholds[name] = float(value)
+    return thresholds
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT, help="JSON results file")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Also store the results as the new baseline")
+    parser.add_argument("--filter", default="*", help="Benchmark name pattern or substring")
+    parser.add_argument("--scales", default=",".join(SCALES), help="Comma-separated scales")
+    parser.add_argument("--repeat", type=int, default=7, help="Samples per benchmark")
+    parser.add_argument("--min-time", type=float, default=0.02, help="Minimum seconds per sample")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Relative median slowdown counted as a regression")
+    parser.add_argument("--threshold-for", action="append", default=[], metavar="NAME=VALUE",
+                        help="Per-benchmark threshold override (repeatable)")
+    args = parser.parse_args(argv)
+
+    scales = [scale.strip() for scale in args.scales.split(",") if scale.strip()]
+    unknown = set(scales) - set(SCALES)
+    if unknown:
+        parser.error(f"Unknown scales: {', '.join(sorted(unknown))}")
+
+    benchmarks = collect_benchmarks(scales, args.filter)
+    if not benchmarks:
+        parser.error(f"No benchmark matches '{args.filter}'")
+
+    results = {}
+    for name, func in benchmarks.items():
+        results[name] = time_call(func, repeat=args.repeat, min_time=args.min_time)
+        print(f"{name:<50} median {results[name]['median'] * 1e6:12.2f} µs")
+
+    write_results(args.output, "micro", results)
+    print(f"\nResults written to {args.output}")
+    if args.save_baseline:
+        write_results(args.baseline, "micro", results)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    baseline = load_results(args.baseline)
+    if baseline is None:
+        print(f"No baseline at {args.baseline} (run with --save-baseline to create one)")
+        return 0
+
+    thresholds = {
+        name: GROUP_THRESHOLDS[name.split(".", 1)[0]]
+        for name in results if name.split(".", 1)[0] in GROUP_THRESHOLDS
+    }
+    thresholds.update(_parse_thresholds(args.threshold_for))
+    # Only compare what was run this time, so filtered runs do not report "missing"
+    reference = {name: stats for name, stats in baseline["benchmarks"].items() if name in results}
+    rows = compare_results(results, reference, args.threshold, thresholds)
+    print()
+    print_comparison(rows)
+
+    regressions = [row["name"] for row in rows if row["status"] == "regression"]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
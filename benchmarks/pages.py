@@ -0,0 +1,234 @@
+"""
+End-to-end page render benchmarks using Streamlit's headless testing API
+
+Each scenario drives app.py through AppTest with scripted widget
+interactions (the same changes a user makes in the configuration panel, or
+clicks on the navigation buttons for routing). Every rerun records:
+- wall time of the full script run
+- Python allocations (tracemalloc peak and retained bytes, measured in a
+  separate pass so tracing does not inflate the timings)
+- number of emitted elements and their serialized payload size
+
+Usage:
+    python -m benchmarks.pages
+    python -m benchmarks.pages --iterations 50 --scenario "NASA Metrics"
+    python -m benchmarks.pages --save-baseline
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from streamlit.testing.v1 import AppTest
+
+from .harness import compare_results, load_results, percentile, print_comparison, summarize, write_results
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+APP_PATH = BENCHMARK_DIR.parent / "app.py"
+DEFAULT_OUTPUT = BENCHMARK_DIR / "results" / "pages.json"
+DEFAULT_BASELINE = BENCHMARK_DIR / "baseline" / "pages.json"
+DEFAULT_THRESHOLD = 0.20  # reruns include Streamlit overhead and are noisier than micro-benchmarks
+
+Step = Tuple[str, Callable[[AppTest], object]]
+
+
+def _click(label: str) -> Callable[[AppTest], object]:
+    return lambda at: next(button for button in at.button if button.label == label).click()
+
+
+# Configuration panel interactions shared by the layout and metrics pages
+CONFIG_STEPS: List[Step] = [
+    ("initial", lambda at: None),
+    ("diameter", lambda at: at.number_input(key="diameter").set_value(8.0)),
+    ("crew", lambda at: at.slider(key="crew").set_value(6)),
+    ("duration", lambda at: at.number_input(key="duration").set_value(365)),
+    ("gravity", lambda at: at.selectbox(key="gravity").set_value("mars")),
+    ("zone_toggle", lambda at: at.checkbox(key="zone_storage").uncheck()),
+    ("usable_factor", lambda at: at.slider(key="usable").set_value(0.8)),
+    ("shape_rectangular", lambda at: at.selectbox(key="shape").set_value("Rectangular")),
+    ("length", lambda at: at.number_input(key="length").set_value(12.0)),
+    ("shape_cylinder", lambda at: at.selectbox(key="shape").set_value("Cylinder")),
+]
+
+# Navigation through app.py (each click triggers st.rerun)
+ROUTING_STEPS: List[Step] = [("initial", lambda at: None)] + [
+    (f"to_{page.lower().replace(' ', '_')}", _click(page))
+    for page in ("2D Layout", "3D Layout", "NASA Metrics", "Documentation", "About", "Home")
+]
+
+# scenario name -> (initial page, steps)
+SCENARIOS: Dict[str, Tuple[str, List[Step]]] = {
+    "2D Layout": ("2D Layout", CONFIG_STEPS),
+    "3D Layout": ("3D Layout", CONFIG_STEPS),
+    "NASA Metrics": ("NASA Metrics", CONFIG_STEPS),
+    "routing": ("Home", ROUTING_STEPS),
+}
+
+
+def _iter_nodes(node):
+    yield node
+    for child in getattr(node, "children", {}).values():
+        yield from _iter_nodes(child)
+
+
+def measure_payload(at: AppTest) -> Dict[str, object]:
+    """
+    Counts the emitted elements and their serialized protobuf size.
+
+    Args:
+        at: AppTest after a run
+
+    Returns:
+        Dictionary with elements, payload_bytes and bytes per element type
+    """
+    by_type = Counter()
+    elements = 0
+    for node in _iter_nodes(at._tree):
+        proto = getattr(node, "proto", None)
+        if proto is None or not hasattr(proto, "ByteSize"):
+            continue
+        elements += 1
+        by_type[getattr(node, "type", type(node).__name__)] += proto.ByteSize()
+    return {"elements": elements, "payload_bytes": sum(by_type.values()), "by_type": dict(by_type)}
+
+
+def _new_app(page: str, timeout: float) -> AppTest:
+    at = AppTest.from_file(str(APP_PATH), default_timeout=timeout)
+    at.session_state.page = page
+    return at
+
+
+def _run(at: AppTest, scenario: str, step: str) -> None:
+    at.run()
+    if at.exception:
+        messages = "; ".join(str(exception.value) for exception in at.exception)
+        raise RuntimeError(f"{scenario}/{step} raised: {messages}")
+
+
+def run_scenario(name: str, iterations: int, alloc_iterations: int, timeout: float = 60) -> Dict[str, Dict]:
+    """
+    Runs one scenario and collects per-rerun measurements.
+
+    Every iteration starts a fresh session and plays all steps. The first
+    iteration is a warm-up (module imports, Plotly validators) and is discarded.
+
+    Args:
+        name: Key of SCENARIOS
+        iterations: Timed iterations
+        alloc_iterations: Iterations traced with tracemalloc
+        timeout: AppTest timeout per run (seconds)
+
+    Returns:
+        Raw samples per step name ("<scenario>/<step>") plus the scenario total
+    """
+    page, steps = SCENARIOS[name]
+    samples = {f"{name}/{step}": {"wall": [], "alloc_peak": [], "alloc_net": [], "payload": None}
+               for step, _ in steps}
+
+    for iteration in range(iterations + 1):
+        at = _new_app(page, timeout)
+        for step, action in steps:
+            action(at)
+            start = time.perf_counter()
+            _run(at, name, step)
+            elapsed = time.perf_counter() - start
+            if iteration > 0:
+                samples[f"{name}/{step}"]["wall"].append(elapsed)
+                if samples[f"{name}/{step}"]["payload"] is None:
+                    samples[f"{name}/{step}"]["payload"] = measure_payload(at)
+
+    for _ in range(alloc_iterations):
+        at = _new_app(page, timeout)
+        tracemalloc.start()
+        try:
+            for step, action in steps:
+                action(at)
+                before, _ = tracemalloc.get_traced_memory()
+                tracemalloc.reset_peak()
+                _run(at, name, step)
+                after, peak = tracemalloc.get_traced_memory()
+                samples[f"{name}/{step}"]["alloc_peak"].append(peak - before)
+                samples[f"{name}/{step}"]["alloc_net"].append(after - before)
+        finally:
+            tracemalloc.stop()
+    return samples
+
+
+def summarize_scenario(name: str, samples: Dict[str, Dict]) -> Dict[str, Dict]:
+    """Turns raw samples into result entries (wall time stats at the top level)."""
+    results = {}
+    all_reruns = []
+    for key, step in samples.items():
+        entry = summarize(step["wall"])
+        entry["p50"] = entry["median"]
+        if step["alloc_peak"]:
+            entry["alloc_peak_bytes"] = summarize(step["alloc_peak"])
+            entry["alloc_net_bytes"] = summarize(step["alloc_net"])
+        entry["elements"] = step["payload"]["elements"]
+        entry["payload_bytes"] = step["payload"]["payload_bytes"]
+        entry["payload_by_type"] = step["payload"]["by_type"]
+        results[key] = entry
+        all_reruns.extend(step["wall"])
+
+    total = summarize(all_reruns)
+    total["p50"] = total["median"]
+    total["p99"] = percentile(all_reruns, 99)
+    results[name] = total
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS),
+                        help="Scenario to run (repeatable, default: all)")
+    parser.add_argument("--iterations", type=int, default=20, help="Timed iterations per scenario")
+    parser.add_argument("--alloc-iterations", type=int, default=3,
+                        help="Iterations traced with tracemalloc (0 disables allocation tracking)")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT, help="JSON results file")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Also store the results as the new baseline")
+    parser.add_argument("--metric", choices=("p50", "p95"), default="p95", help="Statistic compared to the baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Relative slowdown counted as a regression")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name in args.scenario or list(SCENARIOS):
+        results.update(summarize_scenario(name, run_scenario(name, args.iterations, args.alloc_iterations)))
+
+    print(f"{'rerun':<40} {'p50':>9} {'p95':>9} {'alloc peak':>11} {'payload':>9}")
+    for key, entry in results.items():
+        alloc = entry.get("alloc_peak_bytes", {}).get("median")
+        alloc = "-" if alloc is None else f"{alloc / 1e6:.1f} MB"
+        payload = entry.get("payload_bytes")
+        payload = "-" if payload is None else f"{payload / 1e3:.0f} kB"
+        print(f"{key:<40} {entry['p50'] * 1e3:7.1f}ms {entry['p95'] * 1e3:7.1f}ms {alloc:>11} {payload:>9}")
+
+    write_results(args.output, "pages", results)
+    print(f"\nResults written to {args.output}")
+    if args.save_baseline:
+        write_results(args.baseline, "pages", results)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    baseline = load_results(args.baseline)
+    if baseline is None:
+        print(f"No baseline at {args.baseline} (run with --save-baseline to create one)")
+        return 0
+
+    reference = {name: stats for name, stats in baseline["benchmarks"].items() if name in results}
+    rows = compare_results(results, reference, args.threshold, metric=args.metric)
+    print()
+    print_comparison(rows)
+    regressions = [row["name"] for row in rows if row["status"] == "regression"]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
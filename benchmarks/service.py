@@ -0,0 +1,197 @@
+"""
+Localhost load test of the HTTP evaluation service
+
+Starts `python -m src.service` (or targets --url), keeps --concurrency
+clients sending single-design POST /evaluate requests over keep-alive
+connections for --duration seconds, and reports client-side latency
+percentiles, throughput and the batch sizes the server formed (from
+/stats). Running it with --max-batch 1 gives the unbatched reference.
+
+Usage:
+    python -m benchmarks.service
+    python -m benchmarks.service --concurrency 64 --duration 20
+    python -m benchmarks.service --compare      # batched vs --max-batch 1
+"""
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from .harness import percentile, write_results
+from .loadtest import _free_port
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+DEFAULT_OUTPUT = BENCHMARK_DIR / "results" / "service.json"
+
+
+def random_design(rng: random.Random) -> Dict:
+    """A plausible single design request."""
+    design = {
+        "crew_size": rng.randint(2, 6),
+        "mission_duration": rng.choice([30, 90, 180, 365, 730]),
+        "gravity_env": rng.choice(["microgravity", "lunar", "mars"]),
+        "structure_type": rng.choice(["rigid", "inflatable"]),
+        "height": round(rng.uniform(2.5, 15), 1),
+    }
+    if rng.random() < 0.5:
+        design.update(shape="Cylinder", diameter=round(rng.uniform(3, 12), 1))
+    else:
+        design.update(shape="Rectangular", length=round(rng.uniform(3, 15), 1), width=round(rng.uniform(3, 10), 1))
+    return design
+
+
+class HTTPConnection:
+    """Minimal keep-alive HTTP/1.1 client (JSON bodies with Content-Length only)."""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self._reader = self._writer = None
+
+    async def request(self, method: str, path: str, body: Optional[Dict] = None) -> Tuple[int, Dict]:
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        payload = json.dumps(body).encode() if body is not None else b""
+        self._writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n\r\n".encode() + payload
+        )
+        await self._writer.drain()
+        status_line = await self._reader.readline()
+        headers = {}
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode().partition(":")
+            headers[name.strip().lower()] = value.strip()
+        data = await self._reader.readexactly(int(headers.get("content-length", 0)))
+        return int(status_line.split()[1]), json.loads(data) if data else {}
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+
+async def run_load(url: str, concurrency: int, duration: float, seed: int) -> Dict:
+    """Closed-loop load: every client sends its next request as soon as the previous one returns."""
+    parsed = urlparse(url)
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.monotonic() + duration
+
+    async def client(index):
+        nonlocal errors
+        rng = random.Random(seed + index)
+        connection = HTTPConnection(parsed.hostname, parsed.port)
+        try:
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                status, _ = await connection.request("POST", "/evaluate", random_design(rng))
+                latencies.append(time.perf_counter() - start)
+                errors += status != 200
+        finally:
+            await connection.close()
+
+    start = time.monotonic()
+    await asyncio.gather(*(client(index) for index in range(concurrency)))
+    elapsed = time.monotonic() - start
+
+    stats_connection = HTTPConnection(parsed.hostname, parsed.port)
+    _, server_stats = await stats_connection.request("GET", "/stats")
+    await stats_connection.close()
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": len(latencies) / elapsed,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "mean_batch_size": server_stats.get("batchers", {}).get("evaluate", {}).get("mean_batch_size"),
+        "server": server_stats
+    }
+
+
+def start_service(port: int, options: List[str]) -> subprocess.Popen:
+    """Starts python -m src.service and waits until /health answers."""
+    process = subprocess.Popen([sys.executable, "-m", "src.service", "--port", str(port), *options],
+                               cwd=str(BENCHMARK_DIR.parent))
+
+    async def wait():
+        for _ in range(100):
+            try:
+                connection = HTTPConnection("127.0.0.1", port)
+                status, _ = await connection.request("GET", "/health")
+                await connection.close()
+                if status == 200:
+                    return
+            except OSError:
+                await asyncio.sleep(0.1)
+        raise RuntimeError("service did not start")
+
+    asyncio.run(wait())
+    return process
+
+
+def run_configuration(label: str, args, options: List[str]) -> Dict:
+    process = None
+    url = args.url
+    if url is None:
+        port = _free_port()
+        process = start_service(port, options)
+        url = f"http://127.0.0.1:{port}"
+    try:
+        asyncio.run(run_load(url, args.concurrency, min(args.warmup, args.duration), args.seed))
+        result = asyncio.run(run_load(url, args.concurrency, args.duration, args.seed + 1))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+    result["label"] = label
+    print(f"{label:<12} {result['requests']:>8} {result['throughput']:>9.0f}/s {result['p50'] * 1e3:>8.1f}ms "
+          f"{result['p95'] * 1e3:>8.1f}ms {result['p99'] * 1e3:>8.1f}ms {result['mean_batch_size'] or 0:>8.1f} "
+          f"{result['errors']:>6}")
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Target a running service instead of starting one")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent clients")
+    parser.add_argument("--duration", type=float, default=10, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=2, help="Unmeasured seconds before the run")
+    parser.add_argument("--workers", type=int, default=4, help="Service evaluation threads")
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    parser.add_argument("--compare", action="store_true", help="Also run without batching (--max-batch 1)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT, help="JSON results file")
+    args = parser.parse_args(argv)
+
+    options = ["--workers", str(args.workers), "--max-wait-ms", str(args.max_wait_ms)]
+    configurations = [("batched", options + ["--max-batch", str(args.max_batch)])]
+    if args.compare and args.url is None:
+        configurations.append(("unbatched", options + ["--max-batch", "1"]))
+
+    print(f"{'config':<12} {'requests':>8} {'throughput':>11} {'p50':>10} {'p95':>10} {'p99':>10} "
+          f"{'batch':>8} {'errors':>6}")
+    results = {}
+    for label, configuration_options in configurations:
+        result = run_configuration(label, args, configuration_options)
+        results[f"service/{label}"] = result
+
+    write_results(args.output, "service", results)
+    print(f"\nResults written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""
+Offline latency analysis of exported NDJSON traces
+
+Reads the files written by src/utils/tracing.py (including rotated backups)
+and aggregates p50/p95/p99 per page and stage, per page rerun and
+optionally per span name.
+
+Usage:
+    python -m benchmarks.trace_report traces/habitat.ndjson*
+    python -m benchmarks.trace_report traces/*.ndjson* --by-span --json report.json
+"""
+import argparse
+import glob
+import json
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, Iterator
+
+from .harness import percentile
+
+
+def iter_records(paths: Iterable[str]) -> Iterator[Dict]:
+    """Yields the records of NDJSON files (glob patterns allowed, bad lines skipped)."""
+    for pattern in paths:
+        for path in sorted(glob.glob(pattern)) or [pattern]:
+            with open(path, encoding="utf-8") as handle:
+                for line in handle:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+
+
+def _stats(values):
+    return {
+        "count": len(values),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values)
+    }
+
+
+def aggregate(records: Iterable[Dict], by_span: bool = False) -> Dict[str, Dict]:
+    """
+    Aggregates span durations.
+
+    Stage totals come from the root "rerun" records (outermost spans per
+    stage), so nested spans are not counted twice.
+
+    Args:
+        records: Trace records
+        by_span: Also aggregate per span name
+
+    Returns:
+        Dictionary with "reruns" (per page), "stages" (per page/stage),
+        "spans" (per page/span, when requested), "payload_bytes" and "sessions"
+    """
+    reruns = defaultdict(list)
+    stages = defaultdict(list)
+    spans = defaultdict(list)
+    payloads = defaultdict(list)
+    sessions = set()
+
+    for record in records:
+        page = record.get("page") or "?"
+        if record.get("kind") == "rerun":
+            reruns[page].append(record["duration_ms"])
+            sessions.add(record.get("session_id"))
+            for stage, duration in record.get("stage_ms", {}).items():
+                stages[(page, stage)].append(duration)
+        elif record.get("kind") == "span":
+            if by_span:
+                spans[(page, record["name"])].append(record["duration_ms"])
+            if record.get("payload_bytes") is not None:
+                payloads[(page, record["name"])].append(record["payload_bytes"])
+
+    return {
+        "sessions": len(sessions),
+        "reruns": {page: _stats(values) for page, values in sorted(reruns.items())},
+        "stages": {f"{page}/{stage}": _stats(values) for (page, stage), values in sorted(stages.items())},
+        "spans": {f"{page}/{name}": _stats(values) for (page, name), values in sorted(spans.items())},
+        "payload_bytes": {f"{page}/{name}": _stats(values) for (page, name), values in sorted(payloads.items())}
+    }
+
+
+def _print_table(title: str, rows: Dict[str, Dict], unit: str) -> None:
+    if not rows:
+        return
+    width = max(len(name) for name in rows)
+    print(f"\n{title}")
+    print(f"{'':<{width}}  {'count':>7}  {'p50':>10}  {'p95':>10}  {'p99':>10}")
+    for name, stats in rows.items():
+        print(f"{name:<{width}}  {stats['count']:>7}  {stats['p50']:>8.1f}{unit}  "
+              f"{stats['p95']:>8.1f}{unit}  {stats['p99']:>8.1f}{unit}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="NDJSON trace files or glob patterns")
+    parser.add_argument("--by-span", action="store_true", help="Also report each span name")
+    parser.add_argument("--json", type=Path, help="Write the aggregated report as JSON")
+    args = parser.parse_args(argv)
+
+    report = aggregate(iter_records(args.paths), by_span=args.by_span)
+    if not report["reruns"]:
+        print("No rerun records found")
+        return 1
+
+    print(f"{sum(s['count'] for s in report['reruns'].values())} reruns from {report['sessions']} session(s)")
+    _print_table("Rerun latency per page", report["reruns"], "ms")
+    _print_table("Latency per page and stage", report["stages"], "ms")
+    _print_table("Latency per span", report["spans"], "ms")
+    if report["payload_bytes"]:
+        kilobytes = {
+            name: {key: (value / 1e3 if key != "count" else value) for key, value in stats.items()}
+            for name, stats in report["payload_bytes"].items()
+        }
+        _print_table("Payload size", kilobytes, "kB")
+
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\nReport written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,24 +1,155 @@
 """
 Reusable configuration panel for each page
 """
+import contextlib
+import time
+
 import streamlit as st
-from ..config.constants import GRAVITY_ENVIRONMENTS, HABITAT_TYPES, NHV_REFERENCE, ZONE_MIN_AREA, ZONE_NAMES
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from ..config.constants import (
+    CONFIG_INPUT_STEPS, GRAVITY_ENVIRONMENTS, HABITAT_TYPES, NHV_REFERENCE, ZONE_MIN_AREA, ZONE_NAMES
+)
+from ..utils.habitat_config import HabitatConfig
+from ..utils.sizing import solve_minimum_dimensions
+
+# Edits closer together than this (live mode) are coalesced into one update
+LIVE_DEBOUNCE_SECONDS = 0.3
+
+
+def _format_dimensions(shape: str, dimensions: dict) -> str:
+    if shape == "Cylinder":
+        return f"Ø{dimensions['diameter']:.1f} m × H{dimensions['height']:.1f} m"
+    return f"{dimensions['length']:.1f} × {dimensions['width']:.1f} × {dimensions['height']:.1f} m"
+
+
+def render_minimum_dimensions(shape: str, structure_type: str, crew_size: int, mission_duration: int,
+                              gravity_env: str, usable_factor: float, dimensions: dict):
+    """
+    Shows the smallest compliant dimensions for the current mission,
+    with all dimensions free and with each current dimension kept.
+    """
+    names = ["diameter", "height"] if shape == "Cylinder" else ["length", "width", "height"]
+    solve = lambda fixed: solve_minimum_dimensions(
+        crew_size, mission_duration, gravity_env, shape, structure_type,
+        usable_factor, fixed=fixed, step=0.5
+    )
+    
+    free = solve(None)
+    lines = []
+    if free["feasible"]:
+        lines.append(f"Smallest compliant habitat: **{_format_dimensions(shape, free['dimensions'])}**")
+    else:
+        lines.append(f"No compliant habitat fits the launch envelope ({'; '.join(free['issues'])})")
+    
+    for name in names:
+        kept = solve({other: dimensions[other] for other in names if other != name})
+        if kept["feasible"]:
+            lines.append(f"{name.capitalize()} ≥ {kept['dimensions'][name]:.1f} m with the other dimensions as set")
+        else:
+            lines.append(f"{name.capitalize()}: no compliant value with the other dimensions as set ({kept['issues'][0]})")
+    
+    st.caption("  \n".join(lines))
+
 
+def _in_fragment_rerun() -> bool:
+    ctx = get_script_run_ctx()
+    return bool(ctx is not None and ctx.fragment_ids_this_run)
 
-def render_config_panel():
+
+def debounce_live_edits(config: HabitatConfig) -> HabitatConfig:
+    """
+    Coalesces rapid edits (slider drags, repeated +/- clicks) in live mode.
+    
+    An edit arriving less than LIVE_DEBOUNCE_SECONDS after the previous one
+    is not applied yet: the page keeps showing the configuration applied
+    last (its model and charts are already cached) and a small fragment
+    ticks once the window has passed without further edits, rerunning the
+    page once with the latest values. Isolated edits and full reruns are
+    applied at once; nothing ever blocks the script thread.
+    
+    Returns:
+        Configuration to display (config, or the one applied last while edits are pending)
+    """
+    state = st.session_state
+    applied = state.get("_config_applied")
+    now = time.monotonic()
+    if config != state.get("_config_latest"):
+        pending = now - state.get("_config_changed_at", 0.0) < LIVE_DEBOUNCE_SECONDS
+        state["_config_latest"] = config
+        state["_config_changed_at"] = now
+    else:
+        # Another rerun while the latest edit is still waiting for its window
+        pending = config != applied and now - state.get("_config_changed_at", 0.0) < LIVE_DEBOUNCE_SECONDS
+    if applied is not None and pending and _in_fragment_rerun():
+        _render_debounce_tick()
+        st.caption("Applying your edits…")
+        return applied
+    state["_config_applied"] = config
+    return config
+
+
+def _render_debounce_tick():
+    @st.fragment(run_every=LIVE_DEBOUNCE_SECONDS)
+    def tick():
+        state = st.session_state
+        pending = state.get("_config_latest") != state.get("_config_applied")
+        if pending and time.monotonic() - state.get("_config_changed_at", 0.0) >= LIVE_DEBOUNCE_SECONDS:
+            # Fragments cannot rerun their parent: a full rerun applies the edits and drops this tick
+            st.rerun()
+
+    tick()
+
+
+def _steps(name: str) -> dict:
+    """min_value/max_value/step of a stepped input (shared with the prefetcher)"""
+    low, high, step = CONFIG_INPUT_STEPS[name]
+    return {"min_value": low, "max_value": high, "step": step}
+
+
+def _render_shape_select() -> str:
+    return st.selectbox("Habitat Shape", ["Cylinder", "Rectangular"], key="shape")
+
+
+def render_config_panel() -> HabitatConfig:
     """
     Renders the habitat configuration panel.
     
+    In live mode every edit updates the page (rapid edits are debounced);
+    with "Apply changes manually" the inputs sit in a form and the page is
+    recomputed once when the edits are applied.
+    
     Returns:
-        Dictionary with all selected configurations
+        HabitatConfig with all selected configurations
     """
     st.markdown("### Habitat Configuration")
+    form_mode = st.toggle(
+        "Apply changes manually",
+        key="config_form_mode",
+        help="Collect several edits and recompute the page once with the Apply button"
+    )
+    # The shape changes which inputs exist, so in form mode it stays outside the form
+    shape = _render_shape_select() if form_mode else None
+    panel = st.form("config_form", border=False) if form_mode else contextlib.nullcontext()
     
+    with panel:
+        config = _render_config_inputs(shape)
+        if form_mode:
+            st.form_submit_button("Apply changes", type="primary", width="stretch")
+    
+    if not form_mode:
+        config = debounce_live_edits(config)
+    return config
+
+
+def _render_config_inputs(shape=None):
+    """Inputs of the panel (shape=None renders the shape selector too)"""
+    in_form = shape is not None
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown("#### Shape and Structure")
-        shape = st.selectbox("Habitat Shape", ["Cylinder", "Rectangular"], key="shape")
+        if shape is None:
+            shape = _render_shape_select()
         structure_type = st.radio(
             "Structure Type",
             ["rigid", "inflatable"],
@@ -29,7 +160,7 @@ def render_config_panel():
         
     with col2:
         st.markdown("#### Mission Parameters")
-        crew_size = st.slider("Crew Size", min_value=4, max_value=6, value=4, key="crew")
+        crew_size = st.slider("Crew Size", value=4, key="crew", **_steps("crew_size"))
         mission_duration = st.number_input(
             "Mission Duration (days)", 
             min_value=1, 
@@ -51,17 +182,17 @@ def render_config_panel():
     
     if shape == "Cylinder":
         with dim_col1:
-            diameter = st.number_input("Diameter", min_value=2.0, max_value=15.0, value=6.0, step=0.5, key="diameter")
+            diameter = st.number_input("Diameter", value=6.0, key="diameter", **_steps("diameter"))
         with dim_col2:
-            height = st.number_input("Height", min_value=2.0, max_value=20.0, value=10.0, step=0.5, key="height")
+            height = st.number_input("Height", value=10.0, key="height", **_steps("height"))
         dimensions = {"diameter": diameter, "height": height, "length": None, "width": None}
     else:
         with dim_col1:
-            length = st.number_input("Length", min_value=2.0, max_value=20.0, value=10.0, step=0.5, key="length")
+            length = st.number_input("Length", value=10.0, key="length", **_steps("length"))
         with dim_col2:
-            width = st.number_input("Width", min_value=2.0, max_value=15.0, value=6.0, step=0.5, key="width")
+            width = st.number_input("Width", value=6.0, key="width", **_steps("width"))
         with dim_col3:
-            height = st.number_input("Height", min_value=2.0, max_value=20.0, value=4.0, step=0.5, key="height")
+            height = st.number_input("Height", value=4.0, key="height", **_steps("height"))
         dimensions = {"length": length, "width": width, "height": height, "diameter": width}
     
     st.markdown("---")
@@ -78,7 +209,8 @@ def render_config_panel():
                 value=True,
                 key=f"zone_{zone_id}"
             )
-            if include_zone:
+            # Inside a form the checkbox only takes effect on apply, so the input is always shown
+            if include_zone or in_form:
                 area = st.number_input(
                     "m²/person",
                     min_value=0.5,
@@ -87,7 +219,8 @@ def render_config_panel():
                     step=0.5,
                     key=f"area_{zone_id}"
                 )
-                zone_areas[zone_id] = area
+                if include_zone:
+                    zone_areas[zone_id] = area
     
     # Show summary
     if zone_areas:
@@ -102,12 +235,10 @@ def render_config_panel():
     with adv_col1:
         usable_factor = st.slider(
             "Usable Volume Factor", 
-            min_value=0.5, 
-            max_value=0.9, 
             value=0.7, 
-            step=0.05,
             help="Fraction of total volume that is net habitable (NHV)",
-            key="usable"
+            key="usable",
+            **_steps("usable_factor")
         )
     
     with adv_col2:
@@ -118,7 +249,12 @@ def render_config_panel():
         - 365 days: {NHV_REFERENCE[365]} m³/person
         """)
     
-    return {
+    render_minimum_dimensions(
+        shape, structure_type, crew_size, mission_duration,
+        gravity_env, usable_factor, dimensions
+    )
+    
+    return HabitatConfig.from_dict({
         "shape": shape,
         "structure_type": structure_type,
         "dimensions": dimensions,
@@ -127,4 +263,4 @@ def render_config_panel():
         "gravity_env": gravity_env,
         "usable_factor": usable_factor,
         "zone_areas": zone_areas
-    }
+    })
@@ -4,6 +4,7 @@ Componente de exportação de dados
 import streamlit as st
 import json
 from datetime import datetime
+from ..utils.instrumentation import STAGE_EXPORT, span
 
 
 def render_export(habitat_data: dict):
@@ -18,7 +19,7 @@ def render_export(habitat_data: dict):
     
     col1, col2 = st.columns(2)
     
-    with col1:
+    with col1, span("render_export", STAGE_EXPORT) as export_span:
         json_data = json.dumps(habitat_data, indent=2, ensure_ascii=False)
         st.download_button(
             label="Baixar Dados JSON",
@@ -26,6 +27,7 @@ def render_export(habitat_data: dict):
             file_name=f"habitat_layout_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
             mime="application/json"
         )
+        export_span.set(payload_bytes=len(json_data))
     
     with col2:
         st.info("💡 Dica: Use a ferramenta de captura de tela do navegador para salvar as visualizações acima em PNG!")
@@ -0,0 +1,38 @@
+"""
+Fragment helper for the pages
+
+Widgets inside a fragment rerun only the fragment: the page header, the
+explanations, the navigation and the footer in app.py are not executed nor
+sent to the browser again for configuration edits.
+"""
+import functools
+
+import streamlit as st
+from .profiler import current_session_id, profiling_enabled
+from ..utils.instrumentation import begin_rerun, current_profile, end_rerun
+from ..utils.prefetch import foreground_rerun
+from ..utils.tracing import export_profile, tracing_enabled
+
+
+def page_fragment(func):
+    """
+    Decorator turning a page section into an st.fragment.
+
+    Fragment reruns skip app.py, so nobody starts a rerun profile for them:
+    when profiling or tracing is on, the fragment profiles its own rerun and
+    exports the trace (the sidebar panel is refreshed by full reruns only).
+    During a full rerun the section simply joins the page's profile.
+    Fragment reruns also pause the background prefetcher, like full reruns.
+    """
+    @st.fragment
+    @functools.wraps(func)
+    def run(*args, **kwargs):
+        with foreground_rerun():
+            if current_profile() is not None or not (profiling_enabled() or tracing_enabled()):
+                return func(*args, **kwargs)
+            begin_rerun(f"{st.session_state.page} (fragment)", True)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                export_profile(end_rerun(), current_session_id())
+    return run
@@ -0,0 +1,142 @@
+"""
+Background jobs of the session: starting them and polling their progress
+
+The Job handles live in st.session_state.jobs (by name), so a job started on
+one page is still there after reruns and navigation; its progress is
+redrawn by a fragment that reruns on its own every JOB_POLL_SECONDS while
+the job is unfinished.
+"""
+from typing import Callable, Dict, Optional
+
+import streamlit as st
+from .profiler import current_session_id
+from ..utils.instrumentation import count, current_profile
+from ..utils.jobs import Job, JobLimitReached, get_job_runner
+
+JOB_POLL_SECONDS = 1.0
+JOB_STATUS_LABELS = {
+    "queued": "Waiting for a free worker",
+    "running": "Running",
+    "done": "Finished",
+    "cancelled": "Cancelled",
+    "failed": "Failed",
+}
+
+
+def session_jobs() -> Dict[str, Job]:
+    """Job handles of the session by name."""
+    if "jobs" not in st.session_state:
+        st.session_state.jobs = {}
+    return st.session_state.jobs
+
+
+def start_job(name: str, label: str, func: Callable, *args, cost: Optional[float] = None,
+              process: bool = False, **kwargs) -> Job:
+    """
+    Submits a background job and stores its handle under name (replacing a previous one).
+
+    Args:
+        name: Slot of the job in the session (one job per slot)
+        label: Short description shown in the UI
+        func: Job function (see src.utils.jobs.JobRunner.submit)
+        cost: Size of the work (e.g. designs): short jobs of a known kind run as interactive
+
+    Returns:
+        The Job handle
+
+    Raises:
+        JobLimitReached: The job was not admitted (the message says why)
+    """
+    previous = session_jobs().get(name)
+    if previous is not None and not previous.done:
+        get_job_runner().cancel(previous.id)
+    count("jobs.submitted")
+    try:
+        job = get_job_runner().submit(current_session_id(), label, func, *args, cost=cost,
+                                      process=process, **kwargs)
+    except JobLimitReached as exc:
+        count(f"jobs.rejected.{exc.reason}")
+        raise
+    session_jobs()[name] = job
+    return job
+
+
+def record_job_metrics():
+    """Adds the scheduler's slot usage, queue depths and admission counters to the rerun profile."""
+    profile = current_profile()
+    if profile is None:
+        return
+    for name, value in get_job_runner().stats().items():
+        if value:
+            profile.counters[f"jobs.{name}"] = round(value, 3) if isinstance(value, float) else value
+
+
+def job_fraction(job: Job) -> Optional[float]:
+    """Completed fraction from a report with "evaluated" and "total" (None if unknown)."""
+    report = job.progress
+    if job.status == "done":
+        return 1.0
+    if isinstance(report, dict) and report.get("total"):
+        return min(report.get("evaluated", 0) / report["total"], 1.0)
+    return None
+
+
+def _render_status(job: Job):
+    fraction = job_fraction(job)
+    text = f"{job.label} · {JOB_STATUS_LABELS[job.status]} · {job.elapsed:.1f} s"
+    if job.priority == "interactive":
+        text += " · interactive"
+    if fraction is not None:
+        st.progress(fraction, text=f"{text} · {fraction * 100:.0f}%")
+    else:
+        st.caption(text)
+    if job.status == "failed":
+        st.error(job.error)
+
+
+def render_job(name: str, render_result: Callable[[Job], None]):
+    """
+    Shows the status and partial result of the session's job in slot name.
+
+    Args:
+        name: Slot of the job
+        render_result: Draws the job's latest progress report or result
+    """
+    job = session_jobs().get(name)
+    if job is None:
+        return
+
+    polling = not job.done
+
+    @st.fragment(run_every=JOB_POLL_SECONDS if polling else None)
+    def poll():
+        if session_jobs().get(name) is not job:
+            return
+        if polling and job.done:
+            # Registered with run_every: a full rerun registers it again without
+            st.rerun()
+        _render_status(job)
+        if not job.done and st.button("Cancel", key=f"cancel_job_{name}"):
+            get_job_runner().cancel(job.id)
+        if job.progress is not None or job.result is not None:
+            render_result(job)
+
+    poll()
+
+
+def render_jobs_sidebar():
+    """Unfinished jobs of the session in the sidebar (on every page)."""
+    if not any(not job.done for job in session_jobs().values()):
+        return
+
+    @st.fragment(run_every=JOB_POLL_SECONDS)
+    def poll():
+        active = [job for job in session_jobs().values() if not job.done]
+        if not active:
+            st.rerun()
+        st.markdown("#### Background jobs")
+        for job in active:
+            _render_status(job)
+
+    with st.sidebar:
+        poll()
@@ -0,0 +1,135 @@
+"""
+Developer profiling panel (enabled with HABITAT_PROFILE=1 or ?profile=1),
+memory diagnostics panel (HABITAT_MEMPROFILE=1) and trace export hooks for app.py
+"""
+import os
+
+import streamlit as st
+from streamlit import runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from ..utils.instrumentation import RerunProfile, summarize_spans
+
+STAGE_LABELS = {
+    "config": "Config widgets",
+    "compute": "Geometry / metrics",
+    "validation": "Validation",
+    "figure_build": "Figure build",
+    "chart_emit": "Chart emit",
+    "export": "Export"
+}
+
+
+def profiling_enabled() -> bool:
+    """True when the profiling overlay was requested by environment or URL."""
+    return os.environ.get("HABITAT_PROFILE") == "1" or st.query_params.get("profile") == "1"
+
+
+def current_session_id() -> str:
+    """Streamlit session id of the running script (None outside a session)."""
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else None
+
+
+def session_active(session_id: str) -> bool:
+    """True while the Streamlit session exists (its browser tab is connected)."""
+    return runtime.exists() and runtime.Runtime.instance().is_active_session(session_id)
+
+
+def render_profiling_panel(profile: RerunProfile):
+    """
+    Renders the timing breakdown of the current rerun in the sidebar.
+
+    Args:
+        profile: Profile returned by begin_rerun (None = nothing to show)
+    """
+    if profile is None:
+        return
+
+    total = profile.elapsed
+    st.sidebar.markdown("## Rerun Profile")
+    st.sidebar.caption(f"{profile.page} · {total * 1e3:.0f} ms until this panel")
+
+    totals = profile.stage_totals()
+    for stage, seconds in sorted(totals.items(), key=lambda item: -item[1]):
+        st.sidebar.progress(
+            min(seconds / total, 1.0) if total > 0 else 0.0,
+            text=f"{STAGE_LABELS.get(stage, stage)}: {seconds * 1e3:.1f} ms"
+        )
+    other = total - sum(totals.values())
+    st.sidebar.caption(f"Other (layout, markdown, Streamlit): {other * 1e3:.1f} ms")
+
+    caches = profile.cache_stats()
+    if caches:
+        st.sidebar.markdown("#### Caches")
+        for name, stats in caches.items():
+            st.sidebar.caption(f"{name}: {stats['hits']} hit(s), {stats['misses']} miss(es)")
+
+    other_counters = {
+        name: value for name, value in profile.counters.items()
+        if not name.endswith((".calls", ".miss"))
+    }
+    if other_counters:
+        st.sidebar.markdown("#### Counters")
+        for name, value in other_counters.items():
+            st.sidebar.caption(f"{name}: {value}")
+
+    if profile.spans:
+        with st.sidebar.expander("Spans"):
+            st.dataframe(summarize_spans(profile.spans), hide_index=True)
+
+
+def render_graph_panel(graph):
+    """
+    Renders the state of the session's metric graph in the sidebar.
+
+    Args:
+        graph: MetricGraph of the session (None = nothing to show)
+    """
+    if graph is None:
+        return
+    rows = graph.describe()
+    recomputed = set(graph.recomputed)
+    with st.sidebar.expander(f"Metric graph · revision {graph.revision} · {len(recomputed)}/{len(rows)} recomputed"):
+        st.dataframe(rows, hide_index=True)
+
+
+def _format_bytes(value: int) -> str:
+    for unit, scale in (("MB", 1e6), ("kB", 1e3)):
+        if abs(value) >= scale:
+            return f"{value / scale:.1f} {unit}"
+    return f"{value} B"
+
+
+def render_memory_panel(report: dict):
+    """
+    Renders the memory diagnostics of the current rerun in the sidebar.
+
+    Args:
+        report: Report returned by take_rerun_report (empty = nothing to show)
+    """
+    if not report:
+        return
+
+    st.sidebar.markdown("## Memory")
+    st.sidebar.metric(
+        "Estimated per session",
+        _format_bytes(report["estimated_session_bytes"]),
+        help="Session state of this session plus its share of the shared caches"
+    )
+    st.sidebar.caption(
+        f"Traced: {_format_bytes(report['traced_bytes'])} (peak {_format_bytes(report['traced_peak_bytes'])}) · "
+        f"{report['active_sessions']} session(s) · rerun #{report['reruns']}"
+    )
+
+    st.sidebar.markdown("#### By category")
+    for category, size in report["categories"].items():
+        delta = report["category_deltas"].get(category, 0)
+        st.sidebar.caption(f"{category}: {_format_bytes(size)} ({'+' if delta >= 0 else ''}{_format_bytes(delta)})")
+
+    with st.sidebar.expander("Top allocators"):
+        st.dataframe(report["top_allocators"], hide_index=True)
+    with st.sidebar.expander("Session state"):
+        st.dataframe(
+            [{"key": key, "bytes": size} for key, size in report["session_state"].items()],
+            hide_index=True
+        )
@@ -0,0 +1,80 @@
+"""
+Session-scoped incremental validation shared by the habitat pages
+"""
+import streamlit as st
+from ..utils.habitat_config import HabitatConfig
+from ..utils.habitat_model import HabitatModel
+from ..utils.incremental import IncrementalValidator, ValidationState
+from ..utils.instrumentation import count
+from ..utils.prefetch import MODEL_CACHE, get_prefetcher, prefetch_enabled
+from ..utils.result_cache import get_result_cache
+from .profiler import current_session_id
+
+
+def habitat_model(config: HabitatConfig) -> HabitatModel:
+    """
+    Model of the current configuration, shared by every component of the session.
+
+    The model is kept until the configuration changes, so each derived
+    quantity is computed once and reused by the page, its fragments and
+    the following reruns. A new configuration is first looked up in the
+    cache shared by all sessions (filled ahead of time by the prefetcher
+    with the configurations one input step away), then in the persistent
+    result cache shared by all processes; otherwise its metrics and rules
+    come from the session's validator, which only recomputes those
+    affected by the inputs changed since its previous configuration. Each
+    new configuration of the session counts as a use in the persistent
+    cache, which warms new processes with the most used ones.
+
+    Args:
+        config: Configuration returned by render_config_panel
+
+    Returns:
+        HabitatModel of the configuration
+    """
+    model = st.session_state.get("habitat_model")
+    count("habitat_model.calls")
+    if model is not None and model.config == config:
+        return model
+    model = MODEL_CACHE.get(config)
+    count("model_cache.calls")
+    results = get_result_cache()
+    if model is None:
+        count("model_cache.miss")
+        if results is not None:
+            count("result_cache.calls")
+            model = results.load_model(config)
+            if model is None:
+                count("result_cache.miss")
+            else:
+                MODEL_CACHE.put(config, model)
+    if model is None:
+        count("habitat_model.miss")
+        if "incremental_validator" not in st.session_state:
+            st.session_state.incremental_validator = IncrementalValidator()
+        validator = st.session_state.incremental_validator
+        hits, misses = validator.hits, validator.misses
+        model = HabitatModel(config, validator)
+        model.validation  # update the validator now, while it belongs to this configuration
+        count("incremental_validator.calls", validator.hits + validator.misses - hits - misses)
+        count("incremental_validator.miss", validator.misses - misses)
+        MODEL_CACHE.put(config, model)
+    st.session_state.habitat_model = model
+    if results is not None:
+        results.save_model(model)
+    if prefetch_enabled():
+        get_prefetcher().schedule(config, current_session_id())
+    return model
+
+
+def evaluate_config(config: HabitatConfig) -> ValidationState:
+    """
+    Updates the session's validator with the current configuration.
+
+    Args:
+        config: Configuration returned by render_config_panel
+
+    Returns:
+        Derived values and rule statuses
+    """
+    return habitat_model(config).validation
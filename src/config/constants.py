@@ -40,6 +40,36 @@ SLS_MAX_DIAMETER = 8.4  # meters (NASA Space Launch System)
 SLS_MAX_HEIGHT = 27.4  # meters (cargo compartment)
 STARSHIP_MAX_DIAMETER = 9.0  # meters (SpaceX Starship)
 STARSHIP_MAX_HEIGHT = 17.24  # meters (cargo compartment)
+SLS_MAX_PAYLOAD_MASS = 42000  # kg (Block 1B cargo, trans-lunar injection)
+STARSHIP_MAX_PAYLOAD_MASS = 100000  # kg (low Earth orbit, refueled for deep space)
+
+LAUNCH_VEHICLES = {
+    "sls": {
+        "name": "NASA SLS",
+        "max_diameter": SLS_MAX_DIAMETER,
+        "max_height": SLS_MAX_HEIGHT,
+        "max_payload_kg": SLS_MAX_PAYLOAD_MASS
+    },
+    "starship": {
+        "name": "SpaceX Starship",
+        "max_diameter": STARSHIP_MAX_DIAMETER,
+        "max_height": STARSHIP_MAX_HEIGHT,
+        "max_payload_kg": STARSHIP_MAX_PAYLOAD_MASS
+    }
+}
+
+# ========================================
+# CONFIGURATION PANEL INPUTS
+# ========================================
+# (min, max, step) of the stepped inputs of the configuration panel
+CONFIG_INPUT_STEPS = {
+    "crew_size": (4, 6, 1),
+    "diameter": (2.0, 15.0, 0.5),
+    "length": (2.0, 20.0, 0.5),
+    "width": (2.0, 15.0, 0.5),
+    "height": (2.0, 20.0, 0.5),
+    "usable_factor": (0.5, 0.9, 0.05),
+}
 
 # ========================================
 # ERGONOMIC AND ANTHROPOMETRIC DIMENSIONS
@@ -209,6 +239,8 @@ HABITAT_TYPES = {
         "description": "Rigid structure (aluminum/composite)",
         "volume_efficiency": 1.0,
         "mass_per_volume": 150,  # kg/m³
+        "stowed_diameter_ratio": 1.0,  # launched as built
+        "stowed_height_ratio": 1.0,
         "advantages": ["stiffness", "MMOD protection", "equipment mounting"],
         "disadvantages": ["limited volume", "high weight"]
     },
@@ -216,6 +248,8 @@ HABITAT_TYPES = {
         "description": "Inflatable structure (softgoods)",
         "volume_efficiency": 3.5,  # 3-4x larger than rigid
         "mass_per_volume": 40,  # kg/m³
+        "stowed_diameter_ratio": 0.73,  # BEAM: 2.36 m stowed / 3.23 m deployed
+        "stowed_height_ratio": 0.54,  # BEAM: 2.16 m stowed / 4.01 m deployed
         "advantages": ["large volume", "reduced weight", "packaging"],
         "disadvantages": ["sealing complexity", "limited stiffness"]
     }
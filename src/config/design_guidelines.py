@@ -7,6 +7,7 @@ Baseado em:
 - Multi-functionality in Space
 - Internal Layout Assessment of a Lunar Surface Habitat
 """
+from .constants import MIN_CEILING_HEIGHT, MIN_NHV_PER_PERSON
 
 # ========================================
 # MÉTRICAS DE AVALIAÇÃO DE LAYOUT
@@ -304,13 +305,13 @@ DESIGN_VALIDATION_RULES = {
     "critical": [
         {
             "rule": "nhv_per_person",
-            "min_value": 25,
+            "min_value": MIN_NHV_PER_PERSON,
             "description": "Volume habitável líquido mínimo por pessoa",
             "reference": "Defining the Net Habitable Volume"
         },
         {
             "rule": "ceiling_height",
-            "min_value": 2.1,
+            "min_value": MIN_CEILING_HEIGHT,
             "description": "Altura mínima do teto",
             "reference": "Deep Space Habitability Guidelines"
         },
@@ -0,0 +1,145 @@
+"""
+Declarative validation rules for habitat designs
+
+Each rule checks one input column against a minimum, a maximum or both.
+Thresholds are either a constant, the name of another input column
+(per-design threshold) or a lookup {"by": column, "values": {...}, "default": x}.
+Messages are format templates filled only for the rows that are displayed:
+{value} is the checked input, {min}/{max} the thresholds and any other field
+is read from the design's input columns.
+
+Reference: Defining the Net Habitable Volume for Long Duration Exploration Missions,
+Deep Space Habitability Design Guidelines, Human Integration Design Handbook (HIDH)
+"""
+from .constants import (
+    HUMIDITY_MAX,
+    HUMIDITY_MIN,
+    MAX_CO2,
+    MAX_NOISE_SLEEP,
+    MAX_NOISE_WORK,
+    MIN_CEILING_HEIGHT,
+    MIN_CORRIDOR_WIDTH,
+    MIN_DOOR_HEIGHT,
+    MIN_DOOR_WIDTH,
+    TEMP_MAX,
+    TEMP_MIN,
+)
+
+VALIDATION_RULES = [
+    # ========================================
+    # NASA STANDARDS - VOLUME AND AREA
+    # ========================================
+    {
+        "id": "nhv_per_person",
+        "group": "nasa_standards",
+        "input": "nhv_per_person",
+        "min": "min_nhv",
+        "severity": "critical",
+        "message": "NHV per person ({value:.1f} m³) below minimum ({min} m³) for {mission_type} mission",
+        "reference": "Defining the Net Habitable Volume"
+    },
+    {
+        "id": "floor_area_per_person",
+        "group": "nasa_standards",
+        "input": "floor_area_per_person",
+        "min": "min_floor_area",
+        "severity": "critical",
+        "message": "Floor area per person ({value:.1f} m²) below minimum ({min} m²)",
+        "reference": "Human Integration Design Handbook"
+    },
+
+    # ========================================
+    # ERGONOMIC DIMENSIONS
+    # ========================================
+    {
+        "id": "ceiling_height",
+        "group": "dimensions",
+        "input": "ceiling_height",
+        "min": MIN_CEILING_HEIGHT,
+        "severity": "critical",
+        "message": "CRITICAL: Ceiling height ({value:.2f}m) below minimum ({min}m)",
+        "reference": "Deep Space Habitability Guidelines"
+    },
+    {
+        "id": "corridor_width",
+        "group": "dimensions",
+        "input": "corridor_width",
+        "min": MIN_CORRIDOR_WIDTH,
+        "severity": "error",
+        "message": "Corridor width ({value:.2f}m) below minimum ({min}m)",
+        "reference": "HIDH - Translation Paths"
+    },
+    {
+        "id": "door_width",
+        "group": "dimensions",
+        "input": "door_width",
+        "min": MIN_DOOR_WIDTH,
+        "severity": "error",
+        "message": "Door width ({value:.2f}m) below minimum ({min}m)",
+        "reference": "Deep Space Habitability Guidelines"
+    },
+    {
+        "id": "door_height",
+        "group": "dimensions",
+        "input": "door_height",
+        "min": MIN_DOOR_HEIGHT,
+        "severity": "error",
+        "message": "Door height ({value:.2f}m) below minimum ({min}m)",
+        "reference": "Deep Space Habitability Guidelines"
+    },
+
+    # ========================================
+    # ENVIRONMENTAL CONDITIONS
+    # ========================================
+    {
+        "id": "temperature",
+        "group": "environment",
+        "input": "temperature",
+        "min": TEMP_MIN,
+        "max": TEMP_MAX,
+        "severity": "error",
+        "message": "Temperature ({value}°C) outside acceptable range ({min}-{max}°C)",
+        "reference": "Deep Space Habitability Guidelines"
+    },
+    {
+        "id": "humidity",
+        "group": "environment",
+        "input": "humidity",
+        "min": HUMIDITY_MIN,
+        "max": HUMIDITY_MAX,
+        "severity": "error",
+        "message": "Humidity ({value}%) outside acceptable range ({min}-{max}%)",
+        "reference": "Deep Space Habitability Guidelines"
+    },
+    {
+        "id": "co2_level",
+        "group": "environment",
+        "input": "co2_level",
+        "max": MAX_CO2,
+        "severity": "critical",
+        "message": "CRITICAL: CO₂ level ({value} mmHg) exceeds maximum ({max} mmHg)",
+        "reference": "Deep Space Habitability Guidelines"
+    },
+    {
+        "id": "noise_level",
+        "group": "environment",
+        "input": "noise_level",
+        "max": {"by": "zone_type", "values": {"sleep": MAX_NOISE_SLEEP}, "default": MAX_NOISE_WORK},
+        "severity": "error",
+        "message": "Noise level ({value} dB) exceeds maximum for {zone_type} area ({max} dB)",
+        "reference": "Deep Space Habitability Guidelines"
+    },
+
+    # ========================================
+    # LAYOUT
+    # ========================================
+    {
+        "id": "zone_count",
+        "group": "layout",
+        "input": "zone_count",
+        "min": 3,
+        "severity": "warning",
+        "message": "{value} zones (recommended: minimum 3 for basic functionality)",
+        "reference": "Internal Layout Assessment of a Lunar Surface Habitat"
+    }
+]
@@ -0,0 +1,110 @@
+"""
+UI-free core API: geometry, NASA requirements, validation, zone allocation,
+launch feasibility, Pareto analysis and figure building
+
+Batch workers, CLIs and services import this package instead of the
+Streamlit pages and components. Nothing is imported up front: each name is
+resolved from its module on first access (PEP 562), so `import src.core`
+takes about a millisecond and NumPy / Plotly are only loaded by the
+functions that need them (validation, launch and Pareto analysis load
+NumPy; the create_* figure builders load Plotly).
+
+Example:
+    from src import core
+
+    nhv = core.calculate_nhv(core.calculate_cylinder_volume(6.0, 10.0), 0.7)
+    min_nhv = core.calculate_nhv_per_person(180)
+    is_valid, issues = core.validate_nasa_standards(nhv / 4, 12.0, min_nhv, 10.0, "surface")
+"""
+import importlib
+from typing import Dict, List
+
+# public name -> module (relative to the src package)
+_EXPORTS: Dict[str, str] = {
+    # Geometry and zone allocation
+    "calculate_cylinder_volume": "utils.calculations",
+    "calculate_cylinder_floor_area": "utils.calculations",
+    "calculate_box_volume": "utils.calculations",
+    "calculate_box_floor_area": "utils.calculations",
+    "calculate_nhv": "utils.calculations",
+    "allocate_zones": "utils.calculations",
+    # NASA requirements
+    "calculate_nhv_per_person": "utils.nasa_calculations",
+    "calculate_mission_resources": "utils.nasa_calculations",
+    "calculate_storage_volume": "utils.nasa_calculations",
+    "calculate_gravity_adjusted_metrics": "utils.nasa_calculations",
+    "validate_zone_compatibility": "utils.nasa_calculations",
+    "validate_translation_paths": "utils.nasa_calculations",
+    "generate_layout_recommendations": "utils.nasa_calculations",
+    "required_nhv_per_person": "utils.sizing",
+    "solve_minimum_dimensions": "utils.sizing",
+    # Validation
+    "validate_nasa_standards": "utils.validators",
+    "validate_dimensions": "utils.validators",
+    "validate_environmental_conditions": "utils.validators",
+    "validate_zone_incompatibilities": "utils.validators",
+    "validate_privacy_requirements": "utils.validators",
+    "calculate_layout_efficiency": "utils.validators",
+    "check_launch_vehicle_compatibility": "utils.validators",
+    "evaluate_rules": "utils.rule_engine",
+    "RuleResults": "utils.rule_engine",
+    "IncrementalValidator": "utils.incremental",
+    "habitat_inputs": "utils.incremental",
+    "build_habitat_graph": "utils.incremental",
+    "MetricGraph": "utils.metric_graph",
+    # Configuration objects
+    "HabitatConfig": "utils.habitat_config",
+    "CONFIG_DTYPE": "utils.habitat_config",
+    "configs_to_array": "utils.habitat_config",
+    "configs_from_array": "utils.habitat_config",
+    "array_columns": "utils.habitat_config",
+    "HabitatModel": "utils.habitat_model",
+    # Launch feasibility
+    "calculate_structure_mass": "utils.launch",
+    "calculate_launch_envelope": "utils.launch",
+    "check_launch_feasibility": "utils.launch",
+    "estimate_launch_count": "utils.launch",
+    "plan_launch_manifest": "utils.launch",
+    # Pareto analysis
+    "pareto_front": "utils.pareto",
+    "pareto_sweep": "utils.pareto",
+    "evaluate_design_objectives": "utils.pareto",
+    # Batch pipeline (vectorized metrics + validation)
+    "evaluate_columns": "core.pipeline",
+    "evaluate_designs": "core.pipeline",
+    "iter_best_design": "core.optimize",
+    "iter_pareto_front": "core.optimize",
+    "checkpoint_path": "core.checkpoint",
+    "prune_checkpoints": "core.checkpoint",
+    # Figures (Plotly)
+    "create_2d_layout_plotly": "visualizations.layout_2d",
+    "create_3d_habitat_view": "visualizations.layout_3d",
+    "create_pareto_front_plot": "visualizations.pareto",
+}
+
+# Modules exposed as a whole
+_MODULES: Dict[str, str] = {
+    "constants": "config.constants",
+    "validation_rules": "config.validation_rules",
+}
+
+__all__ = sorted(_EXPORTS) + sorted(_MODULES)
+
+
+def _load(relative: str):
+    return importlib.import_module(f"{__name__.rpartition('.')[0]}.{relative}")
+
+
+def __getattr__(name: str):
+    if name in _EXPORTS:
+        value = getattr(_load(_EXPORTS[name]), name)
+    elif name in _MODULES:
+        value = _load(_MODULES[name])
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+
+def __dir__() -> List[str]:
+    return __all__
@@ -0,0 +1,442 @@
+"""
+Batch evaluation of design lists from the command line
+
+Reads designs from CSV, JSON (array of objects) or NDJSON, runs the metrics
+and validation pipeline (src/core/pipeline.py) and writes one result row per
+design as CSV, JSON or NDJSON. Input is streamed in chunks, so memory stays
+constant whatever the file size; with --workers the chunks are parsed,
+evaluated and serialized in worker processes while the main process only
+reads and writes.
+
+Input fields: shape, structure_type, gravity_env, diameter, height, length,
+width, crew_size, mission_duration, usable_factor, optional zone_areas (JSON
+object of m² per person per zone), environment readings (temperature,
+humidity, co2_level, noise_level, zone_type, corridor_width, door_width,
+door_height) and an optional id. Missing values take the defaults of the UI;
+a record without an id gets its line number (CSV, NDJSON) or its position in
+the array from 1 (JSON). CSV records must fit on one line. A record that
+cannot be read (malformed JSON, a value that is not an object, a CSV row
+with too many or too few fields) becomes an invalid result row of its own
+with invalid_input:record among its failed rules.
+
+Usage:
+    python -m src.core.batch designs.csv -o results.csv
+    python -m src.core.batch designs.ndjson -o results.json --workers 4 --messages
+    cat designs.ndjson | python -m src.core.batch - --input-format ndjson --output-format ndjson > out.ndjson
+"""
+import argparse
+import csv
+import itertools
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .pipeline import RESULT_FIELDS, evaluate_columns
+
+FORMATS = ("csv", "json", "ndjson")
+EXTENSIONS = {".csv": "csv", ".json": "json", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+DEFAULT_CHUNK_SIZE = 50_000
+FLOAT_DIGITS = 4
+
+# (input format, CSV header, raw lines or parsed records, lines or records before the chunk)
+Chunk = Tuple[str, Optional[List[str]], list, int]
+
+
+def detect_format(path: str, explicit: Optional[str]) -> str:
+    """Format from --*-format or from the file extension."""
+    if explicit:
+        return explicit
+    for extension, fmt in EXTENSIONS.items():
+        if path.lower().endswith(extension):
+            return fmt
+    raise SystemExit(f"Cannot infer the format of '{path}'; pass --input-format/--output-format")
+
+
+def _iter_json_array(handle, counter: Optional[List[int]] = None, buffer_size: int = 1 << 20) -> Iterator[Dict]:
+    """Yields the objects of a top-level JSON array without loading the whole file."""
+    decoder = json.JSONDecoder()
+    counter = counter if counter is not None else [0]
+
+    def read():
+        text = handle.read(buffer_size)
+        counter[0] += len(text)
+        return text
+
+    buffer = read().lstrip()
+    if not buffer.startswith("["):
+        raise ValueError("JSON input must be an array of design objects")
+    position = 1
+    while True:
+        # Skip separators, then decode in place (no copy of the remaining buffer per record)
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+        if position >= len(buffer):
+            more = read()
+            if not more:
+                raise ValueError("JSON array is not terminated")
+            buffer, position = more, 0
+            continue
+        if buffer[position] == "]":
+            return
+        try:
+            record, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            more = read()
+            if not more:
+                raise
+            buffer = buffer[position:] + more
+            position = 0
+            continue
+        yield record
+        position = end
+
+
+def iter_chunks(handle, fmt: str, chunk_size: int, counter: Optional[List[int]] = None) -> Iterator[Chunk]:
+    """
+    Splits an input stream into chunks of at most chunk_size designs.
+
+    CSV and NDJSON chunks carry the raw lines (parsed by the worker); JSON
+    records are decoded here since array elements are not line-delimited.
+
+    Args:
+        handle: Text stream
+        fmt: "csv", "json" or "ndjson"
+        chunk_size: Designs per chunk
+        counter: One-element list incremented with the characters read
+
+    Yields:
+        Chunks (format, CSV header, lines or records, lines or records before them)
+    """
+    header = None
+    if fmt == "csv":
+        first = handle.readline()
+        header = next(csv.reader([first]), [])
+        if counter is not None:
+            counter[0] += len(first)
+        source = handle
+    elif fmt == "json":
+        source = _iter_json_array(handle, counter)
+    else:
+        source = handle
+
+    start = 0
+    while True:
+        items = list(itertools.islice(source, chunk_size))
+        if not items:
+            return
+        if counter is not None and fmt != "json":
+            counter[0] += sum(map(len, items))
+        yield fmt, header, items, start
+        start += len(items)
+
+
+def parse_chunk(chunk: Chunk) -> Dict[str, list]:
+    """
+    Turns a chunk into input columns for evaluate_columns.
+
+    Records that cannot be read keep their row: the "record" column holds
+    the reason (with the line number) and evaluate_columns reports them as
+    invalid_input:record.
+    """
+    fmt, header, items, start = chunk
+    if fmt == "csv":
+        return _csv_columns(header, items, start)
+    if fmt == "json":
+        return _record_columns(items, range(start + 1, start + 1 + len(items)), "record")
+    lines = [line for line in items if not line.isspace()]
+    if len(lines) == len(items):
+        positions = range(start + 1, start + 1 + len(items))
+    else:
+        positions = [start + 1 + row for row, line in enumerate(items) if not line.isspace()]
+    try:
+        # One decoder call per chunk instead of one per line (about 40% less parsing time)
+        records = json.loads("[" + ",".join(lines) + "]")
+    except ValueError:
+        records = None
+    if records is None or len(records) != len(lines):
+        records = list(map(_decode_line, lines))
+    return _record_columns(records, positions, "line")
+
+
+def _decode_line(line: str):
+    """Record of an NDJSON line, or the decoding error"""
+    try:
+        return json.loads(line)
+    except ValueError as error:
+        return error
+
+
+def _record_columns(records: list, positions: Sequence[int], unit: str) -> Dict[str, list]:
+    """Columns of decoded records (positions: line or record number of each, for ids and errors)"""
+    errors = None
+    if not all(type(record) is dict for record in records):
+        records = list(records)
+        errors = [None] * len(records)
+        for row, record in enumerate(records):
+            if isinstance(record, ValueError):
+                errors[row] = f"{unit} {positions[row]}: {record}"
+            elif not isinstance(record, dict):
+                errors[row] = f"{unit} {positions[row]}: expected a JSON object, got {type(record).__name__}"
+            else:
+                continue
+            records[row] = {}
+    names = set().union(*records) if records else set()
+    columns = {name: [record.get(name) for record in records] for name in names}
+    _number_ids(columns, positions)
+    if errors is not None:
+        columns["record"] = errors
+    return columns
+
+
+def _csv_columns(header: List[str], items: List[str], start: int) -> Dict[str, list]:
+    """Columns of CSV lines (rows with a wrong number of fields are blanked and flagged)"""
+    width = len(header)
+    rows = [row for row in csv.reader(items) if row]
+    errors = None
+    if len(rows) == len(items) and all(len(row) == width for row in rows):
+        positions = range(start + 2, start + 2 + len(rows))  # the header is line 1
+    else:
+        rows, positions, errors = [], [], []
+        for position, row in enumerate(csv.reader(items), start + 2):
+            if not row:
+                continue
+            if len(row) == width:
+                errors.append(None)
+            else:
+                # The fields cannot be matched to the header: the row keeps only its line number
+                errors.append(f"line {position}: {len(row)} fields, expected {width}")
+                row = [""] * width
+            rows.append(row)
+            positions.append(position)
+    columns = {name: list(values) for name, values in zip(header, zip(*rows))} if rows else {}
+    _number_ids(columns, positions)
+    if errors is not None and any(errors):
+        columns["record"] = errors
+    return columns
+
+
+def _number_ids(columns: Dict[str, list], positions: Sequence[int]):
+    """Gives records without an id their line or record number"""
+    ids = columns.get("id")
+    if ids is None:
+        columns["id"] = list(positions)
+    elif not all(ids):
+        columns["id"] = [value if value or value == 0 else position for value, position in zip(ids, positions)]
+
+
+def _csv_text(value) -> str:
+    text = "" if value is None else str(value)
+    if any(char in text for char in ',"\n\r'):
+        return '"' + text.replace('"', '""') + '"'
+    return text
+
+
+def _tokens(values, fmt: str) -> List[str]:
+    """
+    Serialized CSV fields or JSON values of one result column.
+
+    Floats are rounded to FLOAT_DIGITS decimals and formatted in one pass;
+    text values are escaped once per distinct value. This keeps the
+    per-row cost close to a string join, which matters at millions of rows.
+    """
+    json_output = fmt != "csv"
+    if hasattr(values, "dtype") and values.dtype.kind == "f":
+        tokens = list(map("%.12g".__mod__, values.round(FLOAT_DIGITS).tolist()))
+        for row in np.flatnonzero(~np.isfinite(values)).tolist():
+            tokens[row] = "null" if json_output else ""
+        return tokens
+    if hasattr(values, "dtype") and values.dtype.kind == "b":
+        return np.where(values, "true", "false").tolist()
+    values = list(values)
+    kinds = set(map(type, values))
+    if kinds == {int}:
+        return list(map(str, values))
+    if kinds == {str}:
+        joined = "".join(values)
+        if not json_output and not any(char in joined for char in ',"\n\r'):
+            return values
+        if json_output and joined.isprintable() and '"' not in joined and "\\" not in joined:
+            return list(map('"%s"'.__mod__, values))
+    escape = json.dumps if json_output else _csv_text
+    cache = {}
+    tokens = []
+    for value in values:
+        if isinstance(value, list):
+            tokens.append(escape(value) if json_output else _csv_text("; ".join(value)))
+        elif (type(value), value) in cache:
+            tokens.append(cache[type(value), value])
+        else:
+            tokens.append(cache.setdefault((type(value), value), escape(value)))
+    return tokens
+
+
+def format_results(results: Dict[str, object], fmt: str, messages: bool) -> Tuple[int, str]:
+    """
+    Serializes evaluated columns.
+
+    Returns:
+        Tuple (number of rows, text); JSON rows are comma-separated without
+        the surrounding brackets so chunks can be concatenated
+    """
+    fields = list(RESULT_FIELDS) + (["messages"] if messages else [])
+    columns = [_tokens(results[name], fmt) for name in fields]
+    if not columns or not columns[0]:
+        return 0, ""
+    if fmt == "csv":
+        lines = map(",".join, zip(*columns))
+    else:
+        template = "{" + ",".join(f"{json.dumps(name)}:%s" for name in fields) + "}"
+        lines = map(template.__mod__, zip(*columns))
+    separator = ",\n" if fmt == "json" else "\n"
+    text = separator.join(lines)
+    return len(columns[0]), text + ("" if fmt == "json" else "\n")
+
+
+def process_chunk(chunk: Chunk, output_format: str, messages: bool) -> Tuple[int, int, str]:
+    """
+    Parses, evaluates and serializes one chunk (runs in worker processes).
+
+    Returns:
+        Tuple (rows, invalid rows, serialized text)
+    """
+    results = evaluate_columns(parse_chunk(chunk), messages=messages)
+    rows, text = format_results(results, output_format, messages)
+    return rows, int((~results["valid"]).sum()), text
+
+
+class Progress:
+    """Rows, throughput and input volume on stderr, refreshed at most every interval."""
+
+    def __init__(self, enabled: bool, interval: float = 0.5):
+        self.enabled = enabled
+        self.interval = interval
+        self.started = time.perf_counter()
+        self._last = 0.0
+
+    def update(self, rows: int, characters: int, final: bool = False) -> None:
+        now = time.perf_counter()
+        if not self.enabled or (not final and now - self._last < self.interval):
+            return
+        self._last = now
+        elapsed = max(now - self.started, 1e-9)
+        sys.stderr.write(f"\r{rows:,} designs  {rows / elapsed:,.0f}/s  {characters / 1e6:,.1f} MB read"
+                         + ("\n" if final else ""))
+        sys.stderr.flush()
+
+
+def run(source, sink, input_format: str, output_format: str, workers: int = 1,
+        chunk_size: int = DEFAULT_CHUNK_SIZE, messages: bool = False, progress: bool = False) -> Dict[str, float]:
+    """
+    Evaluates every design of source and writes the results to sink.
+
+    Args:
+        source: Input text stream
+        sink: Output text stream
+        input_format: "csv", "json" or "ndjson"
+        output_format: "csv", "json" or "ndjson"
+        workers: Worker processes (1 = evaluate in this process)
+        chunk_size: Designs per chunk
+        messages: Include the messages of failed rules
+        progress: Show progress on stderr
+
+    Returns:
+        Statistics: rows, invalid, seconds, rows_per_second, input/output MB
+    """
+    characters = [0]
+    written = 0
+    rows = invalid = 0
+    meter = Progress(progress)
+    chunks = iter_chunks(source, input_format, chunk_size, characters)
+
+    if output_format == "csv":
+        header = ",".join(list(RESULT_FIELDS) + (["messages"] if messages else [])) + "\n"
+        sink.write(header)
+        written += len(header)
+    elif output_format == "json":
+        sink.write("[\n")
+        written += 2
+
+    def emit(result):
+        nonlocal rows, invalid, written
+        count, failed, text = result
+        if not count:
+            return
+        if output_format == "json" and rows:
+            text = ",\n" + text
+        sink.write(text)
+        written += len(text)
+        rows += count
+        invalid += failed
+        meter.update(rows, characters[0])
+
+    if workers <= 1:
+        for chunk in chunks:
+            emit(process_chunk(chunk, output_format, messages))
+    else:
+        # Bounded window of in-flight chunks keeps memory constant and output in input order
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(pool.submit(process_chunk, chunk, output_format, messages))
+                if len(pending) >= 2 * workers:
+                    emit(pending.popleft().result())
+            while pending:
+                emit(pending.popleft().result())
+
+    if output_format == "json":
+        sink.write("\n]\n")
+    sink.flush()
+    meter.update(rows, characters[0], final=True)
+
+    seconds = time.perf_counter() - meter.started
+    return {
+        "rows": rows,
+        "invalid": invalid,
+        "seconds": seconds,
+        "rows_per_second": rows / seconds if seconds > 0 else 0.0,
+        "input_mb": characters[0] / 1e6,
+        "output_mb": written / 1e6
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="Design file ('-' = stdin)")
+    parser.add_argument("-o", "--output", default="-", help="Result file ('-' = stdout, the default)")
+    parser.add_argument("--input-format", choices=FORMATS, help="Default: from the input extension")
+    parser.add_argument("--output-format", choices=FORMATS, help="Default: from the output extension (ndjson for stdout)")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Designs per chunk")
+    parser.add_argument("--messages", action="store_true", help="Include the messages of failed rules")
+    parser.add_argument("--quiet", action="store_true", help="No progress or summary on stderr")
+    args = parser.parse_args(argv)
+
+    input_format = detect_format(args.input, args.input_format)
+    output_format = args.output_format or ("ndjson" if args.output == "-" else detect_format(args.output, None))
+
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8", newline="")
+    sink = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+    try:
+        stats = run(source, sink, input_format, output_format, workers=args.workers,
+                    chunk_size=args.chunk_size, messages=args.messages,
+                    progress=not args.quiet and sys.stderr.isatty())
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+
+    if not args.quiet:
+        print(f"{stats['rows']:,} designs ({stats['invalid']:,} invalid) in {stats['seconds']:.2f}s: "
+              f"{stats['rows_per_second']:,.0f} designs/s, {stats['input_mb']:.1f} MB in, "
+              f"{stats['output_mb']:.1f} MB out", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
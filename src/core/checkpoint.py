@@ -0,0 +1,219 @@
+"""
+On-disk checkpoints of long sweeps and optimizations
+
+The optimizers of src.core.optimize evaluate a dimension grid chunk by
+chunk. With a checkpoint path they periodically save the index of the next
+chunk, their counters, the best-so-far design or the Pareto front and the
+latest progress report; after a restart they skip the chunks already done
+and continue from that state, so the final result is the same as that of
+an uninterrupted run. A finished run keeps its checkpoint marked complete:
+running it again yields the saved result at once.
+
+Content-addressed checkpoints (checkpoint_path) would pile up, one per
+distinct run, so prune_checkpoints bounds their directory: checkpoints not
+used for CHECKPOINT_MAX_AGE are deleted, then the least recently used ones
+(complete first) until the directory is under CHECKPOINT_MAX_BYTES.
+
+A checkpoint is one .npz file: the JSON metadata (kind, parameters and
+their fingerprint, state) plus the NumPy arrays of the state, written to a
+temporary file, synced and renamed over the previous one, so a crash while
+saving leaves the previous checkpoint intact.
+"""
+import glob
+import hashlib
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+CHECKPOINT_DIR = os.environ.get("HABITAT_CHECKPOINT_DIR", "checkpoints")
+CHECKPOINT_INTERVAL = 1.0  # minimum seconds between two saves of the same run
+CHECKPOINT_VERSION = 1
+CHECKPOINT_MAX_BYTES = int(float(os.environ.get("HABITAT_CHECKPOINT_MB", "256")) * 1024 * 1024)
+CHECKPOINT_MAX_AGE = float(os.environ.get("HABITAT_CHECKPOINT_DAYS", "30")) * 86400  # seconds since last use
+_META_KEY = "__meta__"
+
+
+def _json_default(value: Any):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Cannot store {type(value).__name__} in a checkpoint")
+
+
+def fingerprint(kind: str, params: Dict[str, Any]) -> str:
+    """SHA-256 of the kind and parameters (canonical JSON): identifies the run."""
+    text = json.dumps({"kind": kind, "params": params}, sort_keys=True, default=_json_default)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def checkpoint_path(kind: str, params: Dict[str, Any], directory: Optional[str] = None) -> str:
+    """Content-addressed checkpoint file of a run (the same parameters give the same file)."""
+    return os.path.join(directory or CHECKPOINT_DIR, f"{kind}-{fingerprint(kind, params)[:16]}.npz")
+
+
+def read_checkpoint(path: str) -> Optional[Tuple[Dict[str, Any], Dict[str, np.ndarray]]]:
+    """
+    Loads a checkpoint file.
+
+    Returns:
+        (metadata, arrays), or None if the file does not exist
+
+    Raises:
+        ValueError: The file is not a readable checkpoint of this version
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data[_META_KEY]))
+            arrays = {name: data[name] for name in data.files if name != _META_KEY}
+    except (OSError, KeyError, ValueError) as exc:
+        raise ValueError(f"Unreadable checkpoint {path}: {exc}") from exc
+    if meta.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"Checkpoint {path} has version {meta.get('version')}, expected {CHECKPOINT_VERSION}")
+    return meta, arrays
+
+
+def list_checkpoints(directory: Optional[str] = None) -> List[Tuple[str, Dict[str, Any]]]:
+    """(path, metadata) of the readable checkpoints in a directory, oldest first."""
+    found = []
+    for path in sorted(glob.glob(os.path.join(directory or CHECKPOINT_DIR, "*.npz")), key=os.path.getmtime):
+        try:
+            loaded = read_checkpoint(path)
+        except ValueError:
+            continue
+        if loaded is not None:
+            found.append((path, loaded[0]))
+    return found
+
+
+def prune_checkpoints(directory: Optional[str] = None, max_bytes: int = CHECKPOINT_MAX_BYTES,
+                      max_age: float = CHECKPOINT_MAX_AGE, keep: Sequence[str] = ()) -> int:
+    """
+    Deletes checkpoints to bound a directory (least recently used first, see the module docstring).
+
+    Args:
+        directory: Checkpoint directory (default CHECKPOINT_DIR)
+        max_bytes: Total size of the checkpoints kept
+        max_age: Seconds since the last save or load after which a checkpoint is deleted
+        keep: Paths never deleted (e.g. the run about to use its checkpoint)
+
+    Returns:
+        Checkpoints deleted
+    """
+    kept = {os.path.abspath(path) for path in keep}
+    now = time.time()
+    candidates = []
+    for path, meta in list_checkpoints(directory):
+        if os.path.abspath(path) in kept:
+            continue
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        candidates.append((path, stat.st_size, stat.st_mtime, meta["state"].get("complete", False)))
+    total = sum(size for _, size, _, _ in candidates)
+    total += sum(os.path.getsize(path) for path in kept if os.path.exists(path))
+    removed = 0
+    # Complete runs go first: they can be recomputed, while unfinished ones would lose their progress
+    for path, size, used, complete in sorted(candidates, key=lambda item: (not item[3], item[2])):
+        if now - used <= max_age and total <= max_bytes:
+            continue
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+    return removed
+
+
+class SweepCheckpoint:
+    """
+    Checkpoint of one chunked run.
+
+    Args:
+        path: Checkpoint file
+        kind: Kind of run (key of src.core.optimize.OPTIMIZERS)
+        params: Parameters of the run (JSON-compatible, NumPy arrays allowed)
+        interval: Minimum seconds between two writes (pending state is written by flush)
+    """
+
+    def __init__(self, path: str, kind: str, params: Dict[str, Any], interval: float = CHECKPOINT_INTERVAL):
+        self.path = path
+        self.kind = kind
+        self.params = params
+        self.fingerprint = fingerprint(kind, params)
+        self.interval = interval
+        self.writes = 0
+        self._pending: Optional[Tuple[Dict[str, Any], Dict[str, np.ndarray]]] = None
+        self._last_write = time.perf_counter()
+
+    def load(self) -> Optional[Tuple[Dict[str, Any], Dict[str, np.ndarray]]]:
+        """
+        Saved state of this run.
+
+        Returns:
+            (state, arrays), or None when there is no checkpoint yet
+
+        Raises:
+            ValueError: The file belongs to another run or is unreadable
+        """
+        loaded = read_checkpoint(self.path)
+        if loaded is None:
+            return None
+        meta, arrays = loaded
+        if meta.get("fingerprint") != self.fingerprint:
+            raise ValueError(f"Checkpoint {self.path} was written by another run ({meta.get('kind')})")
+        try:
+            os.utime(self.path)  # used now (see prune_checkpoints)
+        except OSError:
+            pass
+        return meta["state"], arrays
+
+    def save(self, state: Dict[str, Any], arrays: Optional[Dict[str, np.ndarray]] = None,
+             complete: bool = False):
+        """
+        Records the state after a chunk; written now if complete or the interval has passed.
+
+        Args:
+            state: JSON-compatible state (the run's counters, best-so-far, latest report)
+            arrays: NumPy arrays of the state (e.g. the Pareto front)
+            complete: The run has finished
+        """
+        self._pending = ({**state, "complete": complete}, dict(arrays or {}))
+        if complete or time.perf_counter() - self._last_write >= self.interval:
+            self.flush()
+
+    def flush(self):
+        """Writes the pending state, if any."""
+        if self._pending is None:
+            return
+        state, arrays = self._pending
+        meta = {"version": CHECKPOINT_VERSION, "kind": self.kind, "fingerprint": self.fingerprint,
+                "params": self.params, "state": state, "saved": time.time()}
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "wb") as handle:
+            np.savez(handle, **{_META_KEY: np.array(json.dumps(meta, default=_json_default))}, **arrays)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temporary, self.path)
+        self._pending = None
+        self._last_write = time.perf_counter()
+        self.writes += 1
+
+    def remove(self):
+        """Deletes the checkpoint file (e.g. when the run was cancelled for good)."""
+        self._pending = None
+        for path in (self.path, f"{self.path}.tmp"):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
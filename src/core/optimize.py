@@ -0,0 +1,258 @@
+"""
+Incremental dimension optimizers
+
+Each optimizer is a generator over a full-factorial dimension grid evaluated
+chunk by chunk, yielding a progress report after every chunk (designs
+evaluated, rate, best-so-far design or current Pareto front). Consumers can
+stop iterating at any time, which is how the service cancels jobs.
+
+With a checkpoint path, the state after each chunk is saved to disk
+(src/core/checkpoint.py) and a later call with the same arguments resumes
+from the next chunk with the same result as an uninterrupted run. The grid
+search is exhaustive and deterministic: there is no random state to save.
+"""
+import time
+from typing import Any, Dict, Iterator, List, Sequence, Union
+
+import numpy as np
+
+from ..utils.pareto import (
+    OBJECTIVE_MAXIMIZE,
+    OBJECTIVE_NAMES,
+    evaluate_design_objectives,
+    iter_dimension_sweep,
+    pareto_front,
+)
+from .checkpoint import SweepCheckpoint, checkpoint_path, prune_checkpoints
+from .pipeline import DESIGN_DEFAULTS, evaluate_columns
+
+# name -> (result column, maximize)
+OBJECTIVES = {
+    "min_mass": ("structure_mass_kg", False),
+    "min_volume": ("total_volume_m3", False),
+    "max_habitability": ("habitability_score", True),
+    "max_nhv_per_person": ("nhv_per_person_m3", True),
+}
+DEFAULT_CHUNK_SIZE = 20_000
+FRONT_PREVIEW = 50  # front points included in each Pareto progress report
+
+
+def dimension_names(shape: str) -> Sequence[str]:
+    return ("diameter", "height") if shape == "Cylinder" else ("length", "width", "height")
+
+
+def parse_ranges(shape: str, ranges: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """
+    Candidate values per dimension.
+
+    Args:
+        shape: "Cylinder" or "Rectangular"
+        ranges: Per dimension a list of values or {"start", "stop", "step"} (stop included)
+
+    Returns:
+        Float array per dimension of the shape
+    """
+    parsed = {}
+    for name in dimension_names(shape):
+        spec = ranges.get(name)
+        if spec is None:
+            raise ValueError(f"Missing range for '{name}'")
+        if isinstance(spec, dict):
+            start, stop, step = float(spec["start"]), float(spec["stop"]), float(spec.get("step", 0.5))
+            if step <= 0 or stop < start:
+                raise ValueError(f"Invalid range for '{name}'")
+            values = np.arange(start, stop + step / 2, step)
+        else:
+            values = np.asarray(spec, dtype=float)
+        if values.size == 0:
+            raise ValueError(f"Empty range for '{name}'")
+        parsed[name] = values
+    return parsed
+
+
+def grid_size(shape: str, ranges: Dict[str, Any]) -> int:
+    """Number of designs in the grid (validates the ranges)."""
+    return int(np.prod([len(values) for values in parse_ranges(shape, ranges).values()]))
+
+
+def _plain(value: Any) -> Any:
+    """JSON-safe scalar (non-finite floats become None)."""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not np.isfinite(value):
+        return None
+    return value
+
+
+def _progress(started: float, evaluated: int, total: int, iteration: int) -> Dict[str, Any]:
+    elapsed = time.perf_counter() - started
+    return {
+        "iteration": iteration,
+        "evaluated": evaluated,
+        "total": total,
+        "elapsed_s": round(elapsed, 3),
+        "rate_per_s": round(evaluated / elapsed, 1) if elapsed > 0 else None,
+    }
+
+
+def iter_best_design(design: Dict[str, Any], ranges: Dict[str, Any], objective: str = "min_mass",
+                     chunk_size: int = DEFAULT_CHUNK_SIZE,
+                     checkpoint: Union[str, bool, None] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Searches the dimension grid for the best design that passes every rule.
+
+    Args:
+        design: Fixed design fields (shape, crew_size, mission_duration, gravity_env, ...)
+        ranges: Candidate dimensions (see parse_ranges)
+        objective: Key of OBJECTIVES
+        chunk_size: Designs evaluated between progress reports
+        checkpoint: File to save the progress to and resume from (see src/core/checkpoint.py);
+            True for the file of these arguments in CHECKPOINT_DIR (bounded by prune_checkpoints)
+
+    Yields:
+        Progress dicts with "feasible" (compliant designs so far), "best" (the
+        best compliant design with its metrics, None until one is found) and
+        "best_score"; with a checkpoint also "resumed_from" (designs already
+        evaluated when this call started)
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective '{objective}' (choose from {', '.join(OBJECTIVES)})")
+    column, maximize = OBJECTIVES[objective]
+    shape = design.get("shape") or DESIGN_DEFAULTS["shape"]
+    grid = parse_ranges(shape, ranges)
+    total = int(np.prod([len(values) for values in grid.values()]))
+    fixed = {name: value for name, value in design.items() if name not in grid}
+
+    saver = None
+    start_chunk = evaluated = feasible = 0
+    best, best_score, elapsed = None, None, 0.0
+    if checkpoint:
+        params = {"design": design, "ranges": ranges, "objective": objective, "chunk_size": chunk_size}
+        saver = SweepCheckpoint(checkpoint_path("best_design", params) if checkpoint is True else checkpoint,
+                                "best_design", params)
+        if checkpoint is True:
+            # One file per distinct run: keep their directory bounded
+            prune_checkpoints(keep=[saver.path])
+        saved = saver.load()
+        if saved is not None:
+            state = saved[0]
+            if state["complete"]:
+                yield state["report"]
+                return
+            start_chunk, evaluated, feasible = state["next_chunk"], state["evaluated"], state["feasible"]
+            best, best_score, elapsed = state["best"], state["best_score"], state["elapsed_s"]
+    resumed_from = evaluated
+
+    started = time.perf_counter() - elapsed
+    sweep = iter_dimension_sweep(shape, grid, chunk_size, start_chunk)
+    try:
+        for iteration, (_, dims) in enumerate(sweep, start_chunk):
+            size = len(next(iter(dims.values())))
+            columns = {name: [value] * size for name, value in fixed.items()}
+            columns.update(dims)
+            results = evaluate_columns(columns)
+            scores = np.where(results["valid"], results[column], np.nan)
+            evaluated += size
+            feasible += int(results["valid"].sum())
+            if not np.isnan(scores).all():
+                row = int(np.nanargmax(scores) if maximize else np.nanargmin(scores))
+                score = float(scores[row])
+                if best_score is None or (score > best_score if maximize else score < best_score):
+                    best_score = score
+                    best = {name: float(values[row]) for name, values in dims.items()}
+                    best.update({name: _plain(values[row]) for name, values in results.items()
+                                 if name not in ("id", "failed_rules")})
+            report = {**_progress(started, evaluated, total, iteration), "objective": objective,
+                      "feasible": feasible, "best": best, "best_score": best_score}
+            if saver is not None:
+                report["resumed_from"] = resumed_from
+                saver.save({"next_chunk": iteration + 1, "evaluated": evaluated, "feasible": feasible,
+                            "best": best, "best_score": best_score, "elapsed_s": report["elapsed_s"],
+                            "report": report}, complete=evaluated == total)
+            yield report
+    finally:
+        if saver is not None:
+            saver.flush()  # stopped early: keep the progress of the last chunk
+
+
+def iter_pareto_front(design: Dict[str, Any], ranges: Dict[str, Any], chunk_size: int = DEFAULT_CHUNK_SIZE,
+                      checkpoint: Union[str, bool, None] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Builds the (mass, NHV/person, habitability) Pareto front of a dimension grid.
+
+    Every chunk is merged into the running front, so each report holds the
+    front of everything evaluated so far. With a checkpoint, the full front
+    is saved with the progress (see iter_best_design).
+
+    Yields:
+        Progress dicts with "front_size" and "front" (up to FRONT_PREVIEW
+        points sorted by mass, each with its dimensions and objectives)
+    """
+    shape = design.get("shape") or DESIGN_DEFAULTS["shape"]
+    grid = parse_ranges(shape, ranges)
+    names = list(grid)
+    total = int(np.prod([len(values) for values in grid.values()]))
+    options = {
+        "structure_type": design.get("structure_type") or DESIGN_DEFAULTS["structure_type"],
+        "crew_size": design.get("crew_size") or DESIGN_DEFAULTS["crew_size"],
+        "usable_factor": design.get("usable_factor") or DESIGN_DEFAULTS["usable_factor"],
+        "gravity_env": design.get("gravity_env") or DESIGN_DEFAULTS["gravity_env"],
+    }
+
+    saver = None
+    start_chunk = evaluated = 0
+    elapsed = 0.0
+    front_dims = np.zeros((0, len(names)))
+    front_points = np.zeros((0, len(OBJECTIVE_NAMES)))
+    if checkpoint:
+        params = {"design": design, "ranges": ranges, "chunk_size": chunk_size}
+        saver = SweepCheckpoint(checkpoint_path("pareto", params) if checkpoint is True else checkpoint,
+                                "pareto", params)
+        if checkpoint is True:
+            # One file per distinct run: keep their directory bounded
+            prune_checkpoints(keep=[saver.path])
+        saved = saver.load()
+        if saved is not None:
+            state, arrays = saved
+            if state["complete"]:
+                yield state["report"]
+                return
+            start_chunk, evaluated, elapsed = state["next_chunk"], state["evaluated"], state["elapsed_s"]
+            front_dims, front_points = arrays["front_dims"], arrays["front_points"]
+    resumed_from = evaluated
+
+    started = time.perf_counter() - elapsed
+    sweep = iter_dimension_sweep(shape, grid, chunk_size, start_chunk)
+    try:
+        for iteration, (_, dims) in enumerate(sweep, start_chunk):
+            points = evaluate_design_objectives(shape, dims, **options)
+            evaluated += len(points)
+            # Prune the chunk on its own first, then merge with the running front
+            mask = pareto_front(points, OBJECTIVE_MAXIMIZE)
+            candidates = np.vstack([front_points, points[mask]])
+            candidate_dims = np.vstack([front_dims, np.column_stack([dims[name][mask] for name in names])])
+            keep = np.flatnonzero(pareto_front(candidates, OBJECTIVE_MAXIMIZE))
+            order = keep[np.argsort(candidates[keep, 0], kind="stable")]
+            front_points, front_dims = candidates[order], candidate_dims[order]
+
+            preview: List[Dict[str, float]] = [
+                {**dict(zip(names, dim_row)), **dict(zip(OBJECTIVE_NAMES, point_row))}
+                for dim_row, point_row in zip(front_dims[:FRONT_PREVIEW].tolist(), front_points[:FRONT_PREVIEW].tolist())
+            ]
+            report = {**_progress(started, evaluated, total, iteration), "front_size": len(front_points),
+                      "front": preview}
+            if saver is not None:
+                report["resumed_from"] = resumed_from
+                saver.save({"next_chunk": iteration + 1, "evaluated": evaluated, "elapsed_s": report["elapsed_s"],
+                            "report": report}, {"front_dims": front_dims, "front_points": front_points},
+                           complete=evaluated == total)
+            yield report
+    finally:
+        if saver is not None:
+            saver.flush()
+
+
+OPTIMIZERS = {
+    "best_design": iter_best_design,
+    "pareto": iter_pareto_front,
+}
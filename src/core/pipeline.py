@@ -0,0 +1,393 @@
+"""
+Vectorized metrics and validation pipeline for batches of designs
+
+Evaluates many habitat designs at once with the same formulas the pages use
+(calculations.py, nasa_calculations.py, launch.py and the validation rule
+table). Geometry and rules run as NumPy column operations; the scalar
+helpers that only depend on a few categorical inputs (NHV requirement per
+duration and gravity, mission resources per crew and duration) are called
+once per distinct combination and broadcast back to the rows.
+"""
+import json
+import math
+import numbers
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..config.constants import HABITAT_TYPES, MIN_FLOOR_AREA_PER_PERSON, ZONE_MIN_AREA
+from ..utils.calculations import (
+    calculate_box_floor_area,
+    calculate_box_volume,
+    calculate_cylinder_floor_area,
+    calculate_cylinder_volume,
+    calculate_nhv,
+)
+from ..utils.habitat_config import GRAVITY_ENVS, STRUCTURE_TYPES
+from ..utils.launch import calculate_structure_mass
+from ..utils.nasa_calculations import (
+    calculate_gravity_adjusted_metrics,
+    calculate_mission_resources,
+    calculate_storage_volume,
+)
+from ..utils.rule_engine import STATUS_FAIL, evaluate_rules
+from ..utils.sizing import GRAVITY_MISSION_TYPES, required_nhv_per_person
+
+# Input fields of a design (flat records, as in CSV rows) and their defaults
+NUMERIC_FIELDS = ("diameter", "height", "length", "width", "crew_size", "mission_duration", "usable_factor")
+TEXT_FIELDS = ("shape", "structure_type", "gravity_env")
+DESIGN_DEFAULTS = {
+    "shape": "Cylinder",
+    "structure_type": "rigid",
+    "gravity_env": "microgravity",
+    "crew_size": 4,
+    "mission_duration": 180,
+    "usable_factor": 0.7,
+}
+# Optional rule inputs passed through to the rule engine (missing = rule skipped)
+ENVIRONMENT_FIELDS = (
+    "corridor_width", "door_width", "door_height",
+    "temperature", "humidity", "co2_level", "noise_level", "zone_type",
+)
+FIELD_ALIASES = {"duration": "mission_duration", "crew": "crew_size", "gravity": "gravity_env",
+                 "structure": "structure_type", "usable": "usable_factor"}
+
+# Output columns in order
+RESULT_FIELDS = (
+    "id", "shape", "total_volume_m3", "floor_area_m2", "nhv_m3", "nhv_per_person_m3",
+    "floor_area_per_person_m2", "min_nhv_per_person_m3", "total_zone_area_m2", "zone_count",
+    "structure_mass_kg", "habitability_score", "water_total_kg", "oxygen_total_kg", "food_total_kg",
+    "storage_m3", "valid", "failed_rules",
+)
+
+_DEFAULT_ZONE_AREA = sum(ZONE_MIN_AREA.values())
+
+
+def _parse_numeric(values: Sequence, default: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Float column of an input field.
+
+    Returns:
+        Tuple (column, unparsable): missing and unparsable values become the
+        default (or NaN); unparsable ones are flagged
+    """
+    try:
+        column = np.array(values, dtype=float)
+        unparsable = np.zeros(len(column), dtype=bool)
+    except (TypeError, ValueError):
+        column = np.full(len(values), np.nan)
+        unparsable = np.zeros(len(values), dtype=bool)
+        for row, value in enumerate(values):
+            if value is None or (isinstance(value, str) and not value.strip()):
+                continue
+            try:
+                column[row] = float(value)
+            except (TypeError, ValueError):
+                unparsable[row] = True
+    if default is not None:
+        column[np.isnan(column)] = default
+    return column, unparsable
+
+
+def _numeric(values: Sequence, default: Optional[float] = None) -> np.ndarray:
+    """Float column; None, "" and unparsable values become the default (or NaN)."""
+    return _parse_numeric(values, default)[0]
+
+
+def _text(values: Sequence, default: Optional[str]) -> np.ndarray:
+    if default is None:
+        return np.array(values, dtype=object)
+    return np.array([value or default for value in values], dtype=str)
+
+
+def _map_distinct(func, values: np.ndarray, dtype=object) -> np.ndarray:
+    """Applies func once per distinct value of a column."""
+    distinct, inverse = np.unique(values, return_inverse=True)
+    return np.array([func(value) for value in distinct.tolist()], dtype=dtype)[inverse.reshape(-1)]
+
+
+def _per_combination(func, *columns: np.ndarray) -> np.ndarray:
+    """
+    Applies a scalar function once per distinct combination of inputs.
+
+    Args:
+        func: Function of one value per column returning a float or a tuple
+            of floats (invalid inputs raising ValueError give NaN)
+        *columns: Input columns of equal length
+
+    Returns:
+        Array with func's result for every row (one column per tuple item)
+    """
+    combined = np.zeros(len(columns[0]), dtype=np.int64)
+    for column in columns:
+        values, inverse = np.unique(column, return_inverse=True)
+        combined = combined * len(values) + inverse.reshape(-1)
+    _, first, inverse = np.unique(combined, return_index=True, return_inverse=True)
+
+    results = []
+    for row in first.tolist():
+        try:
+            results.append(func(*(column[row].item() if isinstance(column[row], np.generic) else column[row]
+                                  for column in columns)))
+        except (ValueError, KeyError, ZeroDivisionError):
+            results.append(None)
+    width = next((len(r) if isinstance(r, tuple) else None for r in results if r is not None), None)
+    missing = np.nan if width is None else (np.nan,) * width
+    table = np.array([missing if r is None else r for r in results], dtype=float)
+    return table[inverse.reshape(-1)]
+
+
+def _resources(crew_size: int, duration_days: int):
+    """Mission water, oxygen, food (kg) and storage volume (m³)."""
+    totals = calculate_mission_resources(crew_size, duration_days)["total_mission"]
+    storage = calculate_storage_volume(crew_size, duration_days)["total_storage_m3"]
+    return (totals["water_potable_kg"] + totals["water_food_prep_kg"], totals["oxygen_kg"],
+            totals["food_kg"], storage)
+
+
+def _zone_area(value) -> bool:
+    return isinstance(value, numbers.Real) and not isinstance(value, bool) and math.isfinite(value) and value >= 0
+
+
+def _parse_zone_areas(zone_areas: Optional[Sequence], size: int) -> Tuple[Optional[list], np.ndarray]:
+    """
+    Zone area dicts of an input column.
+
+    Returns:
+        Tuple (areas, invalid): one dict per design (None = every zone at its
+        minimum area, also for invalid rows) and the rows that are not a
+        {zone: m² per person} object (JSON text accepted) with non-negative
+        numbers
+    """
+    invalid = np.zeros(size, dtype=bool)
+    if zone_areas is None or all(value is None or value == "" for value in zone_areas):
+        return None, invalid
+    areas = list(zone_areas)
+    parsed = {}  # id of an input value -> (dict or None, invalid): sweeps repeat one dict on every row
+    for row, value in enumerate(areas):
+        known = parsed.get(id(value))
+        if known is None:
+            known = parsed[id(value)] = _parse_zone_area_value(value)
+        areas[row], invalid[row] = known
+    return areas, invalid
+
+
+def _parse_zone_area_value(value) -> Tuple[Optional[dict], bool]:
+    if isinstance(value, str):
+        try:
+            value = json.loads(value) if value.strip() else None
+        except ValueError:
+            return None, True
+    if isinstance(value, dict) and value and all(map(_zone_area, value.values())):
+        return value, False
+    return None, value is not None and value != {}
+
+
+def _zone_totals(zone_areas: Optional[list], crew_size: np.ndarray):
+    """Total allocated zone area (m²) and number of zones per design (zone_areas from _parse_zone_areas)."""
+    if zone_areas is None:
+        return crew_size * _DEFAULT_ZONE_AREA, np.full(crew_size.shape, len(ZONE_MIN_AREA), dtype=float)
+    totals = {}  # id of a dict -> (m² per person, zones)
+    per_person = np.empty(len(zone_areas))
+    counts = np.empty(len(zone_areas))
+    for row, areas in enumerate(zone_areas):
+        areas = areas or ZONE_MIN_AREA
+        known = totals.get(id(areas))
+        if known is None:
+            known = totals[id(areas)] = sum(areas.values()), len(areas)
+        per_person[row], counts[row] = known
+    return crew_size * per_person, counts
+
+
+def _invalid_inputs(shape: np.ndarray, structure_type: np.ndarray, gravity_env: np.ndarray,
+                    numbers: Dict[str, np.ndarray], unparsable: Dict[str, np.ndarray],
+                    zone_areas: np.ndarray, record: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Rows whose inputs cannot describe a habitat, per field.
+
+    A field is invalid when it is unparsable, an unknown choice, or a
+    required number out of range (dimensions of the shape > 0, whole crew
+    and duration ≥ 1, usable factor in (0, 1], zone areas ≥ 0); a record is
+    invalid when the reader could not parse it (its fields are then not
+    checked). Rules cannot be trusted for such rows, so they are reported as
+    invalid_input:<field>.
+    """
+    cylinder = shape == "Cylinder"
+    rectangular = shape == "Rectangular"
+    with np.errstate(invalid="ignore"):
+        positive = {name: np.isfinite(values) & (values > 0) for name, values in numbers.items()}
+        whole = {name: positive[name] & (numbers[name] >= 1) & (numbers[name] == np.floor(numbers[name]))
+                 for name in ("crew_size", "mission_duration")}
+        usable = positive["usable_factor"] & (numbers["usable_factor"] <= 1)
+    fields = {
+        "shape": ~(cylinder | rectangular),
+        "structure_type": ~np.isin(structure_type, STRUCTURE_TYPES),
+        "gravity_env": ~np.isin(gravity_env, GRAVITY_ENVS),
+        "diameter": unparsable["diameter"] | (cylinder & ~positive["diameter"]),
+        "height": unparsable["height"] | ((cylinder | rectangular) & ~positive["height"]),
+        "length": unparsable["length"] | (rectangular & ~positive["length"]),
+        "width": unparsable["width"] | (rectangular & ~positive["width"]),
+        "crew_size": unparsable["crew_size"] | ~whole["crew_size"],
+        "mission_duration": unparsable["mission_duration"] | ~whole["mission_duration"],
+        "usable_factor": unparsable["usable_factor"] | ~usable,
+        "zone_areas": zone_areas,
+    }
+    return {"record": record, **{name: rows & ~record for name, rows in fields.items()}}
+
+
+def evaluate_columns(columns: Dict[str, Sequence], messages: bool = False) -> Dict[str, Any]:
+    """
+    Computes metrics and validation for a batch of designs.
+
+    Args:
+        columns: Column per input field (see NUMERIC_FIELDS, TEXT_FIELDS and
+            ENVIRONMENT_FIELDS; aliases such as "duration" are accepted).
+            "zone_areas" holds one {zone: m² per person} dict per design
+            (default: every zone at its minimum area); "id" is passed through;
+            "record" holds the reader's error for records it could not parse
+            (None = parsed), reported as invalid_input:record.
+        messages: Also format the messages of the failed rules
+
+    Returns:
+        Column per RESULT_FIELDS entry (plus "messages" when requested);
+        numbers as float arrays, "valid" as a bool array
+    """
+    columns = {FIELD_ALIASES.get(name, name): values for name, values in columns.items()}
+    size = max((len(values) for values in columns.values() if values is not None), default=0)
+
+    def column(name):
+        values = columns.get(name)
+        return values if values is not None else [None] * size
+
+    shape = _text(column("shape"), DESIGN_DEFAULTS["shape"])
+    structure_type = _text(column("structure_type"), DESIGN_DEFAULTS["structure_type"])
+    gravity_env = _text(column("gravity_env"), DESIGN_DEFAULTS["gravity_env"])
+    parsed = {name: _parse_numeric(column(name), DESIGN_DEFAULTS.get(name)) for name in NUMERIC_FIELDS}
+    numbers = {name: values for name, (values, _) in parsed.items()}
+    zone_areas, invalid_zones = _parse_zone_areas(columns.get("zone_areas"), size)
+    record_errors = columns.get("record")
+    invalid = _invalid_inputs(
+        shape, structure_type, gravity_env, numbers, {name: flags for name, (_, flags) in parsed.items()},
+        invalid_zones,
+        np.array([error is not None for error in record_errors], dtype=bool)
+        if record_errors is not None else np.zeros(size, dtype=bool)
+    )
+    crew_size = numbers["crew_size"]
+    duration = numbers["mission_duration"]
+    height = numbers["height"]
+
+    # Geometry (rows of an unknown shape get NaN)
+    cylinder = shape == "Cylinder"
+    total_volume = np.where(
+        cylinder,
+        calculate_cylinder_volume(numbers["diameter"], height),
+        calculate_box_volume(numbers["length"], numbers["width"], height)
+    )
+    floor_area = np.where(
+        cylinder,
+        calculate_cylinder_floor_area(numbers["diameter"], height),
+        calculate_box_floor_area(numbers["length"], numbers["width"])
+    )
+    total_volume[invalid["shape"]] = np.nan
+    floor_area[invalid["shape"]] = np.nan
+    nhv = calculate_nhv(total_volume, numbers["usable_factor"])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        nhv_per_person = nhv / crew_size
+        floor_area_per_person = floor_area / crew_size
+
+    # Requirements and resources per distinct (duration, gravity) / (crew, duration)
+    duration_days = duration.astype(int)
+    min_nhv = _per_combination(required_nhv_per_person, duration_days, gravity_env)
+    resources = _per_combination(_resources, crew_size.astype(int), duration_days)
+
+    mass = np.full(size, np.nan)
+    for structure in HABITAT_TYPES:
+        rows = structure_type == structure
+        mass[rows] = calculate_structure_mass(total_volume[rows], structure)
+    habitability = np.full(size, np.nan)
+    for gravity in np.unique(gravity_env).tolist():
+        rows = gravity_env == gravity
+        habitability[rows] = calculate_gravity_adjusted_metrics(
+            total_volume[rows], floor_area[rows], gravity
+        )["habitability_score"]
+
+    total_zone_area, zone_count = _zone_totals(zone_areas, crew_size)
+    total_zone_area[invalid["zone_areas"]] = np.nan
+    zone_count[invalid["zone_areas"]] = np.nan
+
+    rule_inputs = {
+        "nhv_per_person": nhv_per_person,
+        "min_nhv": min_nhv,
+        "floor_area_per_person": floor_area_per_person,
+        "min_floor_area": np.full(size, float(MIN_FLOOR_AREA_PER_PERSON)),
+        "mission_type": _map_distinct(lambda gravity: GRAVITY_MISSION_TYPES.get(gravity, "surface"), gravity_env),
+        "ceiling_height": height,
+        "zone_count": zone_count,
+    }
+    for name in ENVIRONMENT_FIELDS:
+        if columns.get(name) is not None:
+            rule_inputs[name] = _text(columns[name], None) if name == "zone_type" else _numeric(columns[name])
+    results = evaluate_rules(rule_inputs)
+    # Invalid inputs first, then the failed rules
+    labels = [f"invalid_input:{name}" for name in invalid] + [rule["id"] for rule in results.rules]
+    failed = np.column_stack([*invalid.values(), results.status == STATUS_FAIL])
+    # One bit per label: the list is joined once per distinct failure pattern
+    patterns = failed.astype(np.int64) @ (np.int64(1) << np.arange(len(labels), dtype=np.int64))
+    failed_rules = _map_distinct(
+        lambda pattern: ";".join(label for bit, label in enumerate(labels) if pattern >> bit & 1),
+        patterns
+    ).tolist()
+
+    output = {
+        "id": list(column("id")) if columns.get("id") is not None else list(range(size)),
+        "shape": shape.tolist(),
+        "total_volume_m3": total_volume,
+        "floor_area_m2": floor_area,
+        "nhv_m3": nhv,
+        "nhv_per_person_m3": nhv_per_person,
+        "floor_area_per_person_m2": floor_area_per_person,
+        "min_nhv_per_person_m3": min_nhv,
+        "total_zone_area_m2": total_zone_area,
+        "zone_count": zone_count,
+        "structure_mass_kg": mass,
+        "habitability_score": habitability,
+        "water_total_kg": resources[:, 0],
+        "oxygen_total_kg": resources[:, 1],
+        "food_total_kg": resources[:, 2],
+        "storage_m3": resources[:, 3],
+        "valid": ~failed.any(axis=1),
+        "failed_rules": failed_rules,
+    }
+    if messages:
+        output["messages"] = [
+            [f"Invalid {name}: {column(name)[row]!r}" for name, rows in invalid.items() if rows[row]]
+            + results.messages(row) if output["failed_rules"][row] else []
+            for row in range(size)
+        ]
+    return output
+
+
+def _plain_values(values) -> list:
+    if not isinstance(values, np.ndarray):
+        return values
+    if values.dtype.kind == "f":
+        return np.where(np.isfinite(values), values, None).tolist()
+    return values.tolist()
+
+
+def evaluate_designs(designs: Iterable[Dict[str, Any]], messages: bool = True) -> List[Dict[str, Any]]:
+    """
+    Evaluates design records (one dict per design) as one batch.
+
+    Args:
+        designs: Flat design dicts (same fields as the columns of evaluate_columns)
+        messages: Include the messages of the failed rules
+
+    Returns:
+        One result dict per design, with plain Python values (NaN as None)
+    """
+    designs = list(designs)
+    names = set().union(*designs) if designs else set()
+    results = evaluate_columns({name: [design.get(name) for design in designs] for name in names}, messages)
+    plain = {name: _plain_values(values) for name, values in results.items()}
+    return [{name: values[row] for name, values in plain.items()} for row in range(len(designs))]
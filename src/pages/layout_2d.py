@@ -3,74 +3,37 @@
 """
 import streamlit as st
 from src.components.config_panel import render_config_panel
-from src.visualizations.layout_2d import create_2d_layout_plotly
+from src.components.fragments import page_fragment
+from src.components.validation import habitat_model
 from src.config.constants import ZONE_COLORS, ZONE_NAMES, MIN_FLOOR_AREA_PER_PERSON
-from src.utils.calculations import (
-    calculate_cylinder_volume, calculate_cylinder_floor_area,
-    calculate_box_volume, calculate_box_floor_area,
-    calculate_nhv, allocate_zones
-)
-from src.utils.nasa_calculations import calculate_nhv_per_person
+from src.utils.instrumentation import STAGE_CHART_EMIT, STAGE_CONFIG, STAGE_FIGURE_BUILD, STAGE_VALIDATION, span
 
 
-def render_layout_2d_page():
-    """Renders the 2D Layout page"""
-    
-    st.markdown("# 2D Layout - Habitat Floor Plan")
-    
-    # 2D visualization explanation
-    st.markdown("""
-    <div style='background: linear-gradient(135deg, rgba(72, 187, 120, 0.1), rgba(56, 178, 172, 0.1)); 
-                padding: 1.5rem; border-radius: 10px; border-left: 4px solid #48bb78; margin-bottom: 1.5rem;'>
-        <h3 style='color: #48bb78; margin-top: 0;'>What is the 2D Floor Plan?</h3>
-        <p style='color: #E2E8F0; line-height: 1.8;'>
-            The 2D visualization shows the <strong>floor plan</strong> of your habitat - a top view that 
-            reveals how the <strong>functional zones</strong> are distributed in the available space.
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
+@page_fragment
+def _render_floor_plan_section():
+    """Configuration, metrics, floor plan and zone details (reruns on its own when the configuration changes)"""
     
     # Create two columns: configuration panel (left) and visualization (right)
     config_col, viz_col = st.columns([1, 2])
     
     with config_col:
         st.markdown("### Configuration")
-        config = render_config_panel()
+        with span("render_config_panel", STAGE_CONFIG):
+            config = render_config_panel()
     
     # Validate if zones are selected
-    if not config["zone_areas"]:
+    if not config.zone_areas:
         st.warning("Please select at least one functional zone in the configuration.")
-        st.stop()
-    
-    # Calculate metrics
-    if config["shape"] == "Cylinder":
-        total_volume = calculate_cylinder_volume(
-            config["dimensions"]["diameter"],
-            config["dimensions"]["height"]
-        )
-        floor_area = calculate_cylinder_floor_area(
-            config["dimensions"]["diameter"],
-            config["dimensions"]["height"]
-        )
-    else:
-        total_volume = calculate_box_volume(
-            config["dimensions"]["length"],
-            config["dimensions"]["width"],
-            config["dimensions"]["height"]
-        )
-        floor_area = calculate_box_floor_area(
-            config["dimensions"]["length"],
-            config["dimensions"]["width"]
-        )
-    
-    nhv = calculate_nhv(total_volume, config["usable_factor"])
-    nhv_per_person = nhv / config["crew_size"]
-    floor_area_per_person = floor_area / config["crew_size"]
-    nhv_required_per_person = calculate_nhv_per_person(config["mission_duration"])
-    
-    # Allocate zones
-    zones = allocate_zones(floor_area, config["crew_size"], config["zone_areas"])
-    total_zone_area = sum(zones.values())
+        return
+    
+    # Derived quantities (computed once per configuration and shared by every section)
+    with span("habitat_model", STAGE_VALIDATION):
+        model = habitat_model(config)
+    floor_area = model.floor_area
+    floor_area_per_person = model.floor_area_per_person
+    
+    zones = model.zones
+    total_zone_area = model.total_zone_area
     
     with viz_col:
         st.markdown("### Floor Plan Visualization")
@@ -79,7 +42,7 @@ def render_layout_2d_page():
         metric_col1, metric_col2, metric_col3 = st.columns(3)
         
         with metric_col1:
-            shape_translated = "Cylindrical" if config['shape'] == 'Cylinder' else "Rectangular"
+            shape_translated = "Cylindrical" if config.shape == 'Cylinder' else "Rectangular"
             st.metric("Shape", shape_translated)
         
         with metric_col2:
@@ -91,14 +54,14 @@ def render_layout_2d_page():
             st.caption(f"{total_zone_area:.1f} m² allocated")
         
         # 2D Visualization
-        fig_2d = create_2d_layout_plotly(
-            zones, floor_area, config["shape"], config["dimensions"],
-            ZONE_COLORS, ZONE_NAMES
-        )
-        st.plotly_chart(fig_2d, use_container_width=True, config={"displayModeBar": True, "responsive": True})
+        with span("create_2d_layout_plotly", STAGE_FIGURE_BUILD):
+            fig_2d = model.figure("layout_2d")
+        with span("layout_2d_chart", STAGE_CHART_EMIT) as emit:
+            st.plotly_chart(fig_2d, use_container_width=True, config={"displayModeBar": True, "responsive": True})
+        emit.set_lazy(payload_bytes=lambda: len(fig_2d.to_json()))
         
         # Validation
-        if floor_area_per_person < MIN_FLOOR_AREA_PER_PERSON:
+        if model.failed("floor_area_per_person"):
             st.error(f"Floor area per person ({floor_area_per_person:.1f} m²) is below NASA minimum ({MIN_FLOOR_AREA_PER_PERSON} m²)")
         else:
             st.success(f"Floor area per person ({floor_area_per_person:.1f} m²) meets NASA standard")
@@ -122,10 +85,30 @@ def render_layout_2d_page():
                     {area:.1f} m²
                 </div>
                 <div style='color: #A0AEC0;'>
-                    {percentage:.1f}% of total | {area/config['crew_size']:.1f} m²/person
+                    {percentage:.1f}% of total | {area/config.crew_size:.1f} m²/person
                 </div>
             </div>
             """, unsafe_allow_html=True)
+
+
+def render_layout_2d_page():
+    """Renders the 2D Layout page"""
+    
+    st.markdown("# 2D Layout - Habitat Floor Plan")
+    
+    # 2D visualization explanation
+    st.markdown("""
+    <div style='background: linear-gradient(135deg, rgba(72, 187, 120, 0.1), rgba(56, 178, 172, 0.1)); 
+                padding: 1.5rem; border-radius: 10px; border-left: 4px solid #48bb78; margin-bottom: 1.5rem;'>
+        <h3 style='color: #48bb78; margin-top: 0;'>What is the 2D Floor Plan?</h3>
+        <p style='color: #E2E8F0; line-height: 1.8;'>
+            The 2D visualization shows the <strong>floor plan</strong> of your habitat - a top view that 
+            reveals how the <strong>functional zones</strong> are distributed in the available space.
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    _render_floor_plan_section()
     
     # Interpretation tips
     st.markdown("---")
@@ -3,75 +3,40 @@
 """
 import streamlit as st
 from src.components.config_panel import render_config_panel
-from src.visualizations.layout_3d import create_3d_habitat_view
+from src.components.fragments import page_fragment
+from src.components.validation import habitat_model
 from src.config.constants import ZONE_COLORS, ZONE_NAMES, MIN_FLOOR_AREA_PER_PERSON
-from src.utils.calculations import (
-    calculate_cylinder_volume, calculate_cylinder_floor_area,
-    calculate_box_volume, calculate_box_floor_area,
-    calculate_nhv, allocate_zones
-)
-from src.utils.nasa_calculations import calculate_nhv_per_person
+from src.utils.instrumentation import STAGE_CHART_EMIT, STAGE_CONFIG, STAGE_FIGURE_BUILD, STAGE_VALIDATION, span
 
 
-def render_layout_3d_page():
-    """Renders the 3D Layout page"""
-    
-    st.markdown("# 3D Layout - Three-Dimensional Visualization")
-    
-    # 3D visualization explanation
-    st.markdown("""
-    <div style='background: linear-gradient(135deg, rgba(139, 92, 246, 0.1), rgba(168, 85, 247, 0.1)); 
-                padding: 1.5rem; border-radius: 10px; border-left: 4px solid #8b5cf6; margin-bottom: 1.5rem;'>
-        <h3 style='color: #8b5cf6; margin-top: 0;'>What is 3D Visualization?</h3>
-        <p style='color: #E2E8F0; line-height: 1.8;'>
-            The 3D visualization shows the <strong>complete volume</strong> of your space habitat, 
-            allowing you to see the <strong>real dimensions</strong> and <strong>zone distribution</strong> 
-            in three dimensions.
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
+@page_fragment
+def _render_3d_section():
+    """Configuration, metrics, 3D model and zone details (reruns on its own when the configuration changes)"""
     
     # Create two columns: configuration panel (left) and visualization (right)
     config_col, viz_col = st.columns([1, 2])
     
     with config_col:
         st.markdown("### Configuration")
-        config = render_config_panel()
+        with span("render_config_panel", STAGE_CONFIG):
+            config = render_config_panel()
     
     # Validate if zones are selected
-    if not config["zone_areas"]:
+    if not config.zone_areas:
         st.warning("Please select at least one functional zone in the configuration.")
-        st.stop()
-    
-    # Calculate metrics
-    if config["shape"] == "Cylinder":
-        total_volume = calculate_cylinder_volume(
-            config["dimensions"]["diameter"],
-            config["dimensions"]["height"]
-        )
-        floor_area = calculate_cylinder_floor_area(
-            config["dimensions"]["diameter"],
-            config["dimensions"]["height"]
-        )
-    else:
-        total_volume = calculate_box_volume(
-            config["dimensions"]["length"],
-            config["dimensions"]["width"],
-            config["dimensions"]["height"]
-        )
-        floor_area = calculate_box_floor_area(
-            config["dimensions"]["length"],
-            config["dimensions"]["width"]
-        )
-    
-    nhv = calculate_nhv(total_volume, config["usable_factor"])
-    nhv_per_person = nhv / config["crew_size"]
-    floor_area_per_person = floor_area / config["crew_size"]
-    nhv_required_per_person = calculate_nhv_per_person(config["mission_duration"])
-    
-    # Allocate zones
-    zones = allocate_zones(floor_area, config["crew_size"], config["zone_areas"])
-    total_zone_area = sum(zones.values())
+        return
+    
+    # Derived quantities (computed once per configuration and shared by every section)
+    with span("habitat_model", STAGE_VALIDATION):
+        model = habitat_model(config)
+    total_volume = model.total_volume
+    nhv = model.nhv
+    nhv_per_person = model.nhv_per_person
+    floor_area_per_person = model.floor_area_per_person
+    nhv_required_per_person = model.required_nhv_per_person
+    
+    zones = model.zones
+    total_zone_area = model.total_zone_area
     
     with viz_col:
         st.markdown("### Interactive 3D Model")
@@ -88,35 +53,35 @@ def render_layout_3d_page():
             st.caption(f"NASA: {nhv_required_per_person:.1f} m³")
         
         with metric_col3:
-            if config["shape"] == "Cylinder":
-                st.metric("Dimensions", f"D{config['dimensions']['diameter']}m × H{config['dimensions']['height']}m")
+            if config.shape == "Cylinder":
+                st.metric("Dimensions", f"D{config.diameter}m × H{config.height}m")
                 st.caption("Cylinder")
             else:
-                st.metric("Dimensions", f"{config['dimensions']['length']}m × {config['dimensions']['width']}m × {config['dimensions']['height']}m")
+                st.metric("Dimensions", f"{config.length}m × {config.width}m × {config.height}m")
                 st.caption("Rectangle")
         
         # Interaction tip
         st.info("Tip: Click and drag to rotate. Use mouse wheel to zoom. Double-click to reset view.")
         
         # 3D Visualization
-        fig_3d = create_3d_habitat_view(
-            config["shape"], config["dimensions"], zones,
-            ZONE_COLORS, ZONE_NAMES
-        )
-        st.plotly_chart(fig_3d, use_container_width=True, config={"displayModeBar": True, "responsive": True})
+        with span("create_3d_habitat_view", STAGE_FIGURE_BUILD):
+            fig_3d = model.figure("layout_3d")
+        with span("layout_3d_chart", STAGE_CHART_EMIT) as emit:
+            st.plotly_chart(fig_3d, use_container_width=True, config={"displayModeBar": True, "responsive": True})
+        emit.set_lazy(payload_bytes=lambda: len(fig_3d.to_json()))
         
         # Validations
         val_col1, val_col2 = st.columns(2)
         
         with val_col1:
-            if nhv_per_person >= nhv_required_per_person:
+            if not model.failed("nhv_per_person"):
                 st.success(f"NHV per person ({nhv_per_person:.1f} m³) meets NASA standard ({nhv_required_per_person:.1f} m³)")
             else:
                 st.error(f"NHV per person ({nhv_per_person:.1f} m³) is below NASA minimum ({nhv_required_per_person:.1f} m³)")
                 st.caption(f"Deficit: {nhv_required_per_person - nhv_per_person:.1f} m³/person")
         
         with val_col2:
-            if floor_area_per_person >= MIN_FLOOR_AREA_PER_PERSON:
+            if not model.failed("floor_area_per_person"):
                 st.success(f"Floor area per person ({floor_area_per_person:.1f} m²) meets NASA standard ({MIN_FLOOR_AREA_PER_PERSON} m²)")
             else:
                 st.error(f"Floor area per person ({floor_area_per_person:.1f} m²) is below NASA minimum ({MIN_FLOOR_AREA_PER_PERSON} m²)")
@@ -146,6 +111,27 @@ def render_layout_3d_page():
                 </div>
             </div>
             """, unsafe_allow_html=True)
+
+
+def render_layout_3d_page():
+    """Renders the 3D Layout page"""
+    
+    st.markdown("# 3D Layout - Three-Dimensional Visualization")
+    
+    # 3D visualization explanation
+    st.markdown("""
+    <div style='background: linear-gradient(135deg, rgba(139, 92, 246, 0.1), rgba(168, 85, 247, 0.1)); 
+                padding: 1.5rem; border-radius: 10px; border-left: 4px solid #8b5cf6; margin-bottom: 1.5rem;'>
+        <h3 style='color: #8b5cf6; margin-top: 0;'>What is 3D Visualization?</h3>
+        <p style='color: #E2E8F0; line-height: 1.8;'>
+            The 3D visualization shows the <strong>complete volume</strong> of your space habitat, 
+            allowing you to see the <strong>real dimensions</strong> and <strong>zone distribution</strong> 
+            in three dimensions.
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    _render_3d_section()
     
     # Interpretation tips
     st.markdown("---")
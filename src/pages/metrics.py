@@ -1,47 +1,173 @@
 """
 NASA metrics page with configurations and educational explanations
 """
+import numpy as np
 import streamlit as st
 from src.components.config_panel import render_config_panel
+from src.components.fragments import page_fragment
+from src.components.jobs import render_job, start_job
+from src.components.validation import habitat_model
 from src.components.metrics import render_metrics
-from src.config.constants import MIN_FLOOR_AREA_PER_PERSON
-from src.utils.calculations import (
-    calculate_cylinder_volume, calculate_cylinder_floor_area,
-    calculate_box_volume, calculate_box_floor_area,
-    calculate_nhv, allocate_zones
-)
-from src.utils.nasa_calculations import calculate_nhv_per_person
+from src.config.constants import CONFIG_INPUT_STEPS, LAUNCH_VEHICLES, MIN_FLOOR_AREA_PER_PERSON
+from src.core.optimize import dimension_names, grid_size, iter_best_design
+from src.utils.habitat_config import HabitatConfig
+from src.utils.habitat_model import HabitatModel
+from src.utils.jobs import Job, JobLimitReached
+from src.utils.instrumentation import STAGE_CHART_EMIT, STAGE_COMPUTE, STAGE_CONFIG, STAGE_FIGURE_BUILD, STAGE_VALIDATION, count, span
+from src.utils.launch import estimate_launch_count
+from src.utils.pareto import pareto_sweep
+from src.utils.prefetch import get_prefetcher, prefetch_enabled
+from src.visualizations.pareto import create_pareto_front_plot
 
+# Sweep grid matching the configuration panel bounds (0.5 m steps)
+PARETO_SWEEP_RANGES = {
+    "diameter": np.arange(2.0, 15.01, 0.5),
+    "length": np.arange(2.0, 20.01, 0.5),
+    "width": np.arange(2.0, 15.01, 0.5),
+    "height": np.arange(2.0, 20.01, 0.5),
+}
 
-def render_metrics_page():
-    """Renders the NASA Metrics page"""
+
+@st.cache_data(show_spinner=False)
+def _compute_pareto_front(shape: str, structure_type: str, crew_size: int,
+                          usable_factor: float, gravity_env: str) -> dict:
+    """Cached dimension sweep for the current mission parameters"""
+    count("pareto_front.miss")  # only runs when the cache misses
+    return pareto_sweep(
+        shape, PARETO_SWEEP_RANGES, structure_type,
+        crew_size, usable_factor, gravity_env
+    )
+
+# Dimension optimization (background job): objective -> (label, result column, unit)
+OPTIMIZATION_OBJECTIVES = {
+    "min_mass": ("Lowest structural mass", "structure_mass_kg", "kg"),
+    "min_volume": ("Smallest pressurized volume", "total_volume_m3", "m³"),
+    "max_habitability": ("Highest habitability score", "habitability_score", ""),
+    "max_nhv_per_person": ("Most NHV per person", "nhv_per_person_m3", "m³/person"),
+}
+OPTIMIZATION_STEPS = (0.5, 0.25, 0.1, 0.05)  # grid steps offered (m)
+CHECKPOINT_MIN_DESIGNS = 1_000_000  # larger searches save their progress (resumed after a restart)
+
+
+def _pareto_key(config: HabitatConfig) -> tuple:
+    """Arguments of _compute_pareto_front (dimension steps keep the same sweep)"""
+    return config.shape, config.structure_type, config.crew_size, config.usable_factor, config.gravity_env
+
+
+def _prefetch_pareto_front(config: HabitatConfig):
+    """Warms the Pareto cache for a prefetched neighbour (crew and usable factor steps change the sweep)"""
+    _compute_pareto_front(*_pareto_key(config))
+
+
+def _optimization_ranges(config: HabitatConfig, step: float) -> dict:
+    """Grid of every dimension of the shape within the configuration panel bounds"""
+    return {
+        name: {"start": CONFIG_INPUT_STEPS[name][0], "stop": CONFIG_INPUT_STEPS[name][1], "step": step}
+        for name in dimension_names(config.shape)
+    }
+
+
+def _render_optimization_result(job: Job):
+    """Best compliant design found so far by the optimization job"""
+    report = job.progress
+    label, column, unit = OPTIMIZATION_OBJECTIVES[report["objective"]]
+    rate = f" · {report['rate_per_s']:,.0f} designs/s" if report.get("rate_per_s") else ""
+    if report.get("resumed_from"):
+        rate += f" · resumed after {report['resumed_from']:,} designs"
+    st.caption(f"{report['evaluated']:,} of {report['total']:,} designs evaluated, "
+               f"{report['feasible']:,} compliant{rate}")
+    best = report["best"]
+    if best is None:
+        st.info("No compliant design found yet.")
+        return
+    dims = " × ".join(f"{name} {best[name]:.2f} m" for name in ("diameter", "length", "width", "height") if name in best)
+    result_cols = st.columns(4)
+    result_cols[0].metric(label, f"{best[column]:,.1f} {unit}".strip())
+    result_cols[1].metric("Structural Mass", f"{best['structure_mass_kg']:,.0f} kg")
+    result_cols[2].metric("NHV per Person", f"{best['nhv_per_person_m3']:.1f} m³")
+    result_cols[3].metric("Habitability Score", f"{best['habitability_score']:.1f}")
+    st.markdown(f"**{'Best design' if job.status == 'done' else 'Best so far'}:** {dims}")
+
+
+def _render_optimization_section(config: HabitatConfig):
+    """Starts the dimension optimization in the background and shows its progress"""
+    st.markdown("### Dimension Optimization")
+    st.caption(
+        "Searches every dimension combination of the current shape for the NASA-compliant design that best "
+        "meets the chosen objective, keeping the other parameters and the selected zones. The search runs in "
+        "the background: you can keep editing or switch pages and come back to its result. Searches of more "
+        "than a million designs save their progress, so running the same search after a server restart "
+        "continues it."
+    )
+    objective_col, step_col, run_col = st.columns([2, 1, 1])
+    with objective_col:
+        objective = st.selectbox(
+            "Objective", list(OPTIMIZATION_OBJECTIVES),
+            format_func=lambda key: OPTIMIZATION_OBJECTIVES[key][0], key="optimization_objective"
+        )
+    with step_col:
+        step = st.selectbox("Grid step (m)", OPTIMIZATION_STEPS, index=2, key="optimization_step")
+    ranges = _optimization_ranges(config, step)
+    designs = grid_size(config.shape, ranges)
+    with run_col:
+        st.caption(f"{designs:,} designs")
+        start = st.button("Run optimization", key="optimization_run", width="stretch")
+    if start:
+        checkpoint = designs > CHECKPOINT_MIN_DESIGNS
+        design = {name: value for name, value in config.to_record().items()
+                  if name not in ("diameter", "length", "width", "height")}
+        try:
+            start_job(
+                "dimension_optimization",
+                f"{OPTIMIZATION_OBJECTIVES[objective][0]} ({config.shape}, {step} m grid)",
+                iter_best_design, design, ranges, objective,
+                # A resumed search takes less than its size suggests: keep it out of the run time estimates
+                cost=None if checkpoint else designs, checkpoint=checkpoint
+            )
+        except JobLimitReached as exc:
+            st.warning(str(exc))
+    render_job("dimension_optimization", _render_optimization_result)
+
+
+@page_fragment
+def _render_launch_section(model: HabitatModel):
+    """Launch feasibility (the module count reruns only this section)"""
+    st.markdown("### Launch Feasibility")
     
-    st.markdown("# NASA Metrics - Quantitative Analysis")
+    with span("launch_feasibility", STAGE_COMPUTE):
+        structure_mass = model.structure_mass
+        envelope_diameter, envelope_height = model.launch_envelope
+        feasibility = model.launch_feasibility
     
-    # NASA metrics explanation
-    st.markdown("""
-    <div style='background: linear-gradient(135deg, rgba(236, 72, 153, 0.1), rgba(219, 39, 119, 0.1)); 
-                padding: 1.5rem; border-radius: 10px; border-left: 4px solid #ec4899; margin-bottom: 2rem;'>
-        <h3 style='color: #ec4899; margin-top: 0;'>What are NASA Metrics?</h3>
-        <p style='color: #E2E8F0; line-height: 1.8;'>
-            The quantitative metrics from <strong>NASA Human Integration Design Handbook (HIDH)</strong> are 
-            scientific standards established through decades of space mission research. 
-            They ensure the habitat is <strong>safe, functional, and psychologically healthy</strong> 
-            for the crew.
-        </p>
-        <h4 style='color: #ec4899; margin-top: 1.5rem;'>Why do these metrics matter?</h4>
-        <ul style='color: #E2E8F0; line-height: 1.8;'>
-            <li><strong>Physical Health:</strong> Insufficient space causes mobility problems, fatigue, and 
-            increased accident risk.</li>
-            <li><strong>Psychological Well-being:</strong> Over-confined environments increase stress, interpersonal 
-            conflicts, and team performance deterioration.</li>
-            <li><strong>Operational Efficiency:</strong> Poorly dimensioned layouts reduce productivity and 
-            complicate critical daily activities.</li>
-            <li><strong>Mission Safety:</strong> NASA standards are based on data from ISS, Skylab, Mir 
-            and other real missions.</li>
-        </ul>
-    </div>
-    """, unsafe_allow_html=True)
+    launch_col1, launch_col2 = st.columns([1, 2])
+    
+    with launch_col1:
+        st.metric("Structural Mass", f"{structure_mass:,.0f} kg")
+        st.caption(f"Stowed envelope: Ø{float(envelope_diameter):.2f} m × {float(envelope_height):.2f} m")
+        n_modules = st.number_input("Modules in the base", min_value=1, max_value=20, value=1, step=1, key="launch_modules")
+    
+    launches = estimate_launch_count(envelope_diameter, envelope_height, structure_mass, n_modules)
+    
+    with launch_col2:
+        vehicle_cols = st.columns(len(LAUNCH_VEHICLES))
+        for col, (vehicle_id, vehicle) in zip(vehicle_cols, LAUNCH_VEHICLES.items()):
+            checks = feasibility[vehicle_id]
+            with col:
+                st.markdown(f"**{vehicle['name']}**")
+                st.caption(
+                    f"Diameter ≤ {vehicle['max_diameter']} m: {'OK' if checks['fits_diameter'] else 'NO'} · "
+                    f"Height ≤ {vehicle['max_height']} m: {'OK' if checks['fits_height'] else 'NO'} · "
+                    f"Mass ≤ {vehicle['max_payload_kg']:,} kg: {'OK' if checks['fits_mass'] else 'NO'}"
+                )
+                if checks["feasible"]:
+                    st.success(f"{int(launches[vehicle_id])} launch(es) for {n_modules} module(s)")
+                else:
+                    st.error("Module does not fit this vehicle")
+
+
+@page_fragment
+def _render_analysis_section():
+    """Configuration and every config-dependent section (reruns on its own when the configuration changes)"""
     
     # Configuration panel
     config_col, viz_col = st.columns([1, 2])
@@ -49,48 +175,32 @@ def render_metrics_page():
     # Left column: Configuration panel
     with config_col:
         st.markdown("### Configuration")
-        config = render_config_panel()
+        with span("render_config_panel", STAGE_CONFIG):
+            config = render_config_panel()
     
     # Validate if zones are selected
-    if not config["zone_areas"]:
+    if not config.zone_areas:
         st.warning("Please select at least one functional zone in the configuration above.")
-        st.stop()
+        return
     
     # Right column: Metrics dashboard
     with viz_col:
         st.markdown("### Complete Metrics Dashboard")
         
-        # Calculate metrics
-        if config["shape"] == "Cylinder":
-            total_volume = calculate_cylinder_volume(
-                config["dimensions"]["diameter"],
-                config["dimensions"]["height"]
-            )
-            floor_area = calculate_cylinder_floor_area(
-                config["dimensions"]["diameter"],
-                config["dimensions"]["height"]
-            )
-        else:
-            total_volume = calculate_box_volume(
-                config["dimensions"]["length"],
-                config["dimensions"]["width"],
-                config["dimensions"]["height"]
-            )
-            floor_area = calculate_box_floor_area(
-                config["dimensions"]["length"],
-                config["dimensions"]["width"]
-            )
-        
-        nhv = calculate_nhv(total_volume, config["usable_factor"])
-        nhv_per_person = nhv / config["crew_size"]
-        floor_area_per_person = floor_area / config["crew_size"]
-        nhv_required_per_person = calculate_nhv_per_person(config["mission_duration"])
+        # Derived quantities (computed once per configuration and shared by every section)
+        with span("habitat_model", STAGE_VALIDATION):
+            model = habitat_model(config)
+        total_volume = model.total_volume
+        floor_area = model.floor_area
+        nhv = model.nhv
+        nhv_per_person = model.nhv_per_person
+        floor_area_per_person = model.floor_area_per_person
+        nhv_required_per_person = model.required_nhv_per_person
         
-        # Calculate required water
-        total_water = config["crew_size"] * config["mission_duration"] * 2.5  # 2.5 kg/person/day
+        # Potable and food-preparation water for the mission
+        total_water = model.total_water
         
-        # Allocate zones
-        zones = allocate_zones(floor_area, config["crew_size"], config["zone_areas"])
+        zones = model.zones
         
         # Metrics dashboard
         render_metrics(
@@ -99,9 +209,9 @@ def render_metrics_page():
             nhv=nhv,
             nhv_per_person=nhv_per_person,
             floor_area_per_person=floor_area_per_person,
-            crew_size=config["crew_size"],
+            crew_size=config.crew_size,
             total_water=total_water,
-            mission_duration=config["mission_duration"],
+            mission_duration=config.mission_duration,
             min_nhv=nhv_required_per_person,
             min_floor_area=MIN_FLOOR_AREA_PER_PERSON
         )
@@ -125,7 +235,7 @@ def render_metrics_page():
         
         **Your Habitat:**
         - Total Volume: **{total_volume:.1f} m³**
-        - Usability Factor: **{config['usable_factor']*100:.0f}%**
+        - Usability Factor: **{config.usable_factor*100:.0f}%**
         - Resulting NHV: **{nhv:.1f} m³**
         - NHV per Person: **{nhv_per_person:.1f} m³/person**
         
@@ -136,7 +246,7 @@ def render_metrics_page():
         - 181-360 days: 22.5 m³/person
         - &gt;360 days: 27.9 m³/person
         
-        **For your {config['mission_duration']}-day mission:**
+        **For your {config.mission_duration}-day mission:**
         - Required NHV: **{nhv_required_per_person:.1f} m³/person**
         - Your NHV: **{nhv_per_person:.1f} m³/person**
         - Status: {'ADEQUATE' if nhv_per_person >= nhv_required_per_person else f'BELOW STANDARD (deficit of {nhv_required_per_person - nhv_per_person:.1f} m³/person)'}
@@ -190,7 +300,7 @@ def render_metrics_page():
         from ..config.constants import ZONE_NAMES
         for zone_id, area in zones.items():
             percentage = (area / sum(zones.values())) * 100
-            area_per_person = area / config["crew_size"]
+            area_per_person = area / config.crew_size
             st.markdown(f"""
             - **{ZONE_NAMES[zone_id]}:** {area:.1f} m² ({percentage:.1f}%) = {area_per_person:.1f} m²/person
             """)
@@ -219,8 +329,8 @@ def render_metrics_page():
         by crew members, discounting space occupied by systems and equipment.
         
         **Your Habitat:**
-        - Usability Factor: **{config['usable_factor']*100:.0f}%**
-        - Structure: **{config['structure_type']}**
+        - Usability Factor: **{config.usable_factor*100:.0f}%**
+        - Structure: **{config.structure_type}**
         
         **Typical Ranges by Structure Type:**
         - **Rigid Structures (Metallic):** 70-80%
@@ -248,9 +358,9 @@ def render_metrics_page():
     with st.expander("Gravity & Resources - Gravity and Resources"):
         st.markdown(f"""
         **Your Habitat:**
-        - Gravity Environment: **{config['gravity_env']}**
-        - Mission Duration: **{config['mission_duration']} days**
-        - Crew Size: **{config['crew_size']} people**
+        - Gravity Environment: **{config.gravity_env}**
+        - Mission Duration: **{config.mission_duration} days**
+        - Crew Size: **{config.crew_size} people**
         
         **Gravity Impact on Design:**
         
@@ -291,22 +401,22 @@ def render_metrics_page():
     validations = []
     
     # Validate NHV
-    if nhv_per_person >= nhv_required_per_person:
+    if not model.failed("nhv_per_person"):
         validations.append(("NHV per Person", True, f"{nhv_per_person:.1f} m³ (required: {nhv_required_per_person:.1f} m³)"))
     else:
         validations.append(("NHV per Person", False, f"{nhv_per_person:.1f} m³ (required: {nhv_required_per_person:.1f} m³) - Deficit: {nhv_required_per_person - nhv_per_person:.1f} m³"))
     
     # Validate floor area
-    if floor_area_per_person >= MIN_FLOOR_AREA_PER_PERSON:
+    if not model.failed("floor_area_per_person"):
         validations.append(("Floor Area", True, f"{floor_area_per_person:.1f} m²/person (minimum: {MIN_FLOOR_AREA_PER_PERSON} m²)"))
     else:
         validations.append(("Floor Area", False, f"{floor_area_per_person:.1f} m²/person (minimum: {MIN_FLOOR_AREA_PER_PERSON} m²) - Deficit: {MIN_FLOOR_AREA_PER_PERSON - floor_area_per_person:.1f} m²"))
     
     # Validate minimum zones
-    if len(zones) >= 3:
+    if not model.failed("zone_count"):
         validations.append(("Zone Diversity", True, f"{len(zones)} functional zones"))
     else:
-        validations.append(("Zone Diversity", False, f"{len(zones)} zones (recommended: minimum 3 for basic functionality)"))
+        validations.append(("Zone Diversity", False, model.validation.results("layout").messages(0)[0]))
     
     # Display validations
     for metric_name, is_valid, description in validations:
@@ -321,3 +431,73 @@ def render_metrics_page():
         st.success("Congratulations! Your habitat meets all analyzed NASA HIDH standards.")
     else:
         st.warning("Attention: Your habitat does not meet all NASA standards. Review the metrics in red and adjust the configurations.")
+    
+    st.markdown("---")
+    
+    # Trade study: non-dominated designs for the current mission parameters
+    st.markdown("### Trade Study - Pareto Front")
+    st.caption(
+        "Every dimension combination available in the configuration panel is evaluated for the current "
+        "shape, structure, crew, usable factor and gravity. Only designs that no other design beats on "
+        "structural mass, NHV per person and habitability score at the same time are shown."
+    )
+    
+    count("pareto_front.calls")
+    with span("pareto_front", STAGE_COMPUTE):
+        front = _compute_pareto_front(
+            config.shape, config.structure_type, config.crew_size,
+            config.usable_factor, config.gravity_env
+        )
+        current_objectives = model.design_objectives
+    with span("create_pareto_front_plot", STAGE_FIGURE_BUILD):
+        fig_pareto = create_pareto_front_plot(front, current={
+            "mass_kg": current_objectives[0],
+            "nhv_per_person_m3": current_objectives[1],
+            "habitability_score": current_objectives[2]
+        })
+    with span("pareto_chart", STAGE_CHART_EMIT) as emit:
+        st.plotly_chart(fig_pareto, use_container_width=True, config={"displayModeBar": True, "responsive": True})
+    emit.set_lazy(payload_bytes=lambda: len(fig_pareto.to_json()))
+    
+    st.markdown("---")
+    
+    _render_optimization_section(config)
+    
+    st.markdown("---")
+    
+    _render_launch_section(model)
+
+
+def render_metrics_page():
+    """Renders the NASA Metrics page"""
+    
+    st.markdown("# NASA Metrics - Quantitative Analysis")
+    
+    # NASA metrics explanation
+    st.markdown("""
+    <div style='background: linear-gradient(135deg, rgba(236, 72, 153, 0.1), rgba(219, 39, 119, 0.1)); 
+                padding: 1.5rem; border-radius: 10px; border-left: 4px solid #ec4899; margin-bottom: 2rem;'>
+        <h3 style='color: #ec4899; margin-top: 0;'>What are NASA Metrics?</h3>
+        <p style='color: #E2E8F0; line-height: 1.8;'>
+            The quantitative metrics from <strong>NASA Human Integration Design Handbook (HIDH)</strong> are 
+            scientific standards established through decades of space mission research. 
+            They ensure the habitat is <strong>safe, functional, and psychologically healthy</strong> 
+            for the crew.
+        </p>
+        <h4 style='color: #ec4899; margin-top: 1.5rem;'>Why do these metrics matter?</h4>
+        <ul style='color: #E2E8F0; line-height: 1.8;'>
+            <li><strong>Physical Health:</strong> Insufficient space causes mobility problems, fatigue, and 
+            increased accident risk.</li>
+            <li><strong>Psychological Well-being:</strong> Over-confined environments increase stress, interpersonal 
+            conflicts, and team performance deterioration.</li>
+            <li><strong>Operational Efficiency:</strong> Poorly dimensioned layouts reduce productivity and 
+            complicate critical daily activities.</li>
+            <li><strong>Mission Safety:</strong> NASA standards are based on data from ISS, Skylab, Mir 
+            and other real missions.</li>
+        </ul>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    if prefetch_enabled():
+        get_prefetcher().add_hook("pareto_front", _prefetch_pareto_front, key=_pareto_key)
+    _render_analysis_section()
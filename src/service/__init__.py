@@ -0,0 +1,3 @@
+"""
+Local HTTP service over the UI-free core (see app.py)
+"""
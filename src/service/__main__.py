@@ -0,0 +1,38 @@
+"""
+Runs the evaluation service with uvicorn.
+
+Usage:
+    python -m src.service --port 8600
+    python -m src.service --workers 8 --max-batch 128 --max-wait-ms 5
+    python -m src.service --checkpoint-dir checkpoints/service
+"""
+import argparse
+import sys
+
+import uvicorn
+
+from .app import DEFAULT_MAX_BATCH, DEFAULT_MAX_WAIT, DEFAULT_WORKERS, EvaluationService, create_app
+from .jobs import DEFAULT_MAX_JOBS
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Evaluation threads")
+    parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH, help="Largest coalesced batch (1 = no batching)")
+    parser.add_argument("--max-wait-ms", type=float, default=DEFAULT_MAX_WAIT * 1e3,
+                        help="Time a request may wait for others to join its batch")
+    parser.add_argument("--max-queue", type=int, default=10_000, help="Pending requests before answering 503")
+    parser.add_argument("--max-jobs", type=int, default=DEFAULT_MAX_JOBS, help="Optimization jobs running at once")
+    parser.add_argument("--checkpoint-dir", help="Save job progress here and resume unfinished jobs on start")
+    args = parser.parse_args(argv)
+
+    service = EvaluationService(args.workers, args.max_batch, args.max_wait_ms / 1e3, args.max_queue, args.max_jobs,
+                                args.checkpoint_dir)
+    uvicorn.run(create_app(service), host=args.host, port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
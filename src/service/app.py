@@ -0,0 +1,358 @@
+"""
+HTTP evaluation service (Starlette on uvicorn, both installed with Streamlit)
+
+Endpoints (JSON in, JSON out):
+    POST /evaluate          one design -> metrics and validation (micro-batched)
+    POST /evaluate/batch    {"designs": [...]} -> one result per design
+    POST /recommendations   crew_size, mission_duration, gravity_env, structure_type
+                            -> generate_layout_recommendations (micro-batched)
+    POST /layout            one design -> zone allocation and efficiency, plus the
+                            Plotly 2D floor plan with "figure": true (micro-batched)
+    POST /jobs              {"kind": "best_design" | "pareto", "design": {...}, "ranges": {...},
+                            "objective": ..., "chunk_size": ...} -> 202 with the job id
+    GET  /jobs/{id}         status and latest progress report (jobs survive restarts
+                            when the service runs with --checkpoint-dir)
+    GET  /jobs/{id}/events  progress as Server-Sent Events until the job ends
+    WS   /jobs/{id}/ws      progress as JSON messages; send {"action": "cancel"} to cancel
+    DELETE /jobs/{id}       cancels the job
+    GET  /stats             latency percentiles and throughput per endpoint, batch sizes, jobs
+    GET  /health
+
+Design fields are those of src/core/pipeline.py (flat records, as in the
+batch CLI). The service only imports src.core, never Streamlit.
+"""
+import asyncio
+import contextlib
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route, WebSocketRoute
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+from .. import core
+from ..config.constants import ZONE_COLORS, ZONE_MIN_AREA, ZONE_NAMES
+from ..core.optimize import DEFAULT_CHUNK_SIZE
+from ..core.pipeline import ENVIRONMENT_FIELDS, FIELD_ALIASES, NUMERIC_FIELDS, TEXT_FIELDS
+from .batcher import LatencyStats, MicroBatcher, QueueFull
+from .jobs import DEFAULT_MAX_JOBS, FINAL_STATES, JobManager
+
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_BATCH = 64
+DEFAULT_MAX_WAIT = 0.002
+MAX_DIRECT_BATCH = 10_000
+MAX_JOB_CHUNK = 200_000
+SCALAR_FIELDS = frozenset(NUMERIC_FIELDS + TEXT_FIELDS + ENVIRONMENT_FIELDS)
+
+
+def check_payload(design: Any, where: str = "design") -> Dict[str, Any]:
+    """
+    Checks the shape of a design before it joins a batch (values are checked by the pipeline).
+
+    Args:
+        design: Decoded JSON
+        where: Name of the design in error messages
+
+    Returns:
+        The design
+
+    Raises:
+        ValueError: Not an object, a field that is neither a number nor text,
+            or zone_areas that is not an object
+    """
+    if not isinstance(design, dict):
+        raise ValueError(f"{where} must be a JSON object")
+    for name, value in design.items():
+        field = FIELD_ALIASES.get(name, name)
+        if value is None:
+            continue
+        if field == "zone_areas" and not isinstance(value, dict):
+            raise ValueError(f"{where}.zone_areas must be an object of m² per person by zone")
+        if field in SCALAR_FIELDS and (isinstance(value, bool) or not isinstance(value, (int, float, str))):
+            raise ValueError(f"{where}.{name} must be a number or text")
+    return design
+
+
+def evaluate_batch(designs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Metrics and validation for a list of designs (one vectorized call)."""
+    return core.evaluate_designs(designs, messages=True)
+
+
+def recommendations_batch(requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """generate_layout_recommendations for each request, computed once per distinct parameter set."""
+    results = {}
+    keyed = []
+    for request in requests:
+        key = (
+            int(request.get("crew_size", 4)),
+            int(request.get("mission_duration", request.get("duration", 180))),
+            request.get("gravity_env", "microgravity"),
+            request.get("structure_type", "rigid"),
+        )
+        if key not in results:
+            results[key] = core.generate_layout_recommendations(*key)
+        keyed.append(key)
+    return [results[key] for key in keyed]
+
+
+def layout_batch(designs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Zone allocation (and optional 2D figure) per design; floor areas in one vectorized call.
+
+    Raises:
+        ValueError: A design has invalid inputs (see src/core/pipeline.py)
+    """
+    metrics = core.evaluate_designs(designs, messages=False)
+    layouts = []
+    for design, result in zip(designs, metrics):
+        invalid = [rule for rule in result["failed_rules"].split(";") if rule.startswith("invalid_input:")]
+        if invalid:
+            raise ValueError(", ".join(invalid))
+        zone_areas = design.get("zone_areas") or ZONE_MIN_AREA
+        floor_area = result["floor_area_m2"]
+        zones = core.allocate_zones(floor_area, int(design.get("crew_size", 4)), zone_areas)
+        efficiency = core.calculate_layout_efficiency(
+            {zone: {"area": area} for zone, area in zones.items()}, floor_area
+        )
+        layout = {
+            "id": design.get("id"),
+            "floor_area_m2": floor_area,
+            "zones": zones,
+            "space_efficiency": efficiency["space_efficiency"],
+            "circulation_index": efficiency["circulation_index"],
+        }
+        if design.get("figure"):
+            dimensions = {name: design.get(name) for name in ("diameter", "height", "length", "width")}
+            figure = core.create_2d_layout_plotly(
+                zones, floor_area, result["shape"], dimensions, ZONE_COLORS, ZONE_NAMES
+            )
+            layout["figure"] = figure.to_plotly_json()
+        layouts.append(layout)
+    return layouts
+
+
+class EvaluationService:
+    """
+    Owns the worker pool, the micro-batchers and the endpoint statistics.
+
+    Args:
+        workers: Threads evaluating batches (NumPy releases the GIL in the
+            vectorized parts; figures and small batches do not scale as well)
+        max_batch: Largest coalesced batch
+        max_wait: Seconds a request may wait for others to join its batch
+        max_queue: Pending requests per batcher before answering 503
+        max_jobs: Optimization jobs running at the same time (on their own threads)
+        checkpoint_dir: Where jobs save their progress, resumed on the next start (None = off)
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, max_batch: int = DEFAULT_MAX_BATCH,
+                 max_wait: float = DEFAULT_MAX_WAIT, max_queue: int = 10_000, max_jobs: int = DEFAULT_MAX_JOBS,
+                 checkpoint_dir: Optional[str] = None):
+        self.workers = workers
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="habitat-eval")
+        self.options = {"max_batch": max_batch, "max_wait": max_wait, "max_queue": max_queue}
+        self.batchers: Dict[str, MicroBatcher] = {}
+        self.stats: Dict[str, LatencyStats] = {}
+        self.rejected = 0
+        self.jobs = JobManager(max_jobs, checkpoint_dir=checkpoint_dir)
+
+    def batcher(self, name: str, func) -> MicroBatcher:
+        if name not in self.batchers:
+            self.batchers[name] = MicroBatcher(func, self.executor, self.workers, **self.options)
+            self.batchers[name].start()
+        return self.batchers[name]
+
+    def endpoint_stats(self, name: str) -> LatencyStats:
+        return self.stats.setdefault(name, LatencyStats())
+
+    async def shutdown(self) -> None:
+        for batcher in self.batchers.values():
+            await batcher.stop()
+        self.jobs.shutdown()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "rejected": self.rejected,
+            "endpoints": {name: stats.snapshot() for name, stats in sorted(self.stats.items())},
+            "batchers": {name: batcher.snapshot() for name, batcher in sorted(self.batchers.items())},
+            "jobs": self.jobs.snapshot(),
+        }
+
+
+def _error(status: int, message: str) -> JSONResponse:
+    return JSONResponse({"error": message}, status_code=status)
+
+
+def create_app(service: Optional[EvaluationService] = None) -> Starlette:
+    """
+    Builds the Starlette application.
+
+    Args:
+        service: Service state (default: EvaluationService with default options)
+
+    Returns:
+        ASGI application (serve with uvicorn, see src/service/__main__.py)
+    """
+    service = service or EvaluationService()
+
+    def timed(name: str, batch_func=None):
+        def decorator(handler):
+            async def endpoint(request: Request):
+                start = time.perf_counter()
+                error = False
+                try:
+                    try:
+                        payload = await request.json()
+                    except ValueError:
+                        error = True
+                        return _error(400, "Body must be JSON")
+                    if not isinstance(payload, dict):
+                        error = True
+                        return _error(400, "Body must be a JSON object")
+                    batcher = service.batcher(name, batch_func) if batch_func else None
+                    return await handler(payload, batcher)
+                except QueueFull as exc:
+                    error = True
+                    service.rejected += 1
+                    return _error(503, f"Service busy: {exc}")
+                except (KeyError, TypeError, ValueError) as exc:
+                    error = True
+                    return _error(422, f"Invalid design: {exc}")
+                finally:
+                    service.endpoint_stats(name).record(time.perf_counter() - start, error)
+            return endpoint
+        return decorator
+
+    @timed("evaluate", evaluate_batch)
+    async def evaluate(payload, batcher):
+        return JSONResponse(await batcher.submit(check_payload(payload)))
+
+    @timed("evaluate_batch")
+    async def evaluate_many(payload, _):
+        designs = payload.get("designs")
+        if not isinstance(designs, list) or len(designs) > MAX_DIRECT_BATCH:
+            return _error(422, f"'designs' must be a list of at most {MAX_DIRECT_BATCH} designs")
+        for index, design in enumerate(designs):
+            check_payload(design, f"designs[{index}]")
+        loop = asyncio.get_running_loop()
+        return JSONResponse({"results": await loop.run_in_executor(service.executor, evaluate_batch, designs)})
+
+    @timed("recommendations", recommendations_batch)
+    async def recommendations(payload, batcher):
+        return JSONResponse(await batcher.submit(check_payload(payload, "request")))
+
+    @timed("layout", layout_batch)
+    async def layout(payload, batcher):
+        return JSONResponse(await batcher.submit(check_payload(payload)))
+
+    @timed("jobs")
+    async def start_job(payload, _):
+        params = {"design": payload.get("design") or {}, "ranges": payload.get("ranges") or {},
+                  "chunk_size": min(int(payload.get("chunk_size", DEFAULT_CHUNK_SIZE)), MAX_JOB_CHUNK)}
+        if not isinstance(params["design"], dict) or not isinstance(params["ranges"], dict):
+            return _error(422, "'design' and 'ranges' must be objects")
+        if params["chunk_size"] < 1:
+            return _error(422, "'chunk_size' must be positive")
+        kind = payload.get("kind", "best_design")
+        if kind == "best_design":
+            params["objective"] = payload.get("objective", "min_mass")
+        job = service.jobs.submit(kind, params)
+        return JSONResponse({**job.event(), "events": f"/jobs/{job.id}/events", "ws": f"/jobs/{job.id}/ws"},
+                            status_code=202)
+
+    def find_job(request: Request):
+        return service.jobs.get(request.path_params["job_id"])
+
+    async def job_status(request: Request):
+        job = find_job(request)
+        if job is None:
+            return _error(404, "Unknown job")
+        if request.method == "DELETE":
+            service.jobs.cancel(job.id)
+        return JSONResponse(job.event())
+
+    async def job_events(request: Request):
+        job = find_job(request)
+        if job is None:
+            return _error(404, "Unknown job")
+
+        async def stream():
+            # Each send waits for the client to drain the socket; meanwhile the
+            # subscription keeps only the newest report (see src/service/jobs.py)
+            subscription = job.subscribe()
+            try:
+                while True:
+                    event = await subscription.get()
+                    yield f"event: {event['status']}\ndata: {json.dumps(event)}\n\n"
+                    if event["status"] in FINAL_STATES:
+                        break
+            finally:
+                job.unsubscribe(subscription)
+
+        return StreamingResponse(stream(), media_type="text/event-stream",
+                                 headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+    async def job_socket(websocket: WebSocket):
+        job = service.jobs.get(websocket.path_params["job_id"])
+        await websocket.accept()
+        if job is None:
+            await websocket.send_json({"error": "Unknown job"})
+            await websocket.close(code=1008)
+            return
+
+        async def receive_commands():
+            while True:
+                message = await websocket.receive_json()
+                if isinstance(message, dict) and message.get("action") == "cancel":
+                    service.jobs.cancel(job.id)
+
+        subscription = job.subscribe()
+        commands = asyncio.get_running_loop().create_task(receive_commands())
+        try:
+            while True:
+                event = await subscription.get()
+                await websocket.send_json(event)
+                if event["status"] in FINAL_STATES:
+                    break
+            await websocket.close()
+        except WebSocketDisconnect:
+            pass
+        finally:
+            commands.cancel()
+            job.unsubscribe(subscription)
+
+    async def stats(request: Request):
+        return JSONResponse(service.snapshot())
+
+    async def health(request: Request):
+        return JSONResponse({"status": "ok"})
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        service.jobs.resume()
+        yield
+        await service.shutdown()
+
+    app = Starlette(
+        routes=[
+            Route("/evaluate", evaluate, methods=["POST"]),
+            Route("/evaluate/batch", evaluate_many, methods=["POST"]),
+            Route("/recommendations", recommendations, methods=["POST"]),
+            Route("/layout", layout, methods=["POST"]),
+            Route("/jobs", start_job, methods=["POST"]),
+            Route("/jobs/{job_id}", job_status, methods=["GET", "DELETE"]),
+            Route("/jobs/{job_id}/events", job_events, methods=["GET"]),
+            WebSocketRoute("/jobs/{job_id}/ws", job_socket),
+            Route("/stats", stats, methods=["GET"]),
+            Route("/health", health, methods=["GET"]),
+        ],
+        lifespan=lifespan,
+    )
+    app.state.service = service
+    return app
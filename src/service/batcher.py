@@ -0,0 +1,188 @@
+"""
+Request micro-batching for the evaluation service
+
+Concurrent single-design requests are queued and coalesced into batches that
+are evaluated in one vectorized call on a bounded worker pool. A batch is
+dispatched as soon as it is full (max_batch) or its oldest request has waited
+max_wait seconds; while every worker is busy, requests keep accumulating, so
+batches grow with the load instead of the queue of tiny calls. When a batch
+raises, its items are evaluated again one by one, so only the requests that
+fail on their own get the error.
+"""
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import Executor
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+class QueueFull(Exception):
+    """Raised by submit() when the pending queue is at capacity (backpressure)."""
+
+
+class LatencyStats:
+    """
+    Rolling latency and throughput of one endpoint.
+
+    Keeps the last `window` samples for percentiles and counts completions
+    over the last `rate_window` seconds for throughput.
+    """
+
+    def __init__(self, window: int = 10_000, rate_window: float = 60.0):
+        self.rate_window = rate_window
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.finished: Deque[float] = deque()
+        self.count = 0
+        self.errors = 0
+        self.started = time.monotonic()
+
+    def record(self, seconds: float, error: bool = False) -> None:
+        now = time.monotonic()
+        self.count += 1
+        self.errors += error
+        self.samples.append(seconds)
+        self.finished.append(now)
+        while self.finished and self.finished[0] < now - self.rate_window:
+            self.finished.popleft()
+
+    def snapshot(self) -> Dict[str, float]:
+        now = time.monotonic()
+        span = min(self.rate_window, max(now - self.started, 1e-9))
+        recent = sum(1 for finished in self.finished if finished >= now - span)
+        snapshot = {"count": self.count, "errors": self.errors, "throughput_per_s": recent / span}
+        if self.samples:
+            p50, p95, p99 = np.percentile(np.fromiter(self.samples, dtype=float), [50, 95, 99])
+            snapshot.update({"p50_ms": p50 * 1e3, "p95_ms": p95 * 1e3, "p99_ms": p99 * 1e3,
+                             "max_ms": max(self.samples) * 1e3})
+        return snapshot
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent submit() calls into batched calls of func.
+
+    Args:
+        func: Function mapping a list of items to a list of results (same order)
+        executor: Pool running func (its size bounds the concurrent batches)
+        max_workers: Batches evaluated at the same time
+        max_batch: Largest batch
+        max_wait: Seconds the first request of a batch may wait for company
+        max_queue: Pending requests before submit() raises QueueFull
+    """
+
+    def __init__(self, func: Callable[[List[Any]], Sequence[Any]], executor: Executor, max_workers: int,
+                 max_batch: int = 64, max_wait: float = 0.002, max_queue: int = 10_000):
+        self.func = func
+        self.executor = executor
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.max_queue = max_queue
+        self._slots = asyncio.Semaphore(max_workers)
+        self._queue: Deque = deque()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.batched_items = 0
+        self.batch_sizes: Deque[int] = deque(maxlen=1000)
+        self.split_batches = 0  # failed batches re-run item by item
+        self.batch_latency = LatencyStats()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._queue)
+
+    async def submit(self, item: Any) -> Any:
+        """Queues one item and waits for its result (exceptions of func propagate)."""
+        if len(self._queue) >= self.max_queue:
+            raise QueueFull(f"{len(self._queue)} requests pending")
+        future = asyncio.get_running_loop().create_future()
+        self._queue.append((item, future, time.monotonic()))
+        self._wakeup.set()
+        return await future
+
+    async def _run(self) -> None:
+        while True:
+            if not self._queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+            # Give the oldest request up to max_wait to collect company
+            waited = time.monotonic() - self._queue[0][2]
+            if len(self._queue) < self.max_batch and waited < self.max_wait:
+                await asyncio.sleep(self.max_wait - waited)
+            await self._slots.acquire()
+            batch = [self._queue.popleft() for _ in range(min(self.max_batch, len(self._queue)))]
+            batch = [entry for entry in batch if not entry[1].cancelled()]
+            if not batch:
+                self._slots.release()
+                continue
+            asyncio.get_running_loop().create_task(self._dispatch(batch))
+
+    async def _dispatch(self, batch: List) -> None:
+        start = time.perf_counter()
+        error = False
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self.func, [item for item, _, _ in batch]
+            )
+            for (_, future, _), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        except Exception as exc:  # noqa: BLE001 - handed to the waiting request(s)
+            error = True
+            if len(batch) == 1:
+                if not batch[0][1].done():
+                    batch[0][1].set_exception(exc)
+            else:
+                # One bad item must not fail the requests coalesced with it
+                self.split_batches += 1
+                await self._dispatch_each(batch)
+        finally:
+            self._slots.release()
+            self.batches += 1
+            self.batched_items += len(batch)
+            self.batch_sizes.append(len(batch))
+            self.batch_latency.record(time.perf_counter() - start, error)
+
+    async def _dispatch_each(self, batch: List) -> None:
+        """Evaluates the items of a failed batch one by one; only the failing ones get the exception."""
+        loop = asyncio.get_running_loop()
+        for item, future, _ in batch:
+            if future.done():
+                continue
+            try:
+                result = (await loop.run_in_executor(self.executor, self.func, [item]))[0]
+            except Exception as exc:  # noqa: BLE001 - handed to this request only
+                if not future.done():
+                    future.set_exception(exc)
+            else:
+                if not future.done():
+                    future.set_result(result)
+
+    def snapshot(self) -> Dict[str, Any]:
+        sizes = list(self.batch_sizes)
+        return {
+            "batches": self.batches,
+            "items": self.batched_items,
+            "mean_batch_size": self.batched_items / self.batches if self.batches else 0.0,
+            "recent_max_batch_size": max(sizes) if sizes else 0,
+            "split_batches": self.split_batches,
+            "pending": self.pending,
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1e3,
+            "evaluation": self.batch_latency.snapshot()
+        }
@@ -0,0 +1,261 @@
+"""
+Asynchronous optimization jobs for the evaluation service
+
+A job runs one of the src.core.optimize generators on a dedicated thread pool
+(so long sweeps never starve the request workers) and publishes every
+progress report to its subscribers (SSE or WebSocket clients). Cancellation
+sets a flag the runner checks between chunks.
+
+With a checkpoint directory every job saves its progress there
+(src/core/checkpoint.py, one file per job id). After a restart resume()
+recreates the jobs under their ids: unfinished ones continue from their
+last checkpoint, finished ones answer status queries with their result. A
+job cancelled by a client deletes its checkpoint; one stopped by shutdown
+keeps it.
+
+Backpressure: the runner never waits for clients. Each subscriber holds at
+most one pending progress report; a newer report replaces an undelivered one
+(reports are cumulative best-so-far snapshots, so nothing is lost but
+intermediate states) and the final report is always delivered. A slow client
+therefore costs O(1) memory however fast the job produces.
+"""
+import asyncio
+import contextlib
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set
+
+from ..core.checkpoint import list_checkpoints
+from ..core.optimize import OBJECTIVES, OPTIMIZERS, grid_size
+from ..core.pipeline import DESIGN_DEFAULTS
+
+DEFAULT_MAX_JOBS = 2
+DEFAULT_RETAINED = 100
+MAX_JOB_DESIGNS = 50_000_000
+FINAL_STATES = ("done", "cancelled", "failed")
+
+
+class Subscription:
+    """Latest-wins mailbox of one client (at most one pending report)."""
+
+    def __init__(self):
+        self._pending: Optional[Dict[str, Any]] = None
+        self._ready = asyncio.Event()
+        self.dropped = 0
+
+    def put(self, event: Dict[str, Any]) -> None:
+        """Called on the event loop; replaces an undelivered progress report."""
+        if self._pending is not None:
+            if self._pending["status"] in FINAL_STATES:
+                return
+            self.dropped += 1
+        self._pending = event
+        self._ready.set()
+
+    async def get(self) -> Dict[str, Any]:
+        await self._ready.wait()
+        event, self._pending = self._pending, None
+        self._ready.clear()
+        return {**event, "dropped": self.dropped}
+
+
+class OptimizationJob:
+    """
+    State of one optimization run.
+
+    Args:
+        job_id: Identifier used in the URLs
+        kind: Key of src.core.optimize.OPTIMIZERS
+        params: Keyword arguments of the optimizer (design, ranges, ...)
+    """
+
+    def __init__(self, job_id: str, kind: str, params: Dict[str, Any]):
+        self.id = job_id
+        self.kind = kind
+        self.params = params
+        self.status = "queued"
+        self.error: Optional[str] = None
+        self.created = time.time()
+        self.finished: Optional[float] = None
+        self.latest: Optional[Dict[str, Any]] = None
+        self.cancel_requested = threading.Event()
+        self.subscribers: Set[Subscription] = set()
+
+    @property
+    def done(self) -> bool:
+        return self.status in FINAL_STATES
+
+    def event(self) -> Dict[str, Any]:
+        """Current status with the latest progress report."""
+        return {"id": self.id, "kind": self.kind, "status": self.status, "error": self.error,
+                "progress": self.latest}
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription()
+        subscription.put(self.event())
+        if not self.done:
+            self.subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self.subscribers.discard(subscription)
+
+    def publish(self) -> None:
+        """Event loop side of a state change: fan the current state out to every subscriber."""
+        event = self.event()
+        for subscription in self.subscribers:
+            subscription.put(event)
+        if self.done:
+            self.subscribers.clear()
+
+
+class JobManager:
+    """
+    Starts, tracks and cancels optimization jobs.
+
+    Args:
+        max_jobs: Jobs running at the same time (later ones wait as "queued")
+        retained: Finished jobs kept for status queries before the oldest is forgotten
+        max_designs: Largest dimension grid a job may sweep
+        checkpoint_dir: Directory of the job checkpoints (None = no checkpoints)
+    """
+
+    def __init__(self, max_jobs: int = DEFAULT_MAX_JOBS, retained: int = DEFAULT_RETAINED,
+                 max_designs: int = MAX_JOB_DESIGNS, checkpoint_dir: Optional[str] = None):
+        self.executor = ThreadPoolExecutor(max_workers=max_jobs, thread_name_prefix="habitat-job")
+        self.max_jobs = max_jobs
+        self.retained = retained
+        self.max_designs = max_designs
+        self.jobs: "OrderedDict[str, OptimizationJob]" = OrderedDict()
+        self._ids = itertools.count(1)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.checkpoint_dir = checkpoint_dir
+        self._closing = False
+
+    def submit(self, kind: str, params: Dict[str, Any]) -> OptimizationJob:
+        """Creates a job and queues it on the job pool (must be called on the event loop)."""
+        if kind not in OPTIMIZERS:
+            raise ValueError(f"Unknown job kind '{kind}' (choose from {', '.join(OPTIMIZERS)})")
+        if "objective" in params and params["objective"] not in OBJECTIVES:
+            raise ValueError(f"Unknown objective '{params['objective']}' (choose from {', '.join(OBJECTIVES)})")
+        shape = params["design"].get("shape") or DESIGN_DEFAULTS["shape"]
+        size = grid_size(shape, params["ranges"])
+        if size > self.max_designs:
+            raise ValueError(f"Grid of {size} designs exceeds the limit of {self.max_designs}")
+        return self._start(OptimizationJob(f"job-{next(self._ids)}", kind, params))
+
+    def resume(self) -> List[OptimizationJob]:
+        """
+        Recreates the jobs found in the checkpoint directory (must be called on the event loop).
+
+        Returns:
+            The jobs restarted from their checkpoint (finished ones are only registered)
+        """
+        if self.checkpoint_dir is None:
+            return []
+        self._loop = asyncio.get_running_loop()
+        restarted = []
+        numbers = [0]
+        for path, meta in list_checkpoints(self.checkpoint_dir):
+            job_id = os.path.splitext(os.path.basename(path))[0]
+            if job_id in self.jobs or meta["kind"] not in OPTIMIZERS:
+                continue
+            if job_id.startswith("job-") and job_id[4:].isdigit():
+                numbers.append(int(job_id[4:]))
+            job = OptimizationJob(job_id, meta["kind"], meta["params"])
+            job.latest = meta["state"]["report"]
+            if meta["state"]["complete"]:
+                job.status = "done"
+                job.finished = meta["saved"]
+                self.jobs[job.id] = job
+            else:
+                restarted.append(self._start(job))
+        self._ids = itertools.count(max(next(self._ids), max(numbers) + 1))
+        self._forget_finished()
+        return restarted
+
+    def _start(self, job: OptimizationJob) -> OptimizationJob:
+        self._loop = asyncio.get_running_loop()
+        self.jobs[job.id] = job
+        self._forget_finished()
+        self.executor.submit(self._run, job)
+        return job
+
+    def _checkpoint_path(self, job: OptimizationJob) -> Optional[str]:
+        if self.checkpoint_dir is None:
+            return None
+        return os.path.join(self.checkpoint_dir, f"{job.id}.npz")
+
+    def _remove_checkpoint(self, job: OptimizationJob) -> None:
+        path = self._checkpoint_path(job)
+        if path is not None:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+
+    def get(self, job_id: str) -> Optional[OptimizationJob]:
+        return self.jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[OptimizationJob]:
+        job = self.jobs.get(job_id)
+        if job is not None and not job.done:
+            job.cancel_requested.set()
+            if job.status == "queued":  # never started: report it right away
+                self._remove_checkpoint(job)
+                job.status = "cancelled"
+                job.finished = time.time()
+                job.publish()
+        return job
+
+    def shutdown(self) -> None:
+        self._closing = True  # stopped jobs keep their checkpoint
+        for job in self.jobs.values():
+            job.cancel_requested.set()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def snapshot(self) -> Dict[str, Any]:
+        counts = {"queued": 0, "running": 0, "done": 0, "cancelled": 0, "failed": 0}
+        for job in self.jobs.values():
+            counts[job.status] += 1
+        subscribers = sum(len(job.subscribers) for job in self.jobs.values())
+        return {"max_jobs": self.max_jobs, "subscribers": subscribers, **counts}
+
+    def _forget_finished(self) -> None:
+        finished = [job_id for job_id, job in self.jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - self.retained)]:
+            self._remove_checkpoint(self.jobs.pop(job_id))
+
+    def _publish(self, job: OptimizationJob) -> None:
+        try:
+            self._loop.call_soon_threadsafe(job.publish)
+        except RuntimeError:  # event loop already closed during shutdown
+            pass
+
+    def _run(self, job: OptimizationJob) -> None:
+        """Worker thread: iterates the optimizer, publishing after every chunk."""
+        if job.cancel_requested.is_set():  # cancelled while queued
+            return
+        job.status = "running"
+        self._publish(job)
+        checkpoint = self._checkpoint_path(job)
+        try:
+            runs = OPTIMIZERS[job.kind](**job.params, checkpoint=checkpoint)
+            for progress in runs:
+                job.latest = progress
+                if job.cancel_requested.is_set():
+                    job.status = "cancelled"
+                    break
+                self._publish(job)
+            else:
+                job.status = "done"
+            runs.close()  # saves the progress of a stopped run
+        except Exception as exc:  # noqa: BLE001 - reported to the client
+            job.status = "failed"
+            job.error = f"{type(exc).__name__}: {exc}"
+        if job.status in ("cancelled", "failed") and not self._closing:
+            self._remove_checkpoint(job)
+        job.finished = time.time()
+        self._publish(job)
@@ -0,0 +1,329 @@
+"""
+Immutable habitat configuration
+
+HabitatConfig replaces the nested configuration dict of the pages: typed
+attributes, validation when it is built, value equality and a canonical
+hash (usable as a cache key, also by st.cache_data). Large sweeps store
+configurations as rows of CONFIG_DTYPE, a packed NumPy record of 51 bytes
+per configuration that converts back to HabitatConfig objects or straight
+to the columns of the vectorized pipeline.
+"""
+import hashlib
+import math
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from ..config.constants import GRAVITY_ENVIRONMENTS, HABITAT_TYPES, ZONE_NAMES
+
+SHAPES = ("Cylinder", "Rectangular")
+STRUCTURE_TYPES = tuple(HABITAT_TYPES)
+GRAVITY_ENVS = tuple(GRAVITY_ENVIRONMENTS)
+ZONE_IDS = tuple(ZONE_NAMES)  # canonical zone order (array columns, hash)
+SHAPE_DIMENSIONS = {"Cylinder": ("diameter", "height"), "Rectangular": ("length", "width", "height")}
+
+# Packed record of one configuration (dimensions not used by the shape are NaN,
+# areas of excluded zones are 0 and their zone_mask bit is clear)
+CONFIG_DTYPE = np.dtype([
+    ("shape", "u1"),
+    ("structure_type", "u1"),
+    ("gravity_env", "u1"),
+    ("crew_size", "u1"),
+    ("mission_duration", "<u2"),
+    ("zone_mask", "u1"),
+    ("usable_factor", "<f4"),
+    ("diameter", "<f4"),
+    ("height", "<f4"),
+    ("length", "<f4"),
+    ("width", "<f4"),
+    ("zone_areas", "<f4", (len(ZONE_IDS),)),
+])
+# Numbers are rounded to this many decimals on construction
+CANONICAL_DECIMALS = 9
+# float32 keeps ~7 significant digits; values read back are rounded to this many decimals
+ARRAY_DECIMALS = 4
+
+
+def _positive(name: str, value: Any) -> float:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a number, got {value!r}") from None
+    if not math.isfinite(number) or number <= 0:
+        raise ValueError(f"{name} must be a positive number, got {value!r}")
+    # Widget arithmetic (0.65 + 0.05 = 0.7000000000000001) must not change the hash
+    return round(number, CANONICAL_DECIMALS)
+
+
+def _whole(name: str, value: Any, maximum: int) -> int:
+    number = _positive(name, value)
+    if number != int(number) or number > maximum:
+        raise ValueError(f"{name} must be a whole number between 1 and {maximum}, got {value!r}")
+    return int(number)
+
+
+def _choice(name: str, value: Any, choices: Tuple[str, ...]) -> str:
+    if value not in choices:
+        raise ValueError(f"{name} must be one of {', '.join(choices)}, got {value!r}")
+    return value
+
+
+class HabitatConfig:
+    """
+    One habitat configuration (as set in the configuration panel).
+
+    Args:
+        shape: "Cylinder" or "Rectangular"
+        structure_type: Key of HABITAT_TYPES
+        height: Height (m)
+        crew_size: Crew members
+        mission_duration: Mission length (days)
+        gravity_env: Key of GRAVITY_ENVIRONMENTS
+        usable_factor: Fraction of the volume that is habitable (0-1]
+        zone_areas: Area per person (m²) of each included zone
+        diameter: Diameter (m), cylinders only
+        length: Length (m), rectangular only
+        width: Width (m), rectangular only
+
+    Raises:
+        ValueError: If a value is missing, out of range or unknown
+    """
+
+    __slots__ = ("shape", "structure_type", "diameter", "height", "length", "width", "crew_size",
+                 "mission_duration", "gravity_env", "usable_factor", "_zones", "_key", "_hash")
+
+    shape: str
+    structure_type: str
+    diameter: Optional[float]
+    height: float
+    length: Optional[float]
+    width: Optional[float]
+    crew_size: int
+    mission_duration: int
+    gravity_env: str
+    usable_factor: float
+
+    def __init__(self, shape: str, structure_type: str, height: float, crew_size: int,
+                 mission_duration: int, gravity_env: str, usable_factor: float,
+                 zone_areas: Optional[Mapping[str, float]] = None, diameter: Optional[float] = None,
+                 length: Optional[float] = None, width: Optional[float] = None):
+        shape = _choice("shape", shape, SHAPES)
+        given = {"diameter": diameter, "height": height, "length": length, "width": width}
+        dimensions = {name: None for name in given}
+        for name in SHAPE_DIMENSIONS[shape]:
+            dimensions[name] = _positive(name, given[name])
+
+        usable_factor = _positive("usable_factor", usable_factor)
+        if usable_factor > 1:
+            raise ValueError(f"usable_factor must be at most 1, got {usable_factor!r}")
+        zone_areas = dict(zone_areas or {})
+        unknown = set(zone_areas) - set(ZONE_IDS)
+        if unknown:
+            raise ValueError(f"Unknown zones: {', '.join(sorted(unknown))}")
+        zones = tuple((zone, _positive(f"zone_areas[{zone}]", zone_areas[zone]))
+                      for zone in ZONE_IDS if zone in zone_areas)
+
+        fields = {
+            "shape": shape,
+            "structure_type": _choice("structure_type", structure_type, STRUCTURE_TYPES),
+            **dimensions,
+            "crew_size": _whole("crew_size", crew_size, 255),
+            "mission_duration": _whole("mission_duration", mission_duration, 65535),
+            "gravity_env": _choice("gravity_env", gravity_env, GRAVITY_ENVS),
+            "usable_factor": usable_factor,
+            "_zones": zones,
+        }
+        for name, value in fields.items():
+            object.__setattr__(self, name, value)
+        key = tuple(getattr(self, name) for name in self.__slots__[:10]) + (zones,)
+        object.__setattr__(self, "_key", key)
+        object.__setattr__(self, "_hash", hash(key))
+
+    @classmethod
+    def from_dict(cls, config: Mapping[str, Any]) -> "HabitatConfig":
+        """
+        Builds a configuration from the legacy nested dict (with "dimensions")
+        or from a flat design record (pipeline / batch CLI fields).
+        """
+        dimensions = config.get("dimensions") or config
+        return cls(
+            shape=config.get("shape", "Cylinder"),
+            structure_type=config.get("structure_type", "rigid"),
+            height=dimensions.get("height"),
+            crew_size=config.get("crew_size"),
+            mission_duration=config.get("mission_duration"),
+            gravity_env=config.get("gravity_env", "microgravity"),
+            usable_factor=config.get("usable_factor", 0.7),
+            zone_areas=config.get("zone_areas"),
+            diameter=dimensions.get("diameter"),
+            length=dimensions.get("length"),
+            width=dimensions.get("width"),
+        )
+
+    def replace(self, **changes) -> "HabitatConfig":
+        """Copy with some fields changed (validated like a new configuration)."""
+        fields = self.to_record()
+        fields.update(changes)
+        return HabitatConfig(**fields)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("HabitatConfig is immutable (use replace())")
+
+    def __delattr__(self, name):
+        raise AttributeError("HabitatConfig is immutable")
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, HabitatConfig):
+            return NotImplemented
+        return self._key == other._key
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __reduce__(self):
+        # Rebuilt through __init__ (pickle, copy and st.cache_data argument hashing)
+        return (_from_record, (self.to_record(),))
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={value!r}" for name, value in self.to_record().items() if value is not None)
+        return f"HabitatConfig({fields})"
+
+    @property
+    def zone_areas(self) -> Dict[str, float]:
+        """Area per person (m²) of each included zone (a new dict on every access)."""
+        return dict(self._zones)
+
+    @property
+    def dimensions(self) -> Dict[str, Optional[float]]:
+        """Dimensions in the form of the visualization and sizing functions."""
+        if self.shape == "Cylinder":
+            return {"diameter": self.diameter, "height": self.height, "length": None, "width": None}
+        # Rectangular habitats report their width as the launch-envelope diameter
+        return {"length": self.length, "width": self.width, "height": self.height, "diameter": self.width}
+
+    @property
+    def key(self) -> tuple:
+        """Canonical tuple of all values (equal configurations have equal keys)."""
+        return self._key
+
+    def digest(self) -> str:
+        """Stable hex digest of the configuration (same across processes and runs)."""
+        return hashlib.sha256(repr(self._key).encode("utf-8")).hexdigest()[:32]
+
+    def to_record(self) -> Dict[str, Any]:
+        """Flat dict of the constructor arguments (also a pipeline design record)."""
+        return {
+            "shape": self.shape,
+            "structure_type": self.structure_type,
+            "diameter": self.diameter,
+            "height": self.height,
+            "length": self.length,
+            "width": self.width,
+            "crew_size": self.crew_size,
+            "mission_duration": self.mission_duration,
+            "gravity_env": self.gravity_env,
+            "usable_factor": self.usable_factor,
+            "zone_areas": self.zone_areas,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Legacy nested dict (as render_config_panel used to return)."""
+        return {
+            "shape": self.shape,
+            "structure_type": self.structure_type,
+            "dimensions": self.dimensions,
+            "crew_size": self.crew_size,
+            "mission_duration": self.mission_duration,
+            "gravity_env": self.gravity_env,
+            "usable_factor": self.usable_factor,
+            "zone_areas": self.zone_areas,
+        }
+
+
+def _from_record(record: Dict[str, Any]) -> HabitatConfig:
+    return HabitatConfig(**record)
+
+
+def configs_to_array(configs: Iterable[HabitatConfig]) -> np.ndarray:
+    """
+    Packs configurations into a CONFIG_DTYPE array.
+
+    Args:
+        configs: HabitatConfig objects
+
+    Returns:
+        Structured array with one row per configuration
+    """
+    configs = list(configs)
+    array = np.zeros(len(configs), dtype=CONFIG_DTYPE)
+    for name, choices in (("shape", SHAPES), ("structure_type", STRUCTURE_TYPES), ("gravity_env", GRAVITY_ENVS)):
+        index = {choice: code for code, choice in enumerate(choices)}
+        array[name] = [index[getattr(config, name)] for config in configs]
+    for name in ("crew_size", "mission_duration", "usable_factor", "height"):
+        array[name] = [getattr(config, name) for config in configs]
+    for name in ("diameter", "length", "width"):
+        array[name] = [np.nan if getattr(config, name) is None else getattr(config, name) for config in configs]
+    zone_bits = {zone: 1 << bit for bit, zone in enumerate(ZONE_IDS)}
+    zone_column = {zone: column for column, zone in enumerate(ZONE_IDS)}
+    for row, config in enumerate(configs):
+        for zone, area in config._zones:
+            array["zone_mask"][row] |= zone_bits[zone]
+            array["zone_areas"][row, zone_column[zone]] = area
+    return array
+
+
+def config_from_record(record: np.void) -> HabitatConfig:
+    """Rebuilds one configuration from a CONFIG_DTYPE row (floats rounded to ARRAY_DECIMALS)."""
+    def number(name):
+        value = float(record[name])
+        return None if math.isnan(value) else round(value, ARRAY_DECIMALS)
+
+    mask = int(record["zone_mask"])
+    return HabitatConfig(
+        shape=SHAPES[record["shape"]],
+        structure_type=STRUCTURE_TYPES[record["structure_type"]],
+        height=number("height"),
+        crew_size=int(record["crew_size"]),
+        mission_duration=int(record["mission_duration"]),
+        gravity_env=GRAVITY_ENVS[record["gravity_env"]],
+        usable_factor=number("usable_factor"),
+        zone_areas={zone: round(float(record["zone_areas"][column]), ARRAY_DECIMALS)
+                    for column, zone in enumerate(ZONE_IDS) if mask >> column & 1},
+        diameter=number("diameter"),
+        length=number("length"),
+        width=number("width"),
+    )
+
+
+def configs_from_array(array: np.ndarray) -> List[HabitatConfig]:
+    """Rebuilds the configurations of a CONFIG_DTYPE array."""
+    return [config_from_record(record) for record in array]
+
+
+def array_columns(array: np.ndarray) -> Dict[str, Any]:
+    """
+    Columns of a CONFIG_DTYPE array in the input format of the vectorized
+    pipeline (src/core/pipeline.evaluate_columns), without building objects.
+
+    Returns:
+        Dictionary of NumPy columns plus "zone_areas" (one dict per row)
+    """
+    columns = {
+        "shape": np.asarray(SHAPES)[array["shape"]],
+        "structure_type": np.asarray(STRUCTURE_TYPES)[array["structure_type"]],
+        "gravity_env": np.asarray(GRAVITY_ENVS)[array["gravity_env"]],
+    }
+    for name in ("crew_size", "mission_duration"):
+        columns[name] = array[name].astype(float)
+    for name in ("usable_factor", "diameter", "height", "length", "width"):
+        columns[name] = np.round(array[name].astype(float), ARRAY_DECIMALS)
+    # Distinct zone selections are few: build each dict once and share it
+    areas = np.round(array["zone_areas"].astype(float), ARRAY_DECIMALS)
+    keys = np.column_stack([array["zone_mask"], areas])
+    distinct, inverse = np.unique(keys, axis=0, return_inverse=True)
+    zone_dicts = [
+        {zone: row[1 + column] for column, zone in enumerate(ZONE_IDS) if int(row[0]) >> column & 1}
+        for row in distinct.tolist()
+    ]
+    columns["zone_areas"] = [zone_dicts[index] for index in inverse.reshape(-1).tolist()]
+    return columns
@@ -0,0 +1,206 @@
+"""
+Derived habitat quantities of one configuration
+
+HabitatModel is the single place the pages read volumes, areas, NASA
+requirements, zone allocation, resources, launch figures and rule statuses
+from. Every quantity is computed on first access and memoized, so the
+components of a rerun share one computation per quantity.
+"""
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .habitat_config import HabitatConfig
+from .incremental import IncrementalValidator, ValidationState, habitat_inputs
+from .launch import calculate_launch_envelope, check_launch_feasibility
+from .nasa_calculations import calculate_mission_resources
+
+# Figures a model can build (see HabitatModel.figure)
+FIGURE_KINDS = ("layout_2d", "layout_3d")
+
+
+def _memoized(compute: Callable) -> property:
+    """Read-only property computed once per model (stored in HabitatModel._cache)."""
+    name = compute.__name__
+
+    def getter(self):
+        try:
+            return self._cache[name]
+        except KeyError:
+            value = self._cache[name] = compute(self)
+            return value
+
+    getter.__doc__ = compute.__doc__
+    return property(getter)
+
+
+class HabitatModel:
+    """
+    Lazily evaluated quantities of a habitat configuration.
+
+    The geometry, NASA requirement, zone, score and rule values come from
+    one update of an IncrementalValidator (its metric graph): pass the
+    session's validator to only recompute the nodes downstream of what
+    changed since its previous configuration.
+
+    Args:
+        config: Habitat configuration
+        validator: Validator to update (a new one by default)
+    """
+
+    __slots__ = ("config", "_validator", "_cache")
+
+    def __init__(self, config: HabitatConfig, validator: Optional[IncrementalValidator] = None):
+        self.config = config
+        self._validator = validator
+        self._cache = {}
+
+    @classmethod
+    def from_validation(cls, config: HabitatConfig, validation: ValidationState,
+                        figures: Optional[Dict[str, Any]] = None) -> "HabitatModel":
+        """
+        Model of a configuration whose validation was computed earlier (e.g. stored on disk).
+
+        Args:
+            config: Habitat configuration
+            validation: Its ValidationState
+            figures: Its already built figures by kind
+        """
+        model = cls(config)
+        model._cache["validation"] = validation
+        for kind, figure in (figures or {}).items():
+            model._cache[f"figure.{kind}"] = figure
+        return model
+
+    @_memoized
+    def validation(self) -> ValidationState:
+        """Derived values and rule statuses of the configuration."""
+        validator = self._validator if self._validator is not None else IncrementalValidator()
+        # Snapshot: a shared validator moves on with the next configuration
+        return validator.update(habitat_inputs(self.config)).snapshot()
+
+    @property
+    def values(self) -> Dict:
+        """Inputs and derived values of the configuration."""
+        return self.validation.values
+
+    @property
+    def total_volume(self) -> float:
+        """Pressurized volume (m³)."""
+        return self.values["total_volume"]
+
+    @property
+    def floor_area(self) -> float:
+        """Floor area (m²)."""
+        return self.values["floor_area"]
+
+    @property
+    def nhv(self) -> float:
+        """Net habitable volume (m³)."""
+        return self.values["nhv"]
+
+    @property
+    def nhv_per_person(self) -> float:
+        """NHV per crew member (m³)."""
+        return self.values["nhv_per_person"]
+
+    @property
+    def floor_area_per_person(self) -> float:
+        """Floor area per crew member (m²)."""
+        return self.values["floor_area_per_person"]
+
+    @property
+    def required_nhv_per_person(self) -> float:
+        """NASA minimum NHV per person for the duration and gravity (m³)."""
+        return self.values["min_nhv"]
+
+    @property
+    def zones(self) -> Dict[str, float]:
+        """Allocated area of each zone (m²)."""
+        return self.values["zones"]
+
+    @property
+    def total_zone_area(self) -> float:
+        """Sum of the allocated zone areas (m²)."""
+        return self.values["total_zone_area"]
+
+    @property
+    def valid(self) -> bool:
+        """True if no validation rule failed."""
+        return self.validation.valid
+
+    def failed(self, rule_id: str) -> bool:
+        """True if the validation rule failed."""
+        return self.validation.failed(rule_id)
+
+    @_memoized
+    def resources(self) -> Dict[str, Dict]:
+        """Daily and total mission consumables (calculate_mission_resources)."""
+        return calculate_mission_resources(self.config.crew_size, self.config.mission_duration)
+
+    @_memoized
+    def total_water(self) -> float:
+        """Potable and food-preparation water for the whole mission (kg, i.e. liters)."""
+        total = self.resources["total_mission"]
+        return total["water_potable_kg"] + total["water_food_prep_kg"]
+
+    @property
+    def structure_mass(self) -> float:
+        """Estimated structural mass (kg)."""
+        return self.values["structure_mass"]
+
+    @property
+    def habitability_score(self) -> float:
+        """Gravity-weighted habitability score."""
+        return self.values["habitability_score"]
+
+    @_memoized
+    def launch_envelope(self) -> Tuple[float, float]:
+        """Stowed (diameter, height) in the launch fairing (m)."""
+        diameter, height = calculate_launch_envelope(
+            self.config.shape, self.config.dimensions, self.config.structure_type
+        )
+        return float(diameter), float(height)
+
+    @_memoized
+    def launch_feasibility(self) -> Dict[str, Dict]:
+        """Diameter, height and mass checks per launch vehicle."""
+        return check_launch_feasibility(*self.launch_envelope, self.structure_mass)
+
+    @property
+    def design_objectives(self) -> Tuple[float, float, float]:
+        """(structural mass, NHV per person, habitability score) as in the Pareto trade study."""
+        return self.structure_mass, self.nhv_per_person, self.habitability_score
+
+    def figure(self, kind: str):
+        """
+        Plotly figure of the habitat, built once per model.
+
+        A figure stored in the persistent result cache (src.utils.result_cache)
+        is loaded from there; a new one is added to it.
+
+        Args:
+            kind: "layout_2d" (floor plan) or "layout_3d" (3D model)
+        """
+        name = f"figure.{kind}"
+        if name in self._cache:
+            return self._cache[name]
+        if kind not in FIGURE_KINDS:
+            raise ValueError(f"Unknown figure kind: {kind!r} (expected one of {', '.join(FIGURE_KINDS)})")
+        from .result_cache import get_result_cache
+        results = get_result_cache()
+        figure = results.load_figure(self.config, kind) if results is not None else None
+        if figure is None:
+            # Plotly is only imported when a figure is requested
+            from ..config.constants import ZONE_COLORS, ZONE_NAMES
+            config = self.config
+            if kind == "layout_2d":
+                from ..visualizations.layout_2d import create_2d_layout_plotly
+                figure = create_2d_layout_plotly(
+                    self.zones, self.floor_area, config.shape, config.dimensions, ZONE_COLORS, ZONE_NAMES
+                )
+            else:
+                from ..visualizations.layout_3d import create_3d_habitat_view
+                figure = create_3d_habitat_view(config.shape, config.dimensions, self.zones, ZONE_COLORS, ZONE_NAMES)
+            if results is not None:
+                results.save_figure(config, kind, figure)
+        self._cache[name] = figure
+        return figure
@@ -0,0 +1,273 @@
+"""
+Incremental validation with dependency tracking
+
+Derived values and validation rules are the nodes of one MetricGraph
+(metric_graph.py): dimensions feed volume and floor area, volume and
+usable factor feed NHV, NHV and crew feed the per-person values, and those
+feed the scores and the rules. When an input changes, only the nodes
+downstream of it are recomputed; everything else is reused from the
+previous update. A node that recomputes to the same result stops the
+propagation. The same graph evaluates batches of designs for sweeps.
+"""
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..config.constants import HABITAT_TYPES, MIN_FLOOR_AREA_PER_PERSON
+from ..config.validation_rules import VALIDATION_RULES
+from .calculations import (
+    allocate_zones,
+    calculate_box_floor_area,
+    calculate_box_volume,
+    calculate_cylinder_floor_area,
+    calculate_cylinder_volume,
+    calculate_nhv,
+)
+from .habitat_config import HabitatConfig
+from .metric_graph import MetricGraph, distinct_rows
+from .nasa_calculations import calculate_gravity_adjusted_metrics
+from .rule_engine import (
+    STATUS_FAIL,
+    STATUS_PASS,
+    STATUS_SKIPPED,
+    RuleResults,
+    _Columns,
+    compile_rules,
+    rule_inputs,
+)
+from .sizing import GRAVITY_MISSION_TYPES, required_nhv_per_person
+
+
+def _total_volume(shape, diameter, height, length, width):
+    if shape == "Cylinder":
+        return calculate_cylinder_volume(diameter, height)
+    return calculate_box_volume(length, width, height)
+
+
+def _floor_area(shape, diameter, height, length, width):
+    if shape == "Cylinder":
+        return calculate_cylinder_floor_area(diameter, height)
+    return calculate_box_floor_area(length, width)
+
+
+def _habitability_score(total_volume, floor_area, gravity_env):
+    return calculate_gravity_adjusted_metrics(total_volume, floor_area, gravity_env)["habitability_score"]
+
+
+def _floats(column) -> np.ndarray:
+    return np.asarray(column, dtype=float)
+
+
+def _total_volume_batch(shape, diameter, height, length, width):
+    height = _floats(height)
+    return np.where(shape == "Cylinder", calculate_cylinder_volume(_floats(diameter), height),
+                    calculate_box_volume(_floats(length), _floats(width), height))
+
+
+def _floor_area_batch(shape, diameter, height, length, width):
+    return np.where(shape == "Cylinder", calculate_cylinder_floor_area(_floats(diameter), _floats(height)),
+                    calculate_box_floor_area(_floats(length), _floats(width)))
+
+
+def _habitability_score_batch(total_volume, floor_area, gravity_env):
+    weights = distinct_rows(lambda gravity: _habitability_score(1.0, 0.0, gravity))(gravity_env)
+    area_weights = distinct_rows(lambda gravity: _habitability_score(0.0, 1.0, gravity))(gravity_env)
+    return _floats(total_volume) * weights + _floats(floor_area) * area_weights
+
+
+# name -> (inputs, function called with the inputs in order)
+HABITAT_DERIVED_VALUES = {
+    "total_volume": (("shape", "diameter", "height", "length", "width"), _total_volume),
+    "floor_area": (("shape", "diameter", "height", "length", "width"), _floor_area),
+    "nhv": (("total_volume", "usable_factor"), calculate_nhv),
+    "nhv_per_person": (("nhv", "crew_size"), lambda nhv, crew: nhv / crew),
+    "floor_area_per_person": (("floor_area", "crew_size"), lambda area, crew: area / crew),
+    "min_nhv": (("mission_duration", "gravity_env"), required_nhv_per_person),
+    "mission_type": (("gravity_env",), lambda gravity: GRAVITY_MISSION_TYPES.get(gravity, "surface")),
+    "ceiling_height": (("height",), lambda height: height),
+    "zones": (("floor_area", "crew_size", "zone_areas"), allocate_zones),
+    "total_zone_area": (("zones",), lambda zones: sum(zones.values())),
+    "zone_count": (("zone_areas",), len),
+    "structure_mass": (("total_volume", "structure_type"),
+                       lambda volume, structure: volume * HABITAT_TYPES[structure]["mass_per_volume"]),
+    "habitability_score": (("total_volume", "floor_area", "gravity_env"), _habitability_score),
+}
+
+# Vectorized versions of the derived values for MetricGraph.evaluate_batch
+# (the others run row by row: zone dicts, their totals and counts)
+HABITAT_BATCH_FUNCTIONS = {
+    "total_volume": _total_volume_batch,
+    "floor_area": _floor_area_batch,
+    "nhv": lambda volume, usable: _floats(volume) * _floats(usable),
+    "nhv_per_person": lambda nhv, crew: nhv / _floats(crew),
+    "floor_area_per_person": lambda area, crew: area / _floats(crew),
+    "min_nhv": distinct_rows(required_nhv_per_person),
+    "mission_type": distinct_rows(lambda gravity: GRAVITY_MISSION_TYPES.get(gravity, "surface")),
+    "ceiling_height": _floats,
+    "structure_mass": lambda volume, structure: volume * distinct_rows(
+        lambda name: HABITAT_TYPES[name]["mass_per_volume"])(structure),
+    "habitability_score": _habitability_score_batch,
+}
+
+# Inputs the configuration does not provide
+HABITAT_DEFAULTS = {"min_floor_area": MIN_FLOOR_AREA_PER_PERSON}
+
+
+def habitat_inputs(config: HabitatConfig, environment: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Flattens a configuration into the inputs of HABITAT_DERIVED_VALUES.
+
+    Args:
+        config: Configuration returned by render_config_panel (a legacy
+            configuration dict is converted with HabitatConfig.from_dict)
+        environment: Optional environmental inputs (temperature, humidity...)
+
+    Returns:
+        Flat dictionary of input values
+    """
+    if not isinstance(config, HabitatConfig):
+        environment = config.get("environment", environment)
+        config = HabitatConfig.from_dict(config)
+    inputs = config.to_record()
+    inputs.update(environment or {})
+    return inputs
+
+
+def _rule_node(predicate: Callable, names: Sequence[str]) -> Tuple[Callable, Callable]:
+    """Scalar and batch node functions returning the STATUS_* code(s) of one rule."""
+    def status(*values):
+        return int(predicate(_Columns({name: [value] for name, value in zip(names, values)}))[0])
+
+    def batch(*columns):
+        return predicate(_Columns(dict(zip(names, columns))))
+
+    return status, batch
+
+
+def build_habitat_graph(derived: Optional[Dict] = None, rules: Optional[List[Dict]] = None) -> MetricGraph:
+    """
+    Dataflow graph of the derived habitat values and validation rules.
+
+    Rule statuses are the nodes "rule.<id>". Batches of designs (for
+    example array_columns of a CONFIG_DTYPE array) are evaluated with
+    graph.evaluate_batch(columns, outputs).
+
+    Args:
+        derived: Derived values (default HABITAT_DERIVED_VALUES, with HABITAT_BATCH_FUNCTIONS)
+        rules: Validation rules (default VALIDATION_RULES)
+
+    Returns:
+        MetricGraph
+    """
+    nodes = dict(derived if derived is not None else HABITAT_DERIVED_VALUES)
+    batch = dict(HABITAT_BATCH_FUNCTIONS) if derived is None else {}
+    rules = list(rules if rules is not None else VALIDATION_RULES)
+    for rule, predicate in zip(rules, compile_rules(rules)):
+        names = tuple(sorted(rule_inputs(rule)))
+        status, status_batch = _rule_node(predicate, names)
+        nodes[f"rule.{rule['id']}"] = (names, status)
+        batch[f"rule.{rule['id']}"] = status_batch
+    return MetricGraph(nodes, batch, HABITAT_DEFAULTS)
+
+
+class ValidationState:
+    """
+    Derived values and rule statuses of one configuration.
+
+    Attributes:
+        rules: Validation rules
+        values: Inputs and derived values
+        status: uint8 array with one STATUS_* code per rule
+    """
+
+    def __init__(self, rules: List[Dict], values: Dict[str, Any], status: np.ndarray):
+        self.rules = rules
+        self._rule_index = {rule["id"]: idx for idx, rule in enumerate(rules)}
+        self.values = values
+        self.status = status
+
+    def passed(self, rule_id: str) -> bool:
+        """True if the rule passed (skipped rules do not count as passed)."""
+        return self.status[self._rule_index[rule_id]] == STATUS_PASS
+
+    def failed(self, rule_id: str) -> bool:
+        """True if the rule failed."""
+        return self.status[self._rule_index[rule_id]] == STATUS_FAIL
+
+    @property
+    def valid(self) -> bool:
+        """True if no rule failed."""
+        return not (self.status == STATUS_FAIL).any()
+
+    def results(self, group: Optional[str] = None) -> RuleResults:
+        """
+        Single-row RuleResults view (for lazy message formatting).
+
+        Args:
+            group: Only include rules of this group
+        """
+        idx = [i for i, rule in enumerate(self.rules) if group is None or rule["group"] == group]
+        columns = _Columns({name: [value] for name, value in self.values.items()})
+        return RuleResults([self.rules[i] for i in idx], self.status[idx][None, :], columns)
+
+    def messages(self, group: Optional[str] = None) -> List[str]:
+        """Messages of the failed rules."""
+        return self.results(group).messages(0)
+
+
+class IncrementalValidator(ValidationState):
+    """
+    Keeps derived values and rule statuses between updates.
+
+    Attributes:
+        graph: MetricGraph of the derived values and rules (node timings
+            and cache state: graph.describe())
+        values: Current inputs and derived values
+        status: uint8 array with one STATUS_* code per rule
+        recomputed: Derived values recomputed by the last update
+        reevaluated: Rule ids re-evaluated by the last update
+        hits: Derived values/rules reused since creation
+        misses: Derived values/rules recomputed since creation
+    """
+
+    def __init__(self, derived: Optional[Dict] = None, rules: Optional[List[Dict]] = None):
+        self.rules = list(rules if rules is not None else VALIDATION_RULES)
+        self.graph = build_habitat_graph(derived, self.rules)
+        self._rule_nodes = [f"rule.{rule['id']}" for rule in self.rules]
+        self._rule_index = {rule["id"]: idx for idx, rule in enumerate(self.rules)}
+        self.status = np.full(len(self.rules), STATUS_SKIPPED, dtype=np.uint8)
+        self.recomputed = ()
+        self.reevaluated = ()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def values(self) -> Dict[str, Any]:
+        return self.graph.values
+
+    def update(self, inputs: Dict[str, Any]) -> "IncrementalValidator":
+        """
+        Applies new input values and recomputes what depends on the changes.
+
+        Args:
+            inputs: Complete or partial input values
+
+        Returns:
+            The validator itself (for chaining)
+        """
+        stats = self.graph.stats.values()
+        hits, misses = sum(s["hits"] for s in stats), sum(s["computes"] for s in stats)
+        if self.graph.set_inputs(inputs):
+            self.graph.evaluate()
+            self.status[:] = [self.graph.get(node) for node in self._rule_nodes]
+            self.recomputed = tuple(name for name in self.graph.recomputed if not name.startswith("rule."))
+            self.reevaluated = tuple(name[len("rule."):] for name in self.graph.recomputed if name.startswith("rule."))
+        else:
+            self.recomputed = self.reevaluated = ()
+        self.hits += sum(s["hits"] for s in stats) - hits
+        self.misses += sum(s["computes"] for s in stats) - misses
+        return self
+
+    def snapshot(self) -> ValidationState:
+        """Copy of the current values and statuses (not changed by later updates)."""
+        return ValidationState(self.rules, dict(self.values), self.status.copy())
@@ -0,0 +1,210 @@
+"""
+Opt-in per-rerun instrumentation
+
+Pages wrap their stages in span(name, stage) and report cache activity with
+count(name). Measurements are only collected while a rerun profile is active
+(begin_rerun with profiling enabled); otherwise span() returns a shared no-op
+context manager and count() returns immediately, so the calls can stay in
+the hot paths.
+
+The active profile is thread-local: Streamlit runs each session's script in
+its own thread, so concurrent sessions never mix their measurements.
+"""
+import threading
+import time
+from typing import Dict, List, Optional
+
+# Stages used by the pages (any string is accepted)
+STAGE_CONFIG = "config"
+STAGE_COMPUTE = "compute"
+STAGE_VALIDATION = "validation"
+STAGE_FIGURE_BUILD = "figure_build"
+STAGE_CHART_EMIT = "chart_emit"
+STAGE_EXPORT = "export"
+
+
+class _State(threading.local):
+    profile = None  # class default keeps the disabled lookup free of AttributeError
+
+
+_state = _State()
+
+
+class RerunProfile:
+    """
+    Spans and counters collected during one script rerun.
+
+    Attributes:
+        page: Page rendered by the rerun
+        started: perf_counter() at the start of the rerun
+        spans: Finished spans (dicts with name, stage, start, duration, depth and attributes)
+        counters: Counter values by name
+    """
+
+    __slots__ = ("page", "started", "spans", "counters", "_depth")
+
+    def __init__(self, page: str):
+        self.page = page
+        self.started = time.perf_counter()
+        self.spans = []
+        self.counters = {}
+        self._depth = 0
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the start of the rerun."""
+        return time.perf_counter() - self.started
+
+    def stage_totals(self) -> Dict[str, float]:
+        """Seconds per stage, counting only outermost spans of each stage."""
+        totals = {}
+        open_stages = []
+        for span in sorted(self.spans, key=lambda s: (s["start"], -s["duration"])):
+            end = span["start"] + span["duration"]
+            open_stages = [(stage, stop) for stage, stop in open_stages if stop > span["start"]]
+            if any(stage == span["stage"] for stage, _ in open_stages):
+                continue
+            totals[span["stage"]] = totals.get(span["stage"], 0.0) + span["duration"]
+            open_stages.append((span["stage"], end))
+        return totals
+
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """Calls, hits and misses per cache (from the '<name>.calls'/'<name>.miss' counters)."""
+        stats = {}
+        for key, value in self.counters.items():
+            name, _, kind = key.rpartition(".")
+            if kind in ("calls", "miss"):
+                stats.setdefault(name, {"calls": 0, "miss": 0})[kind] = value
+        return {
+            name: {"calls": s["calls"], "hits": max(s["calls"] - s["miss"], 0), "misses": s["miss"]}
+            for name, s in stats.items()
+        }
+
+
+class _Span:
+    __slots__ = ("_profile", "_name", "_stage", "_attributes", "_start")
+
+    def __init__(self, profile: RerunProfile, name: str, stage: str, attributes: Dict):
+        self._profile = profile
+        self._name = name
+        self._stage = stage
+        self._attributes = attributes
+
+    def set(self, **attributes) -> None:
+        """Adds attributes (e.g. payload sizes) to the span."""
+        self._attributes.update(attributes)
+
+    def set_lazy(self, **producers) -> None:
+        """Adds attributes computed by zero-argument callables (skipped when off)."""
+        self._attributes.update({key: producer() for key, producer in producers.items()})
+
+    def __enter__(self) -> "_Span":
+        self._profile._depth += 1
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        duration = time.perf_counter() - self._start
+        profile = self._profile
+        profile._depth -= 1
+        record = {
+            "name": self._name,
+            "stage": self._stage,
+            "start": self._start - profile.started,
+            "duration": duration,
+            "depth": profile._depth,
+            "error": exc_type.__name__ if exc_type is not None else None,
+            **self._attributes
+        }
+        profile.spans.append(record)
+        self._attributes = record  # attributes set after the block land in the record
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def set(self, **attributes) -> None:
+        pass
+
+    def set_lazy(self, **producers) -> None:
+        pass
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def begin_rerun(page: str, enabled: bool) -> Optional[RerunProfile]:
+    """
+    Starts (or disables) instrumentation for the current rerun.
+
+    Args:
+        page: Page being rendered
+        enabled: Collect measurements for this rerun
+
+    Returns:
+        The new profile, or None when disabled
+    """
+    _state.profile = RerunProfile(page) if enabled else None
+    return _state.profile
+
+
+def end_rerun() -> Optional[RerunProfile]:
+    """Detaches and returns the current profile."""
+    profile = _state.profile
+    _state.profile = None
+    return profile
+
+
+def current_profile() -> Optional[RerunProfile]:
+    """Profile of the current rerun (None when instrumentation is off)."""
+    return _state.profile
+
+
+def span(name: str, stage: str, **attributes):
+    """
+    Times a block of code in the current rerun.
+
+    Args:
+        name: Span name (function or chart)
+        stage: One of the STAGE_* constants
+        **attributes: Extra values stored with the span
+
+    Returns:
+        Context manager (no-op when instrumentation is off)
+    """
+    profile = _state.profile
+    if profile is None:
+        return _NULL_SPAN
+    return _Span(profile, name, stage, attributes)
+
+
+def count(name: str, value: int = 1) -> None:
+    """
+    Increments a counter of the current rerun.
+
+    Cache activity uses '<cache>.calls' at the call site and '<cache>.miss'
+    inside the cached function body, which only runs on a miss.
+    """
+    profile = _state.profile
+    if profile is not None:
+        profile.counters[name] = profile.counters.get(name, 0) + value
+
+
+def summarize_spans(spans: List[Dict]) -> List[Dict]:
+    """Spans in start order, for tabular display."""
+    return [
+        {
+            "span": "  " * span["depth"] + span["name"],
+            "stage": span["stage"],
+            "ms": round(span["duration"] * 1e3, 2),
+            "start_ms": round(span["start"] * 1e3, 1)
+        }
+        for span in sorted(spans, key=lambda s: s["start"])
+    ]
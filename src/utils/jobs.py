@@ -0,0 +1,439 @@
+"""
+Background jobs for heavy computations started from the UI
+
+A Streamlit rerun must stay short: sweeps and optimizations are submitted
+to a process-wide JobRunner instead, which runs them outside the script run
+and keeps their state. The page stores the returned Job handle in session
+state, so the job keeps running across reruns and page changes, and polls it
+for its latest progress report.
+
+A job is a function returning either a value (the result) or an iterator
+(every item is a progress report with the partial result, the last one is
+the result), like the generators of src.core.optimize. Iterator jobs can be
+cancelled between items and yield to foreground reruns between items.
+Functions submitted with process=True run in a process pool (their thread
+waits for them), for pure Python work that would hold the GIL.
+
+Scheduling: every job has its own thread, but only JOB_WORKERS of them hold
+a run slot at a time. Free slots go to the "interactive" class first (jobs
+estimated under INTERACTIVE_SECONDS), then "batch"; within a class to the
+session with the fewest running jobs and the least slot time used since
+it last had no unfinished job (fair share). A running iterator job gives its slot back between items when
+a job of a higher class, or of a session with fewer running jobs, waits.
+
+Admission: a session may have JOB_SESSION_LIMIT unfinished jobs; each class
+accepts a bounded number of waiting jobs (queue_limits) and, when
+HABITAT_JOB_SHED_LOAD is set, batch jobs are refused while the load average
+per CPU exceeds it. Refused jobs raise JobLimitReached with the reason and
+an estimated wait.
+"""
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from .prefetch import FOREGROUND, lower_thread_priority
+
+JOB_WORKERS = int(os.environ.get("HABITAT_JOB_WORKERS", "2"))  # jobs running at the same time
+JOB_SESSION_LIMIT = int(os.environ.get("HABITAT_JOB_SESSION_LIMIT", "2"))  # unfinished jobs per session
+JOB_QUEUE_LIMIT = int(os.environ.get("HABITAT_JOB_QUEUE_LIMIT", "16"))  # waiting batch jobs in the process
+JOB_SHED_LOAD = float(os.environ.get("HABITAT_JOB_SHED_LOAD", "0"))  # load average per CPU (0 = off)
+JOB_RETAINED = 20  # finished jobs kept per session before the oldest is forgotten
+JOB_BATCH_NICENESS = 5  # added to the nice value of batch job threads where supported
+FINAL_STATES = ("done", "cancelled", "failed")
+
+# Priority classes, served in this order
+PRIORITY_CLASSES = ("interactive", "batch")
+INTERACTIVE_SECONDS = 0.1  # estimated run time below which a job is interactive
+DEFAULT_QUEUE_LIMITS = {"interactive": 2 * JOB_QUEUE_LIMIT, "batch": JOB_QUEUE_LIMIT}
+_RATE_SMOOTHING = 0.3  # weight of the latest job in the seconds-per-unit averages
+
+
+class JobLimitReached(Exception):
+    """
+    Raised by JobRunner.submit when a job is not admitted.
+
+    Attributes:
+        reason: "session_limit", "queue_full" or "overloaded"
+        retry_after: Estimated seconds until the job would be admitted (None if unknown)
+    """
+
+    def __init__(self, message: str, reason: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Job:
+    """
+    Handle and state of one background job.
+
+    Only the job's thread writes the state; readers (the pages) see each
+    attribute change atomically.
+
+    Args:
+        job_id: Identifier, unique in the process
+        owner: Who submitted it (a session id)
+        label: Short description shown in the UI
+        priority: One of PRIORITY_CLASSES
+        kind: Kind of work, for run time estimates (e.g. the function name)
+        cost: Size of the work in units of the kind (e.g. designs), if known
+    """
+
+    def __init__(self, job_id: str, owner: Hashable, label: str, priority: str = "batch",
+                 kind: Optional[str] = None, cost: Optional[float] = None):
+        self.id = job_id
+        self.owner = owner
+        self.label = label
+        self.priority = priority
+        self.kind = kind
+        self.cost = cost
+        self.status = "queued"
+        self.progress: Any = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.reports = 0
+        self.yields = 0
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.waited = 0.0  # seconds spent waiting for a slot (before the start and after yields)
+        self.paused = 0.0  # part of waited after the start
+        self.cancel_requested = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.status in FINAL_STATES
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since it first started (so far, or until it finished)."""
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    def cancel(self):
+        """Asks the job to stop (iterator jobs stop before their next item)."""
+        self.cancel_requested.set()
+
+    def __repr__(self) -> str:
+        return f"Job({self.id!r}, {self.label!r}, status={self.status!r}, priority={self.priority!r})"
+
+
+class JobRunner:
+    """
+    Admits, schedules and runs jobs (see the module docstring).
+
+    Args:
+        workers: Jobs holding a run slot at the same time
+        session_limit: Unfinished jobs allowed per owner
+        queue_limits: Waiting jobs allowed per priority class
+        shed_load: Load average per CPU above which batch jobs are refused (0 = never)
+        retained: Finished jobs kept per owner (until it is gone, see prune_owners)
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS, session_limit: int = JOB_SESSION_LIMIT,
+                 queue_limits: Optional[Dict[str, int]] = None, shed_load: float = JOB_SHED_LOAD,
+                 retained: int = JOB_RETAINED):
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1, got {workers}")
+        self.workers = workers
+        self.session_limit = session_limit
+        self.queue_limits = {**DEFAULT_QUEUE_LIMITS, **(queue_limits or {})}
+        self.shed_load = shed_load
+        self.retained = retained
+        self._processes: Optional[ProcessPoolExecutor] = None
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._ids = itertools.count(1)
+        self._cond = threading.Condition()
+        self._waiting: List[Job] = []
+        self._slots = 0
+        self._running: Dict[Hashable, int] = {}
+        self._service: Dict[Hashable, float] = {}  # slot seconds used per owner with unfinished jobs
+        self._slot_started: Dict[str, float] = {}
+        self._seconds_per_unit: Dict[str, float] = {}
+        self._mean_seconds: Optional[float] = None
+        self._admission = {"admitted": 0, "interactive": 0, "batch": 0, "session_limit": 0,
+                           "queue_full": 0, "overloaded": 0, "yields": 0, "wait_seconds": 0.0}
+
+    def estimate(self, kind: Optional[str], cost: Optional[float]) -> Optional[float]:
+        """Expected run time (s) from the jobs of the same kind finished so far (None if unknown)."""
+        rate = self._seconds_per_unit.get(kind)
+        if rate is None or cost is None:
+            return None
+        return rate * cost
+
+    def classify(self, kind: Optional[str], cost: Optional[float]) -> str:
+        """"interactive" when the job is expected to take under INTERACTIVE_SECONDS, else "batch"."""
+        estimate = self.estimate(kind, cost)
+        return "interactive" if estimate is not None and estimate < INTERACTIVE_SECONDS else "batch"
+
+    def submit(self, owner: Hashable, label: str, func: Callable, *args, priority: Optional[str] = None,
+               kind: Optional[str] = None, cost: Optional[float] = None, process: bool = False,
+               **kwargs) -> Job:
+        """
+        Admits func(*args, **kwargs) as a job and queues it.
+
+        Args:
+            owner: Who submits it (the session id: limits and fair share apply to it)
+            label: Short description shown in the UI
+            func: Function returning the result, or an iterator of progress reports
+            priority: One of PRIORITY_CLASSES (default: classify(kind, cost))
+            kind: Kind of work for run time estimates (default: the function name)
+            cost: Size of the work (e.g. designs), for run time estimates
+            process: Run func in a worker process (args and result must be picklable;
+                iterators are not supported there)
+
+        Returns:
+            The Job handle
+
+        Raises:
+            ValueError: Unknown priority class
+            JobLimitReached: The job was not admitted (reason and retry_after on the exception)
+        """
+        kind = kind or getattr(func, "__name__", None)
+        priority = priority or self.classify(kind, cost)
+        if priority not in PRIORITY_CLASSES:
+            raise ValueError(f"Unknown priority '{priority}' (choose from {', '.join(PRIORITY_CLASSES)})")
+        with self._cond:
+            active = [job for job in self._jobs.values() if not job.done]
+            if sum(job.owner == owner for job in active) >= self.session_limit:
+                self._refuse(f"At most {self.session_limit} background job(s) per session: "
+                             "wait for one to finish or cancel it", "session_limit")
+            waiting = [job for job in self._waiting if job.priority == priority]
+            if len(waiting) >= self.queue_limits[priority]:
+                self._refuse(f"Server busy: {len(waiting)} {priority} job(s) waiting", "queue_full",
+                             self._wait_estimate(priority))
+            if priority == "batch" and self._overloaded():
+                self._refuse("Server overloaded: heavy jobs are paused, try again shortly", "overloaded",
+                             self._wait_estimate(priority))
+            job = Job(f"job-{next(self._ids)}", owner, label, priority, kind, cost)
+            self._jobs[job.id] = job
+            self._waiting.append(job)
+            self._admission["admitted"] += 1
+            self._admission[priority] += 1
+            self._forget_finished(owner)
+        threading.Thread(target=self._run, args=(job, func, args, kwargs, process),
+                         name=f"habitat-{job.id}", daemon=True).start()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def jobs_of(self, owner: Hashable) -> List[Job]:
+        """Jobs of an owner, oldest first."""
+        with self._cond:
+            return [job for job in self._jobs.values() if job.owner == owner]
+
+    def prune_owners(self, is_active: Callable[[Hashable], bool]) -> int:
+        """
+        Forgets the finished jobs of owners that are gone (closed sessions).
+
+        Args:
+            is_active: True for an owner that still exists
+
+        Returns:
+            Jobs forgotten
+        """
+        with self._cond:
+            owners = {job.owner for job in self._jobs.values() if job.done}
+            gone = {owner for owner in owners if not is_active(owner)}
+            finished = [job_id for job_id, job in self._jobs.items() if job.done and job.owner in gone]
+            for job_id in finished:
+                del self._jobs[job_id]
+        return len(finished)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        if job is not None and not job.done:
+            job.cancel()
+            with self._cond:
+                self._cond.notify_all()  # a waiting job leaves the queue right away
+        return job
+
+    def stats(self) -> Dict[str, Any]:
+        """Job counts by status, slot usage, queue depths and admission counters."""
+        with self._cond:
+            counts = {"queued": 0, "running": 0, "done": 0, "cancelled": 0, "failed": 0}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            depths = {f"waiting_{priority}": sum(job.priority == priority for job in self._waiting)
+                      for priority in PRIORITY_CLASSES}
+            return {"workers": self.workers, "slots_used": self._slots, **counts, **depths,
+                    **{f"admission_{name}": value for name, value in self._admission.items()}}
+
+    def shutdown(self):
+        for job in list(self._jobs.values()):
+            job.cancel()
+        with self._cond:
+            self._cond.notify_all()
+        if self._processes is not None:
+            self._processes.shutdown(wait=False, cancel_futures=True)
+
+    def _refuse(self, message: str, reason: str, retry_after: Optional[float] = None):
+        self._admission[reason] += 1
+        if retry_after is not None:
+            message += f" (about {retry_after:.0f} s)"
+        raise JobLimitReached(message, reason, retry_after)
+
+    def _overloaded(self) -> bool:
+        if self.shed_load <= 0:
+            return False
+        try:
+            return os.getloadavg()[0] / (os.cpu_count() or 1) > self.shed_load
+        except (AttributeError, OSError):  # no load average on this platform
+            return False
+
+    def _wait_estimate(self, priority: str) -> Optional[float]:
+        """Seconds until the waiting jobs of the class and above have run (None if unknown)."""
+        if self._mean_seconds is None:
+            return None
+        rank = PRIORITY_CLASSES.index(priority)
+        ahead = [job for job in self._waiting if PRIORITY_CLASSES.index(job.priority) <= rank]
+        seconds = sum(self.estimate(job.kind, job.cost) or self._mean_seconds for job in ahead)
+        return seconds / self.workers
+
+    def _forget_finished(self, owner: Hashable):
+        finished = [job.id for job in self._jobs.values() if job.owner == owner and job.done]
+        for job_id in finished[:max(0, len(finished) - self.retained)]:
+            del self._jobs[job_id]
+
+    def _process_pool(self) -> ProcessPoolExecutor:
+        with self._cond:
+            if self._processes is None:
+                self._processes = ProcessPoolExecutor(max_workers=self.workers)
+            return self._processes
+
+    def _next(self) -> Optional[Job]:
+        """Waiting job that gets the next free slot: class, then fair share, then arrival."""
+        return min(
+            self._waiting,
+            key=lambda job: (PRIORITY_CLASSES.index(job.priority), self._running.get(job.owner, 0),
+                             self._service.get(job.owner, 0.0), job.created),
+            default=None
+        )
+
+    def _acquire(self, job: Job) -> bool:
+        """Blocks until the job gets a slot (False if it was cancelled while waiting)."""
+        waiting_since = time.perf_counter()
+        with self._cond:
+            self._cond.wait_for(
+                lambda: job.cancel_requested.is_set() or (self._slots < self.workers and self._next() is job)
+            )
+            self._waiting.remove(job)
+            waited = time.perf_counter() - waiting_since
+            job.waited += waited
+            self._admission["wait_seconds"] += waited
+            if job.cancel_requested.is_set():
+                self._cond.notify_all()
+                return False
+            self._slots += 1
+            self._running[job.owner] = self._running.get(job.owner, 0) + 1
+            self._slot_started[job.id] = time.perf_counter()
+        job.status = "running"
+        return True
+
+    def _release(self, job: Job):
+        with self._cond:
+            self._slots -= 1
+            self._running[job.owner] -= 1
+            if not self._running[job.owner]:
+                del self._running[job.owner]
+            used = time.perf_counter() - self._slot_started.pop(job.id)
+            self._service[job.owner] = self._service.get(job.owner, 0.0) + used
+            self._cond.notify_all()
+
+    def _should_yield(self, job: Job) -> bool:
+        """True when a waiting job of a higher class, or of a session with fewer running jobs, needs the slot."""
+        with self._cond:
+            if self._slots < self.workers:
+                return False
+            rank = PRIORITY_CLASSES.index(job.priority)
+            running = self._running.get(job.owner, 0)
+            return any(
+                PRIORITY_CLASSES.index(other.priority) < rank
+                or (other.priority == job.priority and self._running.get(other.owner, 0) + 1 < running)
+                for other in self._waiting
+            )
+
+    def _yield_slot(self, job: Job) -> bool:
+        """Gives the slot to the job that needs it and waits for a new one."""
+        self._release(job)
+        job.yields += 1
+        job.status = "queued"
+        with self._cond:
+            self._admission["yields"] += 1
+            self._waiting.append(job)
+        waited = job.waited
+        acquired = self._acquire(job)
+        job.paused += job.waited - waited
+        return acquired
+
+    def _finish(self, job: Job, status: str):
+        job.finished = time.time()
+        job.status = status
+        with self._cond:
+            if not any(other.owner == job.owner and not other.done for other in self._jobs.values()):
+                # An idle owner starts its next jobs without the slot time of the old ones
+                self._service.pop(job.owner, None)
+        if status == "done" and job.started is not None:
+            seconds = job.finished - job.started - job.paused
+            with self._cond:
+                self._mean_seconds = seconds if self._mean_seconds is None else \
+                    (1 - _RATE_SMOOTHING) * self._mean_seconds + _RATE_SMOOTHING * seconds
+                if job.kind is not None and job.cost:
+                    rate = seconds / job.cost
+                    previous = self._seconds_per_unit.get(job.kind)
+                    self._seconds_per_unit[job.kind] = rate if previous is None else \
+                        (1 - _RATE_SMOOTHING) * previous + _RATE_SMOOTHING * rate
+
+    def _run(self, job: Job, func: Callable, args, kwargs, process: bool):
+        """Job thread: waits for a slot, runs the job and records its progress and outcome."""
+        if job.priority == "batch":
+            lower_thread_priority(JOB_BATCH_NICENESS)
+        if not self._acquire(job):
+            self._finish(job, "cancelled")
+            return
+        job.started = time.time()
+        holding = True
+        try:
+            if process:
+                job.result = self._process_pool().submit(func, *args, **kwargs).result()
+            else:
+                outcome = func(*args, **kwargs)
+                if hasattr(outcome, "__next__"):
+                    for report in outcome:
+                        job.progress = job.result = report
+                        job.reports += 1
+                        if not job.cancel_requested.is_set() and self._should_yield(job):
+                            holding = self._yield_slot(job)
+                        if job.cancel_requested.is_set():
+                            getattr(outcome, "close", lambda: None)()
+                            break
+                        FOREGROUND.wait_idle()  # reruns of every session go first
+                else:
+                    job.result = outcome
+        except Exception as exc:  # reported in the UI
+            job.error = f"{type(exc).__name__}: {exc}"
+            self._finish(job, "failed")
+            return
+        finally:
+            if holding:
+                self._release(job)
+        self._finish(job, "cancelled" if job.cancel_requested.is_set() else "done")
+
+
+_runner: Optional[JobRunner] = None
+_runner_lock = threading.Lock()
+
+
+def get_job_runner() -> JobRunner:
+    """Process-wide job runner (settings from HABITAT_JOB_* on first use)."""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = JobRunner()
+        return _runner
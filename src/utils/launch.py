@@ -0,0 +1,172 @@
+"""
+Structural mass and launch manifest estimation
+
+Every function accepts scalars or NumPy arrays so whole dimension sweeps can
+be checked against the fairing envelopes in one call.
+
+Reference: Moon to Mars Architecture Definition Document (launch envelopes)
+and Review of Habitable Softgoods Inflatable Design (stowed vs deployed).
+"""
+from typing import Dict, List
+
+import numpy as np
+
+from ..config.constants import HABITAT_TYPES, LAUNCH_VEHICLES
+
+
+def calculate_structure_mass(total_volume, structure_type: str):
+    """
+    Estimates the structural mass from the pressurized volume.
+
+    Args:
+        total_volume: Pressurized volume (m³, scalar or array)
+        structure_type: Key of HABITAT_TYPES ('rigid' or 'inflatable')
+
+    Returns:
+        Mass in kg
+    """
+    return np.asarray(total_volume, dtype=float) * HABITAT_TYPES[structure_type]["mass_per_volume"]
+
+
+def calculate_launch_envelope(shape: str, dimensions: Dict, structure_type: str):
+    """
+    Computes the stowed envelope (diameter, height) a module occupies in the fairing.
+
+    Cylinders fly axis-aligned with the fairing. Rectangular modules fly with
+    their longest side along the fairing axis and the diagonal of the other
+    two sides across it. Inflatables are scaled by their stowed ratios.
+
+    Args:
+        shape: "Cylinder" or "Rectangular"
+        dimensions: Deployed dimensions (scalars or arrays)
+        structure_type: Key of HABITAT_TYPES
+
+    Returns:
+        Tuple (envelope_diameter, envelope_height) in meters
+    """
+    habitat = HABITAT_TYPES[structure_type]
+
+    if shape == "Cylinder":
+        diameter = np.asarray(dimensions["diameter"], dtype=float)
+        height = np.asarray(dimensions["height"], dtype=float)
+    else:
+        sides = np.sort(np.stack(np.broadcast_arrays(
+            np.asarray(dimensions["length"], dtype=float),
+            np.asarray(dimensions["width"], dtype=float),
+            np.asarray(dimensions["height"], dtype=float)
+        )), axis=0)
+        diameter = np.hypot(sides[0], sides[1])
+        height = sides[2]
+
+    return (
+        diameter * habitat["stowed_diameter_ratio"],
+        height * habitat["stowed_height_ratio"]
+    )
+
+
+def check_launch_feasibility(envelope_diameter, envelope_height, mass) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Checks diameter, height and payload mass against every launch vehicle.
+
+    Args:
+        envelope_diameter: Stowed diameter (m)
+        envelope_height: Stowed height (m)
+        mass: Module mass (kg)
+
+    Returns:
+        Dictionary per vehicle with fits_diameter, fits_height, fits_mass and feasible
+    """
+    envelope_diameter = np.asarray(envelope_diameter, dtype=float)
+    envelope_height = np.asarray(envelope_height, dtype=float)
+    mass = np.asarray(mass, dtype=float)
+
+    results = {}
+    for vehicle_id, vehicle in LAUNCH_VEHICLES.items():
+        fits_diameter = envelope_diameter <= vehicle["max_diameter"]
+        fits_height = envelope_height <= vehicle["max_height"]
+        fits_mass = mass <= vehicle["max_payload_kg"]
+        results[vehicle_id] = {
+            "fits_diameter": fits_diameter,
+            "fits_height": fits_height,
+            "fits_mass": fits_mass,
+            "feasible": fits_diameter & fits_height & fits_mass
+        }
+    return results
+
+
+def estimate_launch_count(envelope_diameter, envelope_height, mass, n_modules) -> Dict[str, np.ndarray]:
+    """
+    Estimates launches needed for a base of identical modules.
+
+    Modules are stacked along the fairing axis until either the height or the
+    payload mass limit is reached.
+
+    Args:
+        envelope_diameter: Stowed diameter per module (m)
+        envelope_height: Stowed height per module (m)
+        mass: Mass per module (kg)
+        n_modules: Number of modules in the base
+
+    Returns:
+        Launches per vehicle (-1 where a single module does not fit)
+    """
+    envelope_diameter = np.asarray(envelope_diameter, dtype=float)
+    envelope_height = np.asarray(envelope_height, dtype=float)
+    mass = np.asarray(mass, dtype=float)
+    n_modules = np.asarray(n_modules)
+
+    launches = {}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for vehicle_id, vehicle in LAUNCH_VEHICLES.items():
+            per_launch = np.minimum(
+                np.floor(vehicle["max_height"] / envelope_height),
+                np.floor(vehicle["max_payload_kg"] / mass)
+            )
+            per_launch = np.where(envelope_diameter <= vehicle["max_diameter"], per_launch, 0)
+            count = np.ceil(n_modules / np.maximum(per_launch, 1))
+            launches[vehicle_id] = np.where(per_launch >= 1, count, -1).astype(np.int64)
+    return launches
+
+
+def plan_launch_manifest(modules: List[Dict], vehicle_id: str) -> Dict[str, any]:
+    """
+    Packs a heterogeneous multi-module base into launches (first-fit decreasing).
+
+    Args:
+        modules: List of dicts with name, envelope_diameter, envelope_height and mass_kg
+        vehicle_id: Key of LAUNCH_VEHICLES
+
+    Returns:
+        Dictionary with the launches (module names, used height and mass) and
+        the modules that do not fit the vehicle at all
+    """
+    vehicle = LAUNCH_VEHICLES[vehicle_id]
+    launches = []
+    unfit = []
+
+    ordered = sorted(modules, key=lambda m: (m["envelope_height"], m["mass_kg"]), reverse=True)
+    for module in ordered:
+        if (module["envelope_diameter"] > vehicle["max_diameter"]
+                or module["envelope_height"] > vehicle["max_height"]
+                or module["mass_kg"] > vehicle["max_payload_kg"]):
+            unfit.append(module["name"])
+            continue
+
+        for launch in launches:
+            if (launch["height_m"] + module["envelope_height"] <= vehicle["max_height"]
+                    and launch["mass_kg"] + module["mass_kg"] <= vehicle["max_payload_kg"]):
+                break
+        else:
+            launch = {"modules": [], "height_m": 0.0, "mass_kg": 0.0}
+            launches.append(launch)
+
+        launch["modules"].append(module["name"])
+        launch["height_m"] += module["envelope_height"]
+        launch["mass_kg"] += module["mass_kg"]
+
+    return {
+        "vehicle": vehicle["name"],
+        "launch_count": len(launches),
+        "launches": launches,
+        "unfit_modules": unfit
+    }
@@ -0,0 +1,277 @@
+"""
+Dataflow graph of derived metrics
+
+Each node declares the inputs (or other nodes) it reads and the function
+computing it. Values are pulled lazily: a node is recomputed only if one of
+its upstream values changed since it was last checked, and a node that
+recomputes to the same value does not invalidate its own dependents. The
+same graph evaluates whole batches of designs column by column, and every
+node keeps its timings and cache state for inspection.
+"""
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+# Errors of a node function that mean "missing or invalid inputs": the node is None
+NODE_ERRORS = (TypeError, ValueError, ZeroDivisionError, KeyError)
+
+
+def _topological_order(derived: Dict[str, Tuple[Sequence[str], Callable]]) -> List[str]:
+    order = []
+    state = {}
+
+    def visit(name):
+        if state.get(name) == "done" or name not in derived:
+            return
+        if state.get(name) == "visiting":
+            raise ValueError(f"Cycle in derived values at '{name}'")
+        state[name] = "visiting"
+        for dep in derived[name][0]:
+            visit(dep)
+        state[name] = "done"
+        order.append(name)
+
+    for name in derived:
+        visit(name)
+    return order
+
+
+def _same(old, new) -> bool:
+    try:
+        return bool(old == new)
+    except (TypeError, ValueError):
+        return old is new
+
+
+def _call(compute: Callable, args: Sequence):
+    try:
+        return compute(*args)
+    except NODE_ERRORS:
+        return None
+
+
+def _as_column(values: List) -> np.ndarray:
+    """Float array for numeric results (None as NaN), object array otherwise."""
+    if all(value is None or (isinstance(value, (int, float, np.number)) and not isinstance(value, bool))
+           for value in values):
+        return np.array([np.nan if value is None else value for value in values], dtype=float)
+    column = np.empty(len(values), dtype=object)
+    for row, value in enumerate(values):
+        column[row] = value
+    return column
+
+
+def _broadcast(value, size: int) -> np.ndarray:
+    """Column of the batch size (scalars are repeated)."""
+    if isinstance(value, np.ndarray) and value.ndim == 1 and len(value) == size:
+        return value
+    if isinstance(value, (list, tuple)) and len(value) == size:
+        return _as_column(list(value))
+    if isinstance(value, np.ndarray) and value.ndim == 0:
+        value = value.item()
+    if isinstance(value, (bool, int, float, np.number)):
+        return np.full(size, value)
+    column = np.empty(size, dtype=object)
+    column.fill(value)
+    return column
+
+
+def map_rows(func: Callable) -> Callable:
+    """Batch version of a scalar node function: called row by row (errors give None)."""
+    def batch(*columns):
+        return _as_column([_call(func, row) for row in zip(*(column.tolist() for column in columns))])
+    return batch
+
+
+def distinct_rows(func: Callable) -> Callable:
+    """Batch version of a scalar node function called once per distinct row of its inputs."""
+    def batch(*columns):
+        results = {}
+        rows = list(zip(*(column.tolist() for column in columns)))
+        for row in rows:
+            if row not in results:
+                results[row] = _call(func, row)
+        return _as_column([results[row] for row in rows])
+    return batch
+
+
+class MetricGraph:
+    """
+    Lazily evaluated, incrementally updated graph of derived values.
+
+    Args:
+        nodes: name -> (names read, function called with their values in order)
+        batch: name -> function of the same inputs as NumPy columns, used by
+            evaluate_batch (nodes without one run row by row)
+        defaults: Values of inputs that are not set
+
+    Attributes:
+        inputs: Names read by the nodes that are not nodes themselves
+        order: Nodes in dependency order
+        dependents: Node or input -> nodes reading it
+        revision: Incremented whenever set_inputs changes a value
+        recomputed: Nodes recomputed since the last change of the inputs
+    """
+
+    def __init__(self, nodes: Dict[str, Tuple[Sequence[str], Callable]],
+                 batch: Optional[Dict[str, Callable]] = None, defaults: Optional[Dict[str, Any]] = None):
+        self._nodes = {name: (tuple(deps), compute) for name, (deps, compute) in nodes.items()}
+        self._batch = dict(batch or {})
+        self._defaults = dict(defaults or {})
+        self.order = _topological_order(self._nodes)
+        self.dependents = {}
+        for name in self.order:
+            for dep in self._nodes[name][0]:
+                self.dependents.setdefault(dep, []).append(name)
+        self.inputs = sorted(set(self.dependents) - set(self._nodes))
+        self.revision = 0
+        self.recomputed = []
+        self._values = dict(self._defaults)
+        self._changed_at = {}
+        self._verified_at = {}
+        self.stats = {name: {"computes": 0, "hits": 0, "seconds": 0.0, "last_seconds": 0.0, "batch_seconds": 0.0}
+                      for name in self.order}
+
+    @property
+    def values(self) -> Dict[str, Any]:
+        """Inputs and the node values computed so far (not refreshed: see evaluate)."""
+        return self._values
+
+    def set_inputs(self, inputs: Dict[str, Any]) -> Set[str]:
+        """
+        Sets input values; nodes downstream of a changed value become stale.
+
+        Args:
+            inputs: Complete or partial input values
+
+        Returns:
+            Names whose value changed
+        """
+        changed = {
+            name for name, value in inputs.items()
+            if name not in self._values or not _same(self._values[name], value)
+        }
+        if changed:
+            self.revision += 1
+            self.recomputed = []
+            for name in changed:
+                self._values[name] = inputs[name]
+                self._changed_at[name] = self.revision
+        return changed
+
+    def get(self, name: str):
+        """Current value of an input or node (computing stale nodes it depends on)."""
+        if name in self._nodes:
+            self._pull(name)
+        return self._values.get(name)
+
+    def evaluate(self, names: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Brings the given nodes (default: all) up to date.
+
+        Returns:
+            The values dict (inputs and nodes)
+        """
+        for name in (self.order if names is None else names):
+            self.get(name)
+        return self._values
+
+    def _pull(self, name: str):
+        if self._verified_at.get(name) == self.revision:
+            return
+        deps, compute = self._nodes[name]
+        for dep in deps:
+            if dep in self._nodes:
+                self._pull(dep)
+        stats = self.stats[name]
+        verified = self._verified_at.get(name)
+        if verified is not None and all(self._changed_at.get(dep, 0) <= verified for dep in deps):
+            stats["hits"] += 1
+        else:
+            start = time.perf_counter()
+            value = _call(compute, [self._values.get(dep) for dep in deps])
+            elapsed = time.perf_counter() - start
+            stats["computes"] += 1
+            stats["seconds"] += elapsed
+            stats["last_seconds"] = elapsed
+            self.recomputed.append(name)
+            if verified is None or not _same(self._values.get(name), value):
+                self._changed_at[name] = self.revision
+            self._values[name] = value
+        self._verified_at[name] = self.revision
+
+    def downstream(self, name: str) -> List[str]:
+        """Nodes invalidated by a change of the input or node (in dependency order)."""
+        reached = set()
+        pending = [name]
+        while pending:
+            for dependent in self.dependents.get(pending.pop(), ()):
+                if dependent not in reached:
+                    reached.add(dependent)
+                    pending.append(dependent)
+        return [node for node in self.order if node in reached]
+
+    def upstream(self, names: Iterable[str]) -> List[str]:
+        """Nodes needed to compute the given nodes (themselves included, in dependency order)."""
+        reached = set()
+        pending = [name for name in names if name in self._nodes]
+        while pending:
+            name = pending.pop()
+            if name not in reached:
+                reached.add(name)
+                pending.extend(dep for dep in self._nodes[name][0] if dep in self._nodes)
+        return [node for node in self.order if node in reached]
+
+    def state(self, name: str) -> str:
+        """"fresh", "stale" (an upstream value changed since) or "unevaluated"."""
+        verified = self._verified_at.get(name)
+        if verified is None:
+            return "unevaluated"
+        if verified == self.revision:
+            return "fresh"
+        stale = any(self._changed_at.get(dep, 0) > verified for dep in self._inputs_of(name))
+        return "stale" if stale else "fresh"
+
+    def _inputs_of(self, name: str) -> Set[str]:
+        return {dep for node in self.upstream([name]) for dep in self._nodes[node][0] if dep not in self._nodes}
+
+    def describe(self) -> List[Dict[str, Any]]:
+        """One row per node: inputs, dependents, cache state, compute count and timings."""
+        return [
+            {
+                "node": name,
+                "inputs": ", ".join(self._nodes[name][0]),
+                "dependents": len(self.dependents.get(name, ())),
+                "state": self.state(name),
+                "computes": self.stats[name]["computes"],
+                "hits": self.stats[name]["hits"],
+                "last_ms": round(self.stats[name]["last_seconds"] * 1e3, 3),
+                "total_ms": round(self.stats[name]["seconds"] * 1e3, 3),
+                "batch_ms": round(self.stats[name]["batch_seconds"] * 1e3, 3),
+            }
+            for name in self.order
+        ]
+
+    def evaluate_batch(self, columns: Dict[str, Any], outputs: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        Evaluates the graph for a batch of designs (does not touch the incremental state).
+
+        Args:
+            columns: Column (or scalar shared by every row) per input
+            outputs: Nodes to return (default: all); only their upstream nodes run
+
+        Returns:
+            Column per requested node
+        """
+        outputs = list(self.order if outputs is None else outputs)
+        size = max((len(value) for value in columns.values() if isinstance(value, (list, tuple, np.ndarray))), default=1)
+        values = {name: _broadcast(value, size) for name, value in {**self._defaults, **columns}.items()}
+        missing = _broadcast(None, size)
+        for name in self.upstream(outputs):
+            deps, compute = self._nodes[name]
+            start = time.perf_counter()
+            batch = self._batch.get(name) or map_rows(compute)
+            values[name] = _broadcast(batch(*(values.get(dep, missing) for dep in deps)), size)
+            self.stats[name]["batch_seconds"] += time.perf_counter() - start
+        return {name: values[name] for name in outputs}
@@ -0,0 +1,363 @@
+"""
+Pareto-front extraction for habitat trade studies
+
+Objectives evaluated per design:
+- structural mass (kg, minimized) from HABITAT_TYPES mass_per_volume
+- NHV per person (m³, maximized)
+- habitability score (maximized) from calculate_gravity_adjusted_metrics
+
+All dominance tests are done on minimization arrays; maximized objectives
+are negated internally.
+"""
+import bisect
+from typing import Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .calculations import (
+    calculate_box_floor_area,
+    calculate_box_volume,
+    calculate_cylinder_floor_area,
+    calculate_cylinder_volume,
+    calculate_nhv,
+)
+from .launch import calculate_structure_mass
+from .nasa_calculations import calculate_gravity_adjusted_metrics
+
+OBJECTIVE_NAMES = ("mass_kg", "nhv_per_person_m3", "habitability_score")
+OBJECTIVE_MAXIMIZE = (False, True, True)
+
+# Upper bound on elements of one (block, front) comparison matrix
+_MAX_COMPARE_ELEMENTS = 4_000_000
+# Front points used to screen the whole sweep after the first block
+_ELITE_SIZE = 64
+_SCREEN_CHUNK = 50_000
+
+
+def _as_minimization(points, maximize: Optional[Sequence[bool]]) -> np.ndarray:
+    points = np.asarray(points, dtype=float)
+    if points.ndim != 2:
+        raise ValueError("points must be a 2D array (n_designs, n_objectives)")
+    if maximize is not None:
+        if len(maximize) != points.shape[1]:
+            raise ValueError("maximize must have one flag per objective")
+        sign = np.where(np.asarray(maximize, dtype=bool), -1.0, 1.0)
+        points = points * sign
+    return points
+
+
+def _unique_rows(points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Like np.unique(axis=0, return_inverse=True) without the structured-view sort."""
+    order = np.lexsort(points.T[::-1])
+    sorted_points = points[order]
+    new_row = np.ones(len(points), dtype=bool)
+    new_row[1:] = np.any(sorted_points[1:] != sorted_points[:-1], axis=1)
+    inverse = np.empty(len(points), dtype=np.int64)
+    inverse[order] = np.cumsum(new_row) - 1
+    return sorted_points[new_row], inverse
+
+
+def _front_2d(points: np.ndarray) -> np.ndarray:
+    """O(n log n) front for two objectives; points must be unique rows."""
+    order = np.lexsort((points[:, 1], points[:, 0]))
+    f1 = points[order, 1]
+    prev_min = np.empty_like(f1)
+    prev_min[0] = np.inf
+    np.minimum.accumulate(f1[:-1], out=prev_min[1:])
+    mask = np.zeros(len(points), dtype=bool)
+    mask[order[f1 < prev_min]] = True
+    return mask
+
+
+def _dominated_by(front: np.ndarray, block: np.ndarray) -> np.ndarray:
+    """Mask of block rows weakly dominated by at least one front row."""
+    dominated = np.zeros(len(block), dtype=bool)
+    if not len(front):
+        return dominated
+    step = max(1, _MAX_COMPARE_ELEMENTS // max(1, len(block)))
+    for start in range(0, len(front), step):
+        f_slice = front[start:start + step]
+        le = f_slice[None, :, 0] <= block[:, None, 0]
+        for col in range(1, block.shape[1]):
+            le &= f_slice[None, :, col] <= block[:, None, col]
+        dominated |= le.any(axis=1)
+    return dominated
+
+
+def _front_sorted_filter(points: np.ndarray, block_size: int) -> np.ndarray:
+    """
+    Sort-filter front for three or more objectives; points must be unique rows.
+
+    Points are visited by increasing sum of range-normalized objectives. A
+    dominating point always has a strictly smaller sum, so no point can be
+    dominated by a later one: accepted points never need to be revisited and
+    each block is only compared against the current front and against itself.
+    Strong dominators come first, so after the first block a small elite of
+    the front screens the whole remaining array in one vectorized pass.
+    """
+    n, k = points.shape
+    low = points.min(axis=0)
+    span = points.max(axis=0) - low
+    span[span == 0] = 1.0
+    order = np.argsort(((points - low) / span).sum(axis=1), kind="stable")
+    sorted_points = points[order]
+    keep = np.zeros(n, dtype=bool)
+    front = np.empty((0, k))
+
+    positions = np.arange(n)
+    start = 0
+    screened = False
+    while start < len(positions):
+        block_pos = positions[start:start + block_size]
+        block = sorted_points[block_pos]
+        alive = ~_dominated_by(front, block)
+
+        # Filter within the block (only earlier rows can dominate later ones)
+        candidates = block[alive]
+        if len(candidates) > 1:
+            survivors = ~_dominated_by_other_rows(candidates)
+            alive[np.flatnonzero(alive)[~survivors]] = False
+            candidates = candidates[survivors]
+
+        keep[order[block_pos[alive]]] = True
+        front = np.vstack([front, candidates])
+        start += block_size
+
+        if not screened and len(front) and start < len(positions):
+            elite = front[np.linspace(0, len(front) - 1, min(len(front), _ELITE_SIZE)).astype(int)]
+            rest = positions[start:]
+            survivors = np.ones(len(rest), dtype=bool)
+            for s in range(0, len(rest), _SCREEN_CHUNK):
+                survivors[s:s + _SCREEN_CHUNK] = ~_dominated_by(elite, sorted_points[rest[s:s + _SCREEN_CHUNK]])
+            positions = np.concatenate([positions[:start], rest[survivors]])
+            screened = True
+
+    return keep
+
+
+def _dominated_by_other_rows(rows: np.ndarray) -> np.ndarray:
+    """Mask of rows dominated by another row of the same (unique) set."""
+    le = rows[:, None, 0] <= rows[None, :, 0]
+    for col in range(1, rows.shape[1]):
+        le &= rows[:, None, col] <= rows[None, :, col]
+    np.fill_diagonal(le, False)
+    return le.any(axis=0)
+
+
+def pareto_front(points, maximize: Optional[Sequence[bool]] = None, block_size: int = 1024) -> np.ndarray:
+    """
+    Returns the mask of non-dominated designs.
+
+    Args:
+        points: Array (n_designs, n_objectives)
+        maximize: One flag per objective (default: all minimized)
+        block_size: Rows compared at once for 3+ objectives
+
+    Returns:
+        Boolean mask of length n_designs (duplicated optimal rows are all kept)
+    """
+    points = _as_minimization(points, maximize)
+    if len(points) == 0:
+        return np.zeros(0, dtype=bool)
+
+    unique, inverse = _unique_rows(points)
+    if unique.shape[1] == 1:
+        unique_mask = unique[:, 0] == unique[:, 0].min()
+    elif unique.shape[1] == 2:
+        unique_mask = _front_2d(unique)
+    else:
+        unique_mask = _front_sorted_filter(unique, block_size)
+    return unique_mask[inverse]
+
+
+def non_dominated_sort(points, maximize: Optional[Sequence[bool]] = None,
+                       max_fronts: Optional[int] = None) -> np.ndarray:
+    """
+    Assigns a front rank to every design (0 = Pareto front).
+
+    Two objectives use a single O(n log n) sweep; three or more peel fronts
+    successively with the sort-filter algorithm.
+
+    Args:
+        points: Array (n_designs, n_objectives)
+        maximize: One flag per objective (default: all minimized)
+        max_fronts: Stop after this many fronts; remaining rows get rank -1
+
+    Returns:
+        Integer array of ranks
+    """
+    points = _as_minimization(points, maximize)
+    ranks = np.full(len(points), -1, dtype=np.int64)
+    if len(points) == 0:
+        return ranks
+
+    if points.shape[1] == 2:
+        order = np.lexsort((points[:, 1], points[:, 0]))
+        front_tails = []  # f1 of the last point placed on each front (increasing)
+        previous = None
+        for idx in order:
+            f0, f1 = points[idx]
+            if previous is not None and previous[0] == f0 and previous[1] == f1:
+                rank = previous[2]
+            else:
+                rank = bisect.bisect_right(front_tails, f1)
+                if rank == len(front_tails):
+                    front_tails.append(f1)
+                else:
+                    front_tails[rank] = f1
+            previous = (f0, f1, rank)
+            ranks[idx] = rank
+        if max_fronts is not None:
+            ranks[ranks >= max_fronts] = -1
+        return ranks
+
+    remaining = np.arange(len(points))
+    rank = 0
+    while len(remaining) and (max_fronts is None or rank < max_fronts):
+        mask = pareto_front(points[remaining])
+        ranks[remaining[mask]] = rank
+        remaining = remaining[~mask]
+        rank += 1
+    return ranks
+
+
+def pareto_front_chunked(
+    chunks: Iterable[Tuple[np.ndarray, np.ndarray]],
+    maximize: Optional[Sequence[bool]] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Streams (ids, points) chunks and keeps only the running Pareto front.
+
+    Memory is bounded by one chunk plus the current front, so sweeps with
+    millions of designs never need to be materialized at once.
+
+    Args:
+        chunks: Iterable of (ids, points) with ids shape (m,) and points (m, k)
+        maximize: One flag per objective (default: all minimized)
+
+    Returns:
+        Tuple (front_ids, front_points) in the original objective orientation
+    """
+    front_ids = None
+    front_points = None
+    for ids, points in chunks:
+        points = np.asarray(points, dtype=float)
+        ids = np.asarray(ids)
+        mask = pareto_front(points, maximize)
+        ids, points = ids[mask], points[mask]
+        if front_points is not None:
+            ids = np.concatenate([front_ids, ids])
+            points = np.vstack([front_points, points])
+            mask = pareto_front(points, maximize)
+            ids, points = ids[mask], points[mask]
+        front_ids, front_points = ids, points
+
+    if front_points is None:
+        return np.zeros(0, dtype=np.int64), np.zeros((0, len(OBJECTIVE_NAMES)))
+    return front_ids, front_points
+
+
+def evaluate_design_objectives(
+    shape: str,
+    dimensions: Dict[str, np.ndarray],
+    structure_type: str,
+    crew_size,
+    usable_factor,
+    gravity_env: str,
+) -> np.ndarray:
+    """
+    Computes (mass, NHV/person, habitability) for a batch of designs.
+
+    Args:
+        shape: "Cylinder" or "Rectangular"
+        dimensions: Arrays "diameter"/"height" or "length"/"width"/"height"
+        structure_type: Key of HABITAT_TYPES
+        crew_size: Crew size (scalar or array)
+        usable_factor: NHV usable factor (scalar or array)
+        gravity_env: Key of GRAVITY_ENVIRONMENTS
+
+    Returns:
+        Array (n_designs, 3) ordered as OBJECTIVE_NAMES
+    """
+    if shape == "Cylinder":
+        diameter = np.asarray(dimensions["diameter"], dtype=float)
+        height = np.asarray(dimensions["height"], dtype=float)
+        total_volume = calculate_cylinder_volume(diameter, height)
+        floor_area = calculate_cylinder_floor_area(diameter, height)
+    else:
+        length = np.asarray(dimensions["length"], dtype=float)
+        width = np.asarray(dimensions["width"], dtype=float)
+        height = np.asarray(dimensions["height"], dtype=float)
+        total_volume = calculate_box_volume(length, width, height)
+        floor_area = calculate_box_floor_area(length, width)
+
+    mass = calculate_structure_mass(total_volume, structure_type)
+    nhv_per_person = calculate_nhv(total_volume, usable_factor) / np.asarray(crew_size, dtype=float)
+    habitability = calculate_gravity_adjusted_metrics(total_volume, floor_area, gravity_env)["habitability_score"]
+
+    return np.column_stack(np.broadcast_arrays(mass, nhv_per_person, habitability)).astype(float)
+
+
+def iter_dimension_sweep(
+    shape: str,
+    ranges: Dict[str, np.ndarray],
+    chunk_size: int = 100_000,
+    start_chunk: int = 0,
+) -> Iterator[Tuple[np.ndarray, Dict[str, np.ndarray]]]:
+    """
+    Yields the full-factorial grid of dimensions in chunks.
+
+    Args:
+        shape: "Cylinder" or "Rectangular"
+        ranges: Candidate values per dimension
+        chunk_size: Designs per chunk
+        start_chunk: Index of the first chunk (earlier chunks are skipped, not built)
+
+    Yields:
+        Tuple (design_ids, dimensions) for each chunk
+    """
+    names = ("diameter", "height") if shape == "Cylinder" else ("length", "width", "height")
+    axes = [np.asarray(ranges[name], dtype=float) for name in names]
+    shape_grid = tuple(len(axis) for axis in axes)
+    total = int(np.prod(shape_grid))
+
+    for start in range(start_chunk * chunk_size, total, chunk_size):
+        ids = np.arange(start, min(start + chunk_size, total))
+        coords = np.unravel_index(ids, shape_grid)
+        yield ids, {name: axis[c] for name, axis, c in zip(names, axes, coords)}
+
+
+def pareto_sweep(
+    shape: str,
+    ranges: Dict[str, np.ndarray],
+    structure_type: str,
+    crew_size: int,
+    usable_factor: float,
+    gravity_env: str,
+    chunk_size: int = 100_000,
+) -> Dict[str, np.ndarray]:
+    """
+    Evaluates a dimension sweep and returns its Pareto front.
+
+    Returns:
+        Dictionary with front dimensions and objective columns
+    """
+    def chunks():
+        for ids, dims in iter_dimension_sweep(shape, ranges, chunk_size):
+            yield ids, evaluate_design_objectives(
+                shape, dims, structure_type, crew_size, usable_factor, gravity_env
+            )
+
+    front_ids, front_points = pareto_front_chunked(chunks(), OBJECTIVE_MAXIMIZE)
+
+    # Recover the dimensions of the (small) front from their grid ids
+    names = ("diameter", "height") if shape == "Cylinder" else ("length", "width", "height")
+    axes = [np.asarray(ranges[name], dtype=float) for name in names]
+    coords = np.unravel_index(front_ids, tuple(len(axis) for axis in axes))
+    dims_by_id = {name: axis[c] for name, axis, c in zip(names, axes, coords)}
+
+    order = np.argsort(front_points[:, 0])
+    result = {name: values[order] for name, values in dims_by_id.items()}
+    for col, name in enumerate(OBJECTIVE_NAMES):
+        result[name] = front_points[order, col]
+    return result
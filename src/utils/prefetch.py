@@ -0,0 +1,318 @@
+"""
+Speculative precomputation of neighbouring configurations
+
+Users move the stepped inputs (crew size, dimensions, usable factor) one
+notch at a time. After each render the prefetcher computes the models of
+the configurations one step away from the current one in a background
+thread pool and stores them in MODEL_CACHE, shared by all sessions, so the
+next edit usually finds its model ready.
+
+Prefetching must never slow down the foreground: workers only run while
+no rerun is in progress (foreground_rerun), at a lower OS priority, and
+pause after each configuration so they use at most PREFETCH_CPU_BUDGET of
+one core. Work for a configuration the user already left is dropped.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+from ..config.constants import CONFIG_INPUT_STEPS
+from .habitat_config import SHAPE_DIMENSIONS, HabitatConfig
+from .habitat_model import FIGURE_KINDS, HabitatModel
+from .incremental import IncrementalValidator
+
+PREFETCH_CACHE_SIZE = int(os.environ.get("HABITAT_PREFETCH_CACHE", "64"))  # models kept in MODEL_CACHE (LRU)
+PREFETCH_CPU_BUDGET = float(os.environ.get("HABITAT_PREFETCH_CPU", "0.25"))  # fraction of one core
+PREFETCH_WORKERS = int(os.environ.get("HABITAT_PREFETCH_WORKERS", "1"))
+PREFETCH_NICENESS = 10  # added to the worker threads' nice value where supported
+
+
+def prefetch_enabled() -> bool:
+    """False when disabled with HABITAT_PREFETCH=0."""
+    return os.environ.get("HABITAT_PREFETCH", "1") != "0"
+
+
+def prefetch_figures() -> bool:
+    """True when HABITAT_PREFETCH_FIGURES=1 (figures are prefetched with the metrics)."""
+    return os.environ.get("HABITAT_PREFETCH_FIGURES") == "1"
+
+
+class ModelCache:
+    """
+    Thread-safe LRU cache of HabitatModel objects keyed by configuration.
+
+    Args:
+        max_entries: Models kept (the least recently used are evicted)
+    """
+
+    def __init__(self, max_entries: int = PREFETCH_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.prefetched = 0
+        self.prefetch_hits = 0
+        self._prefetched = set()
+
+    def get(self, config: HabitatConfig) -> Optional[HabitatModel]:
+        with self._lock:
+            model = self._models.get(config)
+            if model is None:
+                self.misses += 1
+                return None
+            self._models.move_to_end(config)
+            self.hits += 1
+            if config in self._prefetched:
+                self._prefetched.discard(config)
+                self.prefetch_hits += 1
+            return model
+
+    def put(self, config: HabitatConfig, model: HabitatModel, prefetched: bool = False):
+        with self._lock:
+            if prefetched and config not in self._models:
+                self.prefetched += 1
+                self._prefetched.add(config)
+            self._models[config] = model
+            self._models.move_to_end(config)
+            while len(self._models) > self.max_entries:
+                evicted, _ = self._models.popitem(last=False)
+                self._prefetched.discard(evicted)
+
+    def __contains__(self, config: HabitatConfig) -> bool:
+        with self._lock:
+            return config in self._models
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+            self._prefetched.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._models), "hits": self.hits, "misses": self.misses,
+                "prefetched": self.prefetched, "prefetch_hits": self.prefetch_hits}
+
+
+MODEL_CACHE = ModelCache()
+
+
+def neighbour_configs(config: HabitatConfig) -> List[HabitatConfig]:
+    """
+    Configurations one step away on each stepped input (CONFIG_INPUT_STEPS).
+
+    Args:
+        config: Current configuration
+
+    Returns:
+        Neighbours within the input bounds (crew first, then dimensions, then usable factor)
+    """
+    names = ["crew_size", *SHAPE_DIMENSIONS[config.shape], "usable_factor"]
+    neighbours = []
+    for name in names:
+        low, high, step = CONFIG_INPUT_STEPS[name]
+        for delta in (-step, step):
+            value = round(getattr(config, name) + delta, 6)
+            if low - 1e-9 <= value <= high + 1e-9:
+                neighbours.append(config.replace(**{name: value}))
+    return neighbours
+
+
+class _ForegroundGate:
+    """Counts the reruns in progress; workers wait until there is none."""
+
+    def __init__(self):
+        self._active = 0
+        self._idle = threading.Condition()
+
+    def enter(self):
+        with self._idle:
+            self._active += 1
+
+    def exit(self):
+        with self._idle:
+            self._active -= 1
+            if self._active == 0:
+                self._idle.notify_all()
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        with self._idle:
+            return self._idle.wait_for(lambda: self._active == 0, timeout)
+
+
+FOREGROUND = _ForegroundGate()
+
+
+@contextmanager
+def foreground_rerun():
+    """Marks a rerun in progress (prefetch workers pause until it ends)."""
+    FOREGROUND.enter()
+    try:
+        yield
+    finally:
+        FOREGROUND.exit()
+
+
+def lower_thread_priority(niceness: int = PREFETCH_NICENESS):
+    """Raises the nice value of the calling thread by niceness (no-op where unsupported)."""
+    # On Linux a thread id is a valid PRIO_PROCESS target and only that thread is affected
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(),
+                       os.getpriority(os.PRIO_PROCESS, threading.get_native_id()) + niceness)
+    except (AttributeError, OSError):
+        pass
+
+
+class Prefetcher:
+    """
+    Computes the neighbours of the configurations it is given in the background.
+
+    Args:
+        cache: Where the models go
+        workers: Worker threads
+        cpu_budget: Fraction of one core the workers may use (0-1]
+        figures: Also build the figures of each model (FIGURE_KINDS)
+    """
+
+    def __init__(self, cache: ModelCache = MODEL_CACHE, workers: int = PREFETCH_WORKERS,
+                 cpu_budget: float = PREFETCH_CPU_BUDGET, figures: bool = False):
+        if not 0 < cpu_budget <= 1:
+            raise ValueError(f"cpu_budget must be in (0, 1], got {cpu_budget}")
+        self.cache = cache
+        self.cpu_budget = cpu_budget
+        self.figures = figures
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="habitat-prefetch", initializer=lower_thread_priority
+        )
+        self._generations: Dict[Hashable, int] = {}  # owner -> generation of its pending run
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._hooks: Dict[str, Tuple[Callable[[HabitatConfig], None], Callable[[HabitatConfig], Hashable]]] = {}
+        self._hooks_done: Dict[str, OrderedDict] = {}
+        self.stats = {"scheduled": 0, "computed": 0, "superseded": 0, "cpu_seconds": 0.0, "paused_seconds": 0.0}
+
+    def add_hook(self, name: str, hook: Callable[[HabitatConfig], None],
+                 key: Optional[Callable[[HabitatConfig], Hashable]] = None):
+        """
+        Registers extra work per neighbour (e.g. warming a page's own cache).
+
+        Args:
+            name: Hook name (registering the same name again replaces the hook, keeping the keys it handled)
+            hook: Called with each prefetched configuration; exceptions are ignored
+            key: What the hook's result depends on (None = the whole configuration);
+                 the hook runs once per key among the last PREFETCH_CACHE_SIZE keys
+        """
+        with self._lock:
+            self._hooks_done.setdefault(name, OrderedDict())
+            self._hooks[name] = (hook, key or (lambda config: config))
+
+    def schedule(self, config: HabitatConfig, owner: Hashable = None):
+        """
+        Prefetches the neighbours of config, dropping the pending work of the same owner.
+
+        Args:
+            config: Configuration just rendered
+            owner: Who asked (one session: only its latest configuration is prefetched)
+        """
+        with self._lock:
+            # Unique across owners: a generation freed when its run ends is never handed out again
+            self._sequence += 1
+            generation = self._generations[owner] = self._sequence
+            self.stats["scheduled"] += 1
+        self._executor.submit(self._run, config, owner, generation)
+
+    def _current(self, owner, generation) -> bool:
+        return self._generations.get(owner) == generation
+
+    def _validator(self) -> IncrementalValidator:
+        # One per worker: consecutive neighbours differ in one input, so updates are incremental
+        if not hasattr(self._local, "validator"):
+            self._local.validator = IncrementalValidator()
+        return self._local.validator
+
+    def _run(self, config: HabitatConfig, owner, generation: int):
+        try:
+            self._prefetch(config, owner, generation)
+        finally:
+            with self._lock:
+                # Forget the owner once its latest run is over (sessions come and go)
+                if self._generations.get(owner) == generation:
+                    del self._generations[owner]
+
+    def _prefetch(self, config: HabitatConfig, owner, generation: int):
+        for neighbour in neighbour_configs(config):
+            hooks = self._pending_hooks(neighbour)
+            if neighbour in self.cache and not hooks:
+                continue
+            FOREGROUND.wait_idle()
+            if not self._current(owner, generation):
+                self.stats["superseded"] += 1
+                return
+            started, cpu_started = time.perf_counter(), time.thread_time()
+            self._compute(neighbour, hooks)
+            cpu = time.thread_time() - cpu_started
+            self.stats["computed"] += 1
+            self.stats["cpu_seconds"] += cpu
+            # Duty cycle: stay below cpu_budget of one core over the whole run
+            pause = cpu / self.cpu_budget - (time.perf_counter() - started)
+            if pause > 0:
+                self.stats["paused_seconds"] += pause
+                time.sleep(pause)
+
+    def _pending_hooks(self, config: HabitatConfig) -> List[Tuple[str, Callable, Hashable]]:
+        """Hooks that have not handled the key of config yet"""
+        pending = []
+        for name, (hook, key) in list(self._hooks.items()):
+            hook_key = key(config)
+            if hook_key not in self._hooks_done[name]:
+                pending.append((name, hook, hook_key))
+        return pending
+
+    def _compute(self, config: HabitatConfig, hooks: List[Tuple[str, Callable, Hashable]]):
+        if config not in self.cache:
+            model = HabitatModel(config, self._validator())
+            model.validation
+            model.total_water
+            model.launch_feasibility
+            if self.figures:
+                for kind in FIGURE_KINDS:
+                    model.figure(kind)
+            self.cache.put(config, model, prefetched=True)
+        for name, hook, hook_key in hooks:
+            try:
+                hook(config)
+            except Exception:  # speculative work: a failing hook must not stop the worker
+                continue
+            with self._lock:
+                done = self._hooks_done[name]
+                done[hook_key] = True
+                done.move_to_end(hook_key)
+                while len(done) > self.cache.max_entries:
+                    done.popitem(last=False)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_prefetcher: Optional[Prefetcher] = None
+_prefetcher_lock = threading.Lock()
+
+
+def get_prefetcher() -> Prefetcher:
+    """Process-wide prefetcher (settings from HABITAT_PREFETCH_* on first use)."""
+    global _prefetcher
+    with _prefetcher_lock:
+        if _prefetcher is None:
+            _prefetcher = Prefetcher(figures=prefetch_figures())
+        return _prefetcher
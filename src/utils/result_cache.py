@@ -0,0 +1,388 @@
+"""
+Persistent result cache shared by the processes of a deployment
+
+The metrics, zone layout and figures of a habitat depend only on its
+configuration, so they are stored on disk under the configuration's
+digest: every process (Streamlit servers, the evaluation service, a worker
+restarted after a crash) reuses what any of them already computed. A
+fresh process loads the most used configurations into MODEL_CACHE at
+startup (start_warmup), so their pages render without computing anything.
+
+The store is one SQLite database in WAL mode: readers never block,
+writers of different processes are serialized by SQLite's file lock and
+each write is a transaction, so a killed process cannot leave a partial
+entry. Every entry records its size, last use and use count; when the
+total size exceeds the bound, the least recently used entries are deleted.
+Writes (serializing a figure takes a few milliseconds) are done by a
+background thread while no rerun is in progress. Metrics and figures are
+stored as JSON, so loading an entry never executes anything from the
+shared directory.
+
+Entries are keyed by RESULT_CACHE_VERSION as well: bump it when a change
+to the calculations or figures makes the stored results stale.
+"""
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..config.validation_rules import VALIDATION_RULES
+from .habitat_config import HabitatConfig
+from .habitat_model import FIGURE_KINDS, HabitatModel
+from .incremental import ValidationState
+from .prefetch import FOREGROUND, MODEL_CACHE, ModelCache, lower_thread_priority
+
+RESULT_CACHE_DIR = os.environ.get("HABITAT_RESULT_CACHE_DIR", "cache")
+RESULT_CACHE_MAX_BYTES = int(float(os.environ.get("HABITAT_RESULT_CACHE_MB", "256")) * 1024 * 1024)
+RESULT_CACHE_WARM = int(os.environ.get("HABITAT_RESULT_CACHE_WARM", "16"))  # configurations loaded at startup
+RESULT_CACHE_TIMEOUT = 5.0  # seconds a write waits for another process's lock
+RESULT_CACHE_VERSION = 2
+METRICS_KIND = "metrics"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    accessed REAL NOT NULL,
+    uses INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+CREATE INDEX IF NOT EXISTS entries_uses ON entries (kind, uses);
+"""
+
+
+def result_cache_enabled() -> bool:
+    """False when disabled with HABITAT_RESULT_CACHE=0."""
+    return os.environ.get("HABITAT_RESULT_CACHE", "1") != "0"
+
+
+class DiskCache:
+    """
+    Size-bounded LRU store of byte strings in a SQLite file, safe for concurrent processes.
+
+    Args:
+        path: Database file (created with its directory)
+        max_bytes: Total size of the values kept (least recently used are evicted)
+    """
+
+    def __init__(self, path: str, max_bytes: int = RESULT_CACHE_MAX_BYTES):
+        if max_bytes <= 0:
+            raise ValueError(f"max_bytes must be positive, got {max_bytes}")
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self.evicted = 0
+        self._connection()  # fail now if the file cannot be created
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections belong to the thread that opened them
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=RESULT_CACHE_TIMEOUT, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+            self._local.connection = connection
+        return connection
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Value stored under key, or None (does not count as a use, see touch)."""
+        row = self._connection().execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def __contains__(self, key: str) -> bool:
+        return self._connection().execute("SELECT 1 FROM entries WHERE key = ?", (key,)).fetchone() is not None
+
+    def put(self, key: str, kind: str, value: bytes):
+        """
+        Stores value under key (keeping the use count of a previous value), then evicts down to max_bytes.
+
+        Args:
+            key: Content address
+            kind: Kind of value (metrics, figure...), see popular
+            value: Serialized value
+        """
+        connection = self._connection()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute(
+                "INSERT INTO entries (key, kind, value, size, accessed) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value, size = excluded.size, "
+                "accessed = excluded.accessed",
+                (key, kind, value, len(value), time.time()),
+            )
+            self._evict(connection)
+
+    def _evict(self, connection: sqlite3.Connection):
+        excess = connection.execute("SELECT total(size) FROM entries").fetchone()[0] - self.max_bytes
+        if excess <= 0:
+            return
+        victims = []
+        for key, size in connection.execute("SELECT key, size FROM entries ORDER BY accessed"):
+            victims.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        connection.executemany("DELETE FROM entries WHERE key = ?", victims)
+        self.evicted += len(victims)
+
+    def touch(self, keys: List[str], uses: int = 1):
+        """Marks the entries as used now (LRU order) and adds uses to their use count."""
+        connection = self._connection()
+        now = time.time()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.executemany("UPDATE entries SET accessed = ?, uses = uses + ? WHERE key = ?",
+                                   [(now, uses, key) for key in keys])
+
+    def popular(self, kind: str, limit: int, prefix: str = "") -> List[Tuple[str, bytes]]:
+        """(key, value) of the limit most used entries of a kind whose key starts with prefix, most used first."""
+        return self._connection().execute(
+            "SELECT key, value FROM entries WHERE kind = ? AND substr(key, 1, ?) = ? "
+            "ORDER BY uses DESC, accessed DESC LIMIT ?",
+            (kind, len(prefix), prefix, limit),
+        ).fetchall()
+
+    def clear(self):
+        connection = self._connection()
+        with connection:
+            connection.execute("DELETE FROM entries")
+
+    def stats(self) -> Dict[str, int]:
+        entries, size = self._connection().execute("SELECT count(*), total(size) FROM entries").fetchone()
+        return {"entries": entries, "bytes": int(size), "evicted": self.evicted}
+
+
+def result_key(kind: str, config: HabitatConfig) -> str:
+    """Content address of a result of a configuration (kind, version and configuration digest)."""
+    return f"{kind}:{RESULT_CACHE_VERSION}:{config.digest()}"
+
+
+def _metrics_to_bytes(model: HabitatModel) -> bytes:
+    validation = model.validation
+    return json.dumps({
+        "config": model.config.to_record(),
+        "values": validation.values,
+        "status": validation.status.tolist(),
+    }).encode("utf-8")
+
+
+def _metrics_from_bytes(value: bytes) -> Tuple[HabitatConfig, ValidationState]:
+    stored = json.loads(value)
+    if len(stored["status"]) != len(VALIDATION_RULES):
+        raise ValueError("stored metrics do not match the validation rules")
+    validation = ValidationState(VALIDATION_RULES, stored["values"], np.array(stored["status"], dtype=np.uint8))
+    return HabitatConfig(**stored["config"]), validation
+
+
+def _figure_to_bytes(figure) -> bytes:
+    return figure.to_json().encode("utf-8")
+
+
+def _figure_from_bytes(value: bytes):
+    import plotly.graph_objects as go
+    # Stored figures were validated when built: skipping validation makes loading ~10x faster
+    return go.Figure(json.loads(value), skip_invalid=True, _validate=False)
+
+
+class ResultCache:
+    """
+    Habitat models and figures on top of a DiskCache.
+
+    Lookups are synchronous; writes and use counts are queued and done by
+    one background thread while no rerun is in progress (see flush).
+
+    Args:
+        disk: The store
+    """
+
+    def __init__(self, disk: DiskCache):
+        self.disk = disk
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="habitat-result-cache", daemon=True)
+        self._writer.start()
+        self._stats_lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "writes": 0, "errors": 0, "warmed": 0}
+
+    def _count(self, name: str, value: int = 1):
+        with self._stats_lock:
+            self.counters[name] += value
+
+    def _get(self, key: str) -> Optional[bytes]:
+        try:
+            value = self.disk.get(key)
+        except sqlite3.Error:
+            self._count("errors")
+            return None
+        self._count("misses" if value is None else "hits")
+        return value
+
+    def load_model(self, config: HabitatConfig) -> Optional[HabitatModel]:
+        """Model with the stored metrics of config (its figures load on demand), or None."""
+        value = self._get(result_key(METRICS_KIND, config))
+        if value is None:
+            return None
+        try:
+            _, validation = _metrics_from_bytes(value)
+        except (ValueError, KeyError, TypeError):
+            self._count("errors")
+            return None
+        return HabitatModel.from_validation(config, validation)
+
+    def save_model(self, model: HabitatModel):
+        """Stores the model's metrics if new and counts a use of its configuration (queued)."""
+        self._queue.put(("model", model))
+
+    def load_figure(self, config: HabitatConfig, kind: str):
+        """Stored figure of config, or None (a hit counts as a use, queued)."""
+        key = result_key(f"figure.{kind}", config)
+        value = self._get(key)
+        if value is None:
+            return None
+        self._queue.put(("touch", key))
+        return _figure_from_bytes(value)
+
+    def save_figure(self, config: HabitatConfig, kind: str, figure):
+        """Stores a figure of config (queued)."""
+        self._queue.put(("figure", (config, kind, figure)))
+
+    def _write_loop(self):
+        lower_thread_priority()
+        while True:
+            task = self._queue.get()
+            try:
+                FOREGROUND.wait_idle()
+                self._write(*task)
+            except (sqlite3.Error, OSError):
+                self._count("errors")
+            finally:
+                self._queue.task_done()
+
+    def _write(self, what: str, item: Any):
+        if what == "model":
+            key = result_key(METRICS_KIND, item.config)
+            if key not in self.disk:
+                self.disk.put(key, METRICS_KIND, _metrics_to_bytes(item))
+                self._count("writes")
+            self.disk.touch([key])
+        elif what == "touch":
+            self.disk.touch([item])
+        else:
+            config, kind, figure = item
+            self.disk.put(result_key(f"figure.{kind}", config), f"figure.{kind}", _figure_to_bytes(figure))
+            self._count("writes")
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits until the queued writes are done.
+
+        Returns:
+            False if they were still pending after timeout seconds
+        """
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.perf_counter() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def warm(self, cache: ModelCache = MODEL_CACHE, limit: int = RESULT_CACHE_WARM) -> int:
+        """
+        Loads the most used stored configurations, with their figures, into cache.
+
+        Args:
+            cache: In-memory model cache to fill
+            limit: Configurations loaded (at most the cache's capacity)
+
+        Returns:
+            Models loaded
+        """
+        loaded = 0
+        # Least used first: the most used end up most recent in the LRU
+        prefix = f"{METRICS_KIND}:{RESULT_CACHE_VERSION}:"
+        for _, value in reversed(self.disk.popular(METRICS_KIND, min(limit, cache.max_entries), prefix)):
+            config, validation = _metrics_from_bytes(value)
+            if config in cache:
+                continue
+            figures = {}
+            for kind in FIGURE_KINDS:
+                stored = self.disk.get(result_key(f"figure.{kind}", config))
+                if stored is not None:
+                    figures[kind] = _figure_from_bytes(stored)
+            cache.put(config, HabitatModel.from_validation(config, validation, figures))
+            loaded += 1
+        self._count("warmed", loaded)
+        return loaded
+
+    def stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            counters = dict(self.counters)
+        try:
+            counters.update(self.disk.stats())
+        except sqlite3.Error:
+            pass
+        counters["pending"] = self._queue.unfinished_tasks
+        return counters
+
+
+_result_cache: Optional[ResultCache] = None
+_result_cache_failed = False
+_result_cache_lock = threading.Lock()
+_warmup: Optional[threading.Thread] = None
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """
+    Process-wide result cache (in HABITAT_RESULT_CACHE_DIR on first use).
+
+    Returns:
+        The cache, or None when disabled or when its directory is not writable
+    """
+    global _result_cache, _result_cache_failed
+    if not result_cache_enabled():
+        return None
+    with _result_cache_lock:
+        if _result_cache is None and not _result_cache_failed:
+            try:
+                disk = DiskCache(os.path.join(RESULT_CACHE_DIR, "results.sqlite3"))
+            except (sqlite3.Error, OSError):
+                # A read-only deployment still works, without the persistent cache
+                _result_cache_failed = True
+                return None
+            _result_cache = ResultCache(disk)
+            atexit.register(_result_cache.flush, RESULT_CACHE_TIMEOUT)
+        return _result_cache
+
+
+def start_warmup() -> Optional[threading.Thread]:
+    """Warms MODEL_CACHE from the result cache in a background thread, once per process."""
+    global _warmup
+    with _result_cache_lock:
+        if _warmup is not None:
+            return _warmup
+        _warmup = threading.Thread(target=_warm, name="habitat-result-cache-warmup", daemon=True)
+    _warmup.start()
+    return _warmup
+
+
+def _warm():
+    lower_thread_priority()
+    FOREGROUND.wait_idle()
+    cache = get_result_cache()
+    if cache is None:
+        return
+    try:
+        cache.warm()
+    except (sqlite3.Error, OSError, ValueError, KeyError, TypeError):
+        cache._count("errors")
@@ -0,0 +1,278 @@
+"""
+Validation rule engine
+
+Compiles the declarative rules of src/config/validation_rules.py into NumPy
+predicates that evaluate a whole batch of designs per rule. The result is a
+compact status matrix (designs × rules); human-readable messages are only
+formatted for the rows that are actually displayed. A single design is
+checked against the same table in plain Python (check_design), which is
+much cheaper than building one-element arrays.
+"""
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..config.validation_rules import VALIDATION_RULES
+
+STATUS_PASS = 0
+STATUS_FAIL = 1
+STATUS_SKIPPED = 2  # input (or per-design threshold) missing for that design
+
+
+class _Columns:
+    """Input columns with cached numeric (float) and raw views."""
+
+    __slots__ = ("_data", "_numeric", "_raw", "size")
+
+    def __init__(self, data: Dict[str, Sequence]):
+        self._data = data
+        self._numeric = {}
+        self._raw = {}
+        self.size = max((len(column) for column in data.values() if column is not None), default=0)
+
+    def raw(self, name: str) -> np.ndarray:
+        if name not in self._raw:
+            column = self._data.get(name)
+            self._raw[name] = np.full(self.size, None, dtype=object) if column is None else np.asarray(column)
+        return self._raw[name]
+
+    def numeric(self, name: str) -> np.ndarray:
+        if name not in self._numeric:
+            raw = self.raw(name)
+            self._numeric[name] = raw if raw.dtype.kind == "f" else raw.astype(float)
+        return self._numeric[name]
+
+    def item(self, name: str, row: int):
+        value = self.raw(name)[row]
+        return value.item() if isinstance(value, np.generic) else value
+
+
+def _threshold_array(spec, columns: _Columns):
+    if spec is None or isinstance(spec, (int, float)):
+        return spec
+    if isinstance(spec, str):
+        return columns.numeric(spec)
+    keys = columns.raw(spec["by"])
+    thresholds = np.full(columns.size, spec["default"], dtype=float)
+    for key, value in spec["values"].items():
+        thresholds[keys == key] = value
+    return thresholds
+
+
+def _threshold_item(spec, columns: _Columns, row: int):
+    if spec is None or isinstance(spec, (int, float)):
+        return spec
+    if isinstance(spec, str):
+        return columns.item(spec, row)
+    return spec["values"].get(columns.item(spec["by"], row), spec["default"])
+
+
+def rule_inputs(rule: Dict) -> Tuple[str, ...]:
+    """
+    Input columns a rule depends on (checked input and per-design thresholds).
+
+    Args:
+        rule: Declarative rule
+
+    Returns:
+        Tuple of input names
+    """
+    names = [rule["input"]]
+    for spec in (rule.get("min"), rule.get("max")):
+        if isinstance(spec, str):
+            names.append(spec)
+        elif isinstance(spec, dict):
+            names.append(spec["by"])
+    return tuple(names)
+
+
+def _compile_rule(rule: Dict) -> Callable[[_Columns], np.ndarray]:
+    """Builds the vectorized predicate for one rule."""
+    input_name = rule["input"]
+    low_spec = rule.get("min")
+    high_spec = rule.get("max")
+
+    def predicate(columns: _Columns) -> np.ndarray:
+        value = columns.numeric(input_name)
+        missing = np.isnan(value)
+        ok = np.ones(columns.size, dtype=bool)
+        with np.errstate(invalid="ignore"):
+            for spec, check in ((low_spec, np.greater_equal), (high_spec, np.less_equal)):
+                if spec is None:
+                    continue
+                threshold = _threshold_array(spec, columns)
+                ok &= check(value, threshold)
+                if isinstance(threshold, np.ndarray):
+                    missing |= np.isnan(threshold)
+        status = np.where(ok, STATUS_PASS, STATUS_FAIL).astype(np.uint8)
+        status[missing] = STATUS_SKIPPED
+        return status
+
+    return predicate
+
+
+def compile_rules(rules: List[Dict]) -> List[Callable[[_Columns], np.ndarray]]:
+    """
+    Compiles a rule table into NumPy predicates.
+
+    Args:
+        rules: List of declarative rules (see VALIDATION_RULES)
+
+    Returns:
+        One predicate per rule, in table order
+    """
+    return [_compile_rule(rule) for rule in rules]
+
+
+@lru_cache(maxsize=None)
+def _default_table(group: Optional[str]):
+    rules = [rule for rule in VALIDATION_RULES if group is None or rule["group"] == group]
+    return rules, compile_rules(rules)
+
+
+class RuleResults:
+    """
+    Status matrix of a batch evaluation with lazy message formatting.
+
+    Attributes:
+        rules: Evaluated rules (column order of status)
+        status: uint8 array (n_designs, n_rules) of STATUS_* codes
+    """
+
+    __slots__ = ("rules", "status", "_columns")
+
+    def __init__(self, rules: List[Dict], status: np.ndarray, columns: _Columns):
+        self.rules = rules
+        self.status = status
+        self._columns = columns
+
+    @property
+    def valid(self) -> np.ndarray:
+        """True for designs with no failed rule."""
+        return ~(self.status == STATUS_FAIL).any(axis=1)
+
+    def failure_counts(self) -> Dict[str, int]:
+        """Number of failing designs per rule id."""
+        counts = (self.status == STATUS_FAIL).sum(axis=0)
+        return {rule["id"]: int(count) for rule, count in zip(self.rules, counts)}
+
+    def failed_rules(self, row: int) -> List[Dict]:
+        """Rules failed by one design."""
+        return [rule for rule, code in zip(self.rules, self.status[row]) if code == STATUS_FAIL]
+
+    def messages(self, row: int) -> List[str]:
+        """Formats the messages of the failed rules for one design."""
+        columns = self._columns
+        messages = []
+        for rule in self.failed_rules(row):
+            fields = _RowFields(columns, row)
+            fields["value"] = columns.item(rule["input"], row)
+            fields["min"] = _threshold_item(rule.get("min"), columns, row)
+            fields["max"] = _threshold_item(rule.get("max"), columns, row)
+            messages.append(rule["message"].format_map(fields))
+        return messages
+
+
+class _RowFields(dict):
+    """Template fields resolved on demand from the design's input columns."""
+
+    def __init__(self, columns: _Columns, row: int):
+        super().__init__()
+        self._columns = columns
+        self._row = row
+
+    def __missing__(self, key):
+        return self._columns.item(key, self._row)
+
+
+def evaluate_rules(inputs: Dict[str, Sequence], group: Optional[str] = None,
+                   rules: Optional[List[Dict]] = None) -> RuleResults:
+    """
+    Evaluates every rule over a batch of designs.
+
+    Args:
+        inputs: Column per input name (lists or arrays of equal length; None/NaN = missing)
+        group: Only evaluate rules of this group ("nasa_standards", "dimensions", "environment")
+        rules: Custom rule table (default: VALIDATION_RULES)
+
+    Returns:
+        RuleResults with the status matrix
+    """
+    if rules is None:
+        rules, predicates = _default_table(group)
+    else:
+        rules = [rule for rule in rules if group is None or rule["group"] == group]
+        predicates = compile_rules(rules)
+
+    columns = _Columns(inputs)
+    status = np.empty((columns.size, len(rules)), dtype=np.uint8)
+    for idx, predicate in enumerate(predicates):
+        status[:, idx] = predicate(columns)
+    return RuleResults(rules, status, columns)
+
+
+class _DesignFields(dict):
+    """Template fields of one design (inputs it does not have format as None)."""
+
+    def __missing__(self, key):
+        return None
+
+
+def _design_threshold(spec) -> Callable[[Dict[str, Any]], Any]:
+    if spec is None or isinstance(spec, (int, float)):
+        return lambda inputs: spec
+    if isinstance(spec, str):
+        return lambda inputs: inputs.get(spec)
+    values, default, by = spec["values"], spec["default"], spec["by"]
+    return lambda inputs: values.get(inputs.get(by), default)
+
+
+def _compile_design_check(rule: Dict) -> Callable[[Dict[str, Any]], Optional[str]]:
+    """Builds the plain-Python check of one rule for a single design (message if it fails)."""
+    input_name = rule["input"]
+    has_low, has_high = rule.get("min") is not None, rule.get("max") is not None
+    low_of, high_of = _design_threshold(rule.get("min")), _design_threshold(rule.get("max"))
+    message = rule["message"]
+
+    def check(inputs: Dict[str, Any]) -> Optional[str]:
+        value = inputs.get(input_name)
+        if value is None or value != value:  # missing (None or NaN): skipped
+            return None
+        low = low_of(inputs) if has_low else None
+        high = high_of(inputs) if has_high else None
+        if (has_low and (low is None or low != low)) or (has_high and (high is None or high != high)):
+            return None
+        if (low is None or value >= low) and (high is None or value <= high):
+            return None
+        fields = _DesignFields(inputs)
+        fields.update(value=value, min=low, max=high)
+        return message.format_map(fields)
+
+    return check
+
+
+@lru_cache(maxsize=None)
+def _default_design_checks(group: Optional[str]):
+    return [_compile_design_check(rule) for rule in _default_table(group)[0]]
+
+
+def check_design(inputs: Dict[str, Any], group: Optional[str] = None,
+                 rules: Optional[List[Dict]] = None) -> Tuple[bool, List[str]]:
+    """
+    Evaluates the rules for a single design (same semantics as evaluate_rules).
+
+    Args:
+        inputs: Value per input name (None/NaN = missing: rules needing it are skipped)
+        group: Only evaluate rules of this group
+        rules: Custom rule table (default: VALIDATION_RULES)
+
+    Returns:
+        Tuple (is_valid, messages of the failed rules)
+    """
+    if rules is None:
+        checks = _default_design_checks(group)
+    else:
+        checks = [_compile_design_check(rule) for rule in rules if group is None or rule["group"] == group]
+    messages = [message for message in (check(inputs) for check in checks) if message is not None]
+    return not messages, messages
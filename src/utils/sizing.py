@@ -0,0 +1,264 @@
+"""
+Inverse sizing: minimum habitat dimensions that satisfy NASA requirements
+
+Given the mission (crew, duration, gravity) and any fixed dimensions, returns
+the smallest free dimensions meeting:
+- NHV per person (calculate_nhv_per_person, transit floor in microgravity)
+- floor area per person (MIN_FLOOR_AREA_PER_PERSON)
+- ceiling height (MIN_CEILING_HEIGHT)
+- stowed launch envelope (LAUNCH_VEHICLES)
+
+Every requirement is monotone in the free dimensions and reduces to a closed
+form for the cylinder and box geometries, so no iterative search is needed.
+A fairing limits diameter and height together, so the dimensions are solved
+for each launch vehicle and the smallest design that fits its vehicle wins.
+When a cylinder would be taller than the fairing, height is traded for
+diameter up to the fairing's diameter.
+"""
+import math
+from typing import Dict, List, Optional
+
+from ..config.constants import (
+    HABITAT_TYPES,
+    LAUNCH_VEHICLES,
+    MIN_CEILING_HEIGHT,
+    MIN_FLOOR_AREA_PER_PERSON,
+    MIN_NHV_PER_PERSON_TRANSIT,
+)
+from .nasa_calculations import calculate_nhv_per_person
+
+# Mission type checked by validate_nasa_standards for each gravity environment
+GRAVITY_MISSION_TYPES = {
+    "microgravity": "transit",
+    "lunar": "lunar_surface",
+    "mars": "mars_surface"
+}
+
+# Cylinder usable floor fraction (see calculate_cylinder_floor_area)
+_CYLINDER_FLOOR_FACTOR = 0.8
+
+
+def _round_to_step(value: float, step: Optional[float], driver: str) -> float:
+    """Rounds up, except launch-bound dimensions which must round down."""
+    if step is None:
+        return value
+    # Small tolerance keeps exact multiples from jumping one step
+    if driver.startswith("launch_"):
+        return math.floor(value / step + 1e-9) * step
+    return math.ceil(value / step - 1e-9) * step
+
+
+def required_nhv_per_person(duration_days: int, gravity_env: str) -> float:
+    """
+    Minimum NHV per person checked by validate_nasa_standards.
+
+    Args:
+        duration_days: Mission duration in days
+        gravity_env: Gravitational environment
+
+    Returns:
+        NHV in m³ per person
+    """
+    required = calculate_nhv_per_person(duration_days)
+    if GRAVITY_MISSION_TYPES.get(gravity_env) == "transit":
+        required = max(required, MIN_NHV_PER_PERSON_TRANSIT)
+    return required
+
+
+def _launch_limits(structure_type: str, vehicle: Dict) -> Dict[str, float]:
+    """Largest deployed diameter/height whose stowed envelope fits one vehicle."""
+    habitat = HABITAT_TYPES[structure_type]
+    return {
+        "max_diameter": vehicle["max_diameter"] / habitat["stowed_diameter_ratio"],
+        "max_height": vehicle["max_height"] / habitat["stowed_height_ratio"]
+    }
+
+
+def _fitting_vehicles(envelope_diameter: float, envelope_height: float) -> List[str]:
+    return [
+        vehicle_id for vehicle_id, vehicle in LAUNCH_VEHICLES.items()
+        if envelope_diameter <= vehicle["max_diameter"] and envelope_height <= vehicle["max_height"]
+    ]
+
+
+def _solve_geometry(shape: str, structure_type: str, fixed: Dict[str, float], area_required: float,
+                    volume_required: float, step: Optional[float], limits: Dict[str, float]) -> Dict[str, any]:
+    """
+    Minimum dimensions for one launch vehicle's limits (closed forms, see the module docstring).
+
+    Returns:
+        Dictionary with dimensions, binding requirement per solved dimension,
+        floor area, volume and stowed envelope (diameter, height)
+    """
+    habitat = HABITAT_TYPES[structure_type]
+    binding = {}
+
+    def solved(name: str, value: float, driver: str) -> float:
+        binding[name] = driver
+        return _round_to_step(value, step, driver)
+
+    if shape == "Cylinder":
+        disk = _CYLINDER_FLOOR_FACTOR * math.pi / 4  # floor area = disk * d²
+        d_for_area = math.sqrt(area_required / disk)
+        diameter = fixed.get("diameter")
+        height = fixed.get("height")
+
+        if diameter is None:
+            if height is None:
+                diameter = solved("diameter", d_for_area, "floor_area")
+            else:
+                d_for_volume = math.sqrt(volume_required / (math.pi / 4 * height))
+                if d_for_volume > d_for_area:
+                    diameter = solved("diameter", d_for_volume, "nhv")
+                else:
+                    diameter = solved("diameter", d_for_area, "floor_area")
+
+        if height is None:
+            h_for_volume = volume_required / (math.pi / 4 * diameter ** 2)
+            if h_for_volume < MIN_CEILING_HEIGHT:
+                height = solved("height", MIN_CEILING_HEIGHT, "ceiling_height")
+            elif h_for_volume > limits["max_height"] and "diameter" in binding:
+                # Trade height for diameter to stay inside the fairing, up to its diameter
+                max_height = _round_to_step(limits["max_height"], step, "launch_height")
+                d_for_volume = math.sqrt(volume_required / (math.pi / 4 * max_height))
+                if _round_to_step(d_for_volume, step, "nhv") <= limits["max_diameter"] + 1e-9:
+                    height = solved("height", max_height, "launch_height")
+                    diameter = solved("diameter", d_for_volume, "nhv")
+                else:
+                    # Too much volume for this fairing: widest module, height from the volume
+                    diameter = solved("diameter", limits["max_diameter"], "launch_diameter")
+                    height = solved("height", volume_required / (math.pi / 4 * diameter ** 2), "nhv")
+            else:
+                height = solved("height", h_for_volume, "nhv")
+
+        dimensions = {"diameter": diameter, "height": height}
+        floor_area = disk * diameter ** 2
+        volume = math.pi / 4 * diameter ** 2 * height
+        envelope = (diameter * habitat["stowed_diameter_ratio"],
+                    height * habitat["stowed_height_ratio"])
+    else:
+        length = fixed.get("length")
+        width = fixed.get("width")
+        height = fixed.get("height")
+
+        if length is None or width is None:
+            # Footprint needed by floor area; volume decides when height is fixed
+            footprint, driver = area_required, "floor_area"
+            if height is not None and volume_required / height > footprint:
+                footprint, driver = volume_required / height, "nhv"
+
+            if length is None and width is None:
+                width = solved("width", math.sqrt(footprint), driver)
+                length = solved("length", footprint / width, driver)
+            elif length is None:
+                length = solved("length", footprint / width, driver)
+            else:
+                width = solved("width", footprint / length, driver)
+
+        if height is None:
+            h_for_volume = volume_required / (length * width)
+            if h_for_volume < MIN_CEILING_HEIGHT:
+                height = solved("height", MIN_CEILING_HEIGHT, "ceiling_height")
+            else:
+                height = solved("height", h_for_volume, "nhv")
+
+        # A square footprint may be too wide for the fairing: narrow the module
+        # (width × height across the fairing) and stretch it along the axis
+        cross = limits["max_diameter"]
+        if "length" in binding and "width" in binding and math.hypot(width, height) > cross > height:
+            width = solved("width", math.sqrt(cross ** 2 - height ** 2), "launch_diameter")
+            length = solved("length", max(area_required / width, volume_required / (width * height)),
+                            binding["length"])
+
+        dimensions = {"length": length, "width": width, "height": height}
+        floor_area = length * width
+        volume = floor_area * height
+        sides = sorted(dimensions.values())
+        envelope = (math.hypot(sides[0], sides[1]) * habitat["stowed_diameter_ratio"],
+                    sides[2] * habitat["stowed_height_ratio"])
+
+    return {"dimensions": dimensions, "binding": binding, "floor_area": floor_area,
+            "volume": volume, "envelope": envelope}
+
+
+def solve_minimum_dimensions(
+    crew_size: int,
+    duration_days: int,
+    gravity_env: str,
+    shape: str,
+    structure_type: str = "rigid",
+    usable_factor: float = 0.7,
+    fixed: Optional[Dict[str, float]] = None,
+    launch_vehicle: Optional[str] = None,
+    step: Optional[float] = None,
+) -> Dict[str, any]:
+    """
+    Solves for the minimum compliant dimensions.
+
+    Args:
+        crew_size: Number of crew members
+        duration_days: Mission duration in days
+        gravity_env: 'microgravity', 'lunar' or 'mars'
+        shape: "Cylinder" or "Rectangular"
+        structure_type: Key of HABITAT_TYPES
+        usable_factor: NHV usable factor
+        fixed: Dimensions to keep (e.g. {"height": 8.0}); the others are solved
+        launch_vehicle: Restrict the launch check to one vehicle (default: any)
+        step: Round solved dimensions up to this increment (e.g. 0.5 m)
+
+    Returns:
+        Dictionary with dimensions, feasible flag, binding requirement per
+        solved dimension, requirement values, issues and fitting vehicles
+    """
+    fixed = {name: value for name, value in (fixed or {}).items() if value is not None}
+    nhv_required = required_nhv_per_person(duration_days, gravity_env)
+    area_required = crew_size * MIN_FLOOR_AREA_PER_PERSON
+    volume_required = crew_size * nhv_required / usable_factor
+
+    # Each fairing is a diameter and a height together: solve for every vehicle
+    # and keep the smallest design that fits its vehicle (the first on ties)
+    solutions = []
+    for vehicle_id in [launch_vehicle] if launch_vehicle else list(LAUNCH_VEHICLES):
+        solution = _solve_geometry(
+            shape, structure_type, fixed, area_required, volume_required, step,
+            _launch_limits(structure_type, LAUNCH_VEHICLES[vehicle_id])
+        )
+        solutions.append((vehicle_id not in _fitting_vehicles(*solution["envelope"]), solution["volume"], solution))
+    solution = min(solutions, key=lambda item: item[:2])[2]
+    dimensions, binding = solution["dimensions"], solution["binding"]
+    floor_area, volume, envelope = solution["floor_area"], solution["volume"], solution["envelope"]
+
+    # Verification against the forward model (also covers fixed dimensions)
+    issues = []
+    nhv_per_person = volume * usable_factor / crew_size
+    if nhv_per_person < nhv_required - 1e-9:
+        issues.append(f"NHV per person ({nhv_per_person:.1f} m³) below minimum ({nhv_required:.1f} m³)")
+    if floor_area / crew_size < MIN_FLOOR_AREA_PER_PERSON - 1e-9:
+        issues.append(
+            f"Floor area per person ({floor_area / crew_size:.1f} m²) below minimum ({MIN_FLOOR_AREA_PER_PERSON} m²)"
+        )
+    if dimensions["height"] < MIN_CEILING_HEIGHT - 1e-9:
+        issues.append(f"Ceiling height ({dimensions['height']:.2f}m) below minimum ({MIN_CEILING_HEIGHT}m)")
+
+    vehicles = _fitting_vehicles(*envelope)
+    if launch_vehicle:
+        vehicles = [v for v in vehicles if v == launch_vehicle]
+    if not vehicles:
+        issues.append(
+            f"Stowed envelope (Ø{envelope[0]:.2f} m × {envelope[1]:.2f} m) does not fit "
+            + (LAUNCH_VEHICLES[launch_vehicle]["name"] if launch_vehicle else "any launch vehicle")
+        )
+
+    return {
+        "dimensions": dimensions,
+        "feasible": not issues,
+        "binding": binding,
+        "requirements": {
+            "nhv_per_person_m3": nhv_required,
+            "floor_area_m2": area_required,
+            "total_volume_m3": volume_required,
+            "ceiling_height_m": MIN_CEILING_HEIGHT
+        },
+        "issues": issues,
+        "launch_vehicles": vehicles
+    }
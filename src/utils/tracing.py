@@ -0,0 +1,177 @@
+"""
+Structured trace export of the per-rerun instrumentation spans
+
+Every profiled rerun becomes one trace: a "rerun" root record plus one record
+per span, all sharing the trace id (one per rerun) and the session id.
+Records are handed to the configured exporter; the default writes NDJSON
+lines to a size-rotated local file.
+
+Configuration (environment):
+    HABITAT_TRACE_FILE       NDJSON output path (enables export)
+    HABITAT_TRACE_MAX_BYTES  rotate after this size (default 10 MB)
+    HABITAT_TRACE_BACKUPS    rotated files kept (default 5)
+
+Any object with export(records) can be installed with set_exporter().
+"""
+import json
+import logging
+import os
+import time
+import uuid
+from logging.handlers import RotatingFileHandler
+from typing import Dict, List, Optional
+
+from .instrumentation import RerunProfile
+
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUPS = 5
+
+
+class NDJSONFileExporter:
+    """
+    Appends records as JSON lines to a rotating file.
+
+    Rotation and locking are delegated to logging's RotatingFileHandler,
+    which is safe across the script threads of concurrent sessions.
+    """
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES, backup_count: int = DEFAULT_BACKUPS):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        self._handler.setFormatter(logging.Formatter("%(message)s"))
+
+    def export(self, records: List[Dict]) -> None:
+        for record in records:
+            self._handler.emit(logging.makeLogRecord({
+                "msg": json.dumps(record, separators=(",", ":"), default=str),
+                "levelno": logging.INFO,
+                "levelname": "INFO"
+            }))
+
+    def close(self) -> None:
+        self._handler.close()
+
+
+class MemoryExporter:
+    """Keeps records in memory (tests, benchmarks and notebooks)."""
+
+    def __init__(self):
+        self.records = []
+
+    def export(self, records: List[Dict]) -> None:
+        self.records.extend(records)
+
+
+_exporter = None
+_configured = False
+
+
+def exporter_from_env() -> Optional[NDJSONFileExporter]:
+    """Builds the NDJSON exporter from HABITAT_TRACE_* variables (None if unset)."""
+    path = os.environ.get("HABITAT_TRACE_FILE")
+    if not path:
+        return None
+    return NDJSONFileExporter(
+        path,
+        max_bytes=int(os.environ.get("HABITAT_TRACE_MAX_BYTES", DEFAULT_MAX_BYTES)),
+        backup_count=int(os.environ.get("HABITAT_TRACE_BACKUPS", DEFAULT_BACKUPS))
+    )
+
+
+def set_exporter(exporter) -> None:
+    """
+    Installs the exporter used by export_profile (None disables export).
+
+    Args:
+        exporter: Object with an export(records) method
+    """
+    global _exporter, _configured
+    _exporter = exporter
+    _configured = True
+
+
+def get_exporter():
+    """Current exporter (configured from the environment on first use)."""
+    global _exporter, _configured
+    if not _configured:
+        _exporter = exporter_from_env()
+        _configured = True
+    return _exporter
+
+
+def tracing_enabled() -> bool:
+    """True when an exporter is installed."""
+    return get_exporter() is not None
+
+
+def build_trace_records(profile: RerunProfile, session_id: Optional[str] = None,
+                        trace_id: Optional[str] = None) -> List[Dict]:
+    """
+    Converts a rerun profile into trace records.
+
+    Args:
+        profile: Finished rerun profile
+        session_id: Streamlit session id
+        trace_id: Trace id (default: new random id)
+
+    Returns:
+        Root "rerun" record followed by one record per span
+    """
+    trace_id = trace_id or uuid.uuid4().hex
+    timestamp = time.time() - profile.elapsed
+    common = {"trace_id": trace_id, "session_id": session_id, "page": profile.page}
+
+    records = [{
+        **common,
+        "kind": "rerun",
+        "name": "rerun",
+        "stage": "rerun",
+        "ts": round(timestamp, 6),
+        "duration_ms": round(profile.elapsed * 1e3, 3),
+        "stage_ms": {stage: round(seconds * 1e3, 3) for stage, seconds in profile.stage_totals().items()},
+        "counters": dict(profile.counters)
+    }]
+    for span in profile.spans:
+        attributes = {
+            key: value for key, value in span.items()
+            if key not in ("name", "stage", "start", "duration", "depth")
+        }
+        records.append({
+            **common,
+            "kind": "span",
+            "name": span["name"],
+            "stage": span["stage"],
+            "ts": round(timestamp + span["start"], 6),
+            "start_ms": round(span["start"] * 1e3, 3),
+            "duration_ms": round(span["duration"] * 1e3, 3),
+            "depth": span["depth"],
+            **attributes
+        })
+    return records
+
+
+def export_profile(profile: Optional[RerunProfile], session_id: Optional[str] = None) -> Optional[str]:
+    """
+    Exports a rerun profile with the configured exporter.
+
+    Export errors are logged and never break the page.
+
+    Args:
+        profile: Finished rerun profile (None = nothing to export)
+        session_id: Streamlit session id
+
+    Returns:
+        The trace id, or None when nothing was exported
+    """
+    exporter = get_exporter()
+    if profile is None or exporter is None:
+        return None
+    records = build_trace_records(profile, session_id)
+    try:
+        exporter.export(records)
+    except Exception:  # noqa: BLE001 - tracing must not take the page down
+        logging.getLogger(__name__).exception("Trace export failed")
+        return None
+    return records[0]["trace_id"]
@@ -9,6 +9,14 @@ Baseado em:
 """
 from typing import List, Tuple, Dict, Any
 
+from ..config.constants import MIN_NHV_PER_PERSON_TRANSIT
+from .rule_engine import check_design
+
+
+def _run_rule_group(group: str, inputs: Dict[str, Any]) -> Tuple[bool, List[str]]:
+    """Evaluates one rule group for a single design (plain Python, see check_design)."""
+    return check_design(inputs, group=group)
+
 
 def validate_nasa_standards(
     nhv_per_person: float,
@@ -32,24 +40,17 @@ def validate_nasa_standards(
         - is_valid: True se todos os padrões são atendidos
         - issues: Lista de strings descrevendo problemas encontrados
     """
-    issues = []
-    
     # Ajustar requisitos mínimos baseado no tipo de missão
     if mission_type == "transit":
-        min_nhv = max(min_nhv, 27)  # Habitats de trânsito precisam de mais volume
-    
-    if nhv_per_person < min_nhv:
-        issues.append(
-            f"NHV per person ({nhv_per_person:.1f} m³) below minimum ({min_nhv} m³) for {mission_type} mission"
-        )
-    
-    if floor_area_per_person < min_floor_area:
-        issues.append(
-            f"Floor area per person ({floor_area_per_person:.1f} m²) below minimum ({min_floor_area} m²)"
-        )
-    
-    is_valid = len(issues) == 0
-    return is_valid, issues
+        min_nhv = max(min_nhv, MIN_NHV_PER_PERSON_TRANSIT)  # Habitats de trânsito precisam de mais volume
+    
+    return _run_rule_group("nasa_standards", {
+        "nhv_per_person": nhv_per_person,
+        "floor_area_per_person": floor_area_per_person,
+        "min_nhv": min_nhv,
+        "min_floor_area": min_floor_area,
+        "mission_type": mission_type
+    })
 
 
 def validate_dimensions(
@@ -70,40 +71,14 @@ def validate_dimensions(
     Returns:
         Tupla (is_valid, issues)
     """
-    issues = []
-    
-    # Altura mínima do teto
-    MIN_CEILING = 2.1
-    if ceiling_height < MIN_CEILING:
-        issues.append(
-            f"CRITICAL: Ceiling height ({ceiling_height:.2f}m) below minimum ({MIN_CEILING}m)"
-        )
-    
-    # Largura mínima de corredor
-    if corridor_width is not None:
-        MIN_CORRIDOR = 0.8
-        if corridor_width < MIN_CORRIDOR:
-            issues.append(
-                f"Corridor width ({corridor_width:.2f}m) below minimum ({MIN_CORRIDOR}m)"
-            )
-    
-    # Dimensões de porta
-    if door_dimensions is not None:
-        door_width, door_height = door_dimensions
-        MIN_DOOR_WIDTH = 0.7
-        MIN_DOOR_HEIGHT = 1.9
-        
-        if door_width < MIN_DOOR_WIDTH:
-            issues.append(
-                f"Door width ({door_width:.2f}m) below minimum ({MIN_DOOR_WIDTH}m)"
-            )
-        if door_height < MIN_DOOR_HEIGHT:
-            issues.append(
-                f"Door height ({door_height:.2f}m) below minimum ({MIN_DOOR_HEIGHT}m)"
-            )
-    
-    is_valid = len(issues) == 0
-    return is_valid, issues
+    door_width, door_height = door_dimensions if door_dimensions is not None else (None, None)
+    
+    return _run_rule_group("dimensions", {
+        "ceiling_height": ceiling_height,
+        "corridor_width": corridor_width,
+        "door_width": door_width,
+        "door_height": door_height
+    })
 
 
 def validate_environmental_conditions(
@@ -128,43 +103,13 @@ def validate_environmental_conditions(
     Returns:
         Tupla (is_valid, issues)
     """
-    issues = []
-    warnings = []
-    
-    # Temperatura
-    if temperature is not None:
-        TEMP_MIN, TEMP_MAX = 18, 27
-        if not (TEMP_MIN <= temperature <= TEMP_MAX):
-            issues.append(
-                f"Temperature ({temperature}°C) outside acceptable range ({TEMP_MIN}-{TEMP_MAX}°C)"
-            )
-    
-    # Umidade
-    if humidity is not None:
-        HUM_MIN, HUM_MAX = 30, 70
-        if not (HUM_MIN <= humidity <= HUM_MAX):
-            issues.append(
-                f"Humidity ({humidity}%) outside acceptable range ({HUM_MIN}-{HUM_MAX}%)"
-            )
-    
-    # CO₂
-    if co2_level is not None:
-        MAX_CO2 = 5.3
-        if co2_level > MAX_CO2:
-            issues.append(
-                f"CRITICAL: CO₂ level ({co2_level} mmHg) exceeds maximum ({MAX_CO2} mmHg)"
-            )
-    
-    # Ruído
-    if noise_level is not None:
-        MAX_NOISE = 60 if zone_type == "sleep" else 70
-        if noise_level > MAX_NOISE:
-            issues.append(
-                f"Noise level ({noise_level} dB) exceeds maximum for {zone_type} area ({MAX_NOISE} dB)"
-            )
-    
-    is_valid = len(issues) == 0
-    return is_valid, issues
+    return _run_rule_group("environment", {
+        "temperature": temperature,
+        "humidity": humidity,
+        "co2_level": co2_level,
+        "noise_level": noise_level,
+        "zone_type": zone_type
+    })
 
 
 def validate_zone_incompatibilities(zones: List[str], incompatible_zones: List[Tuple[str, str]]) -> List[str]:
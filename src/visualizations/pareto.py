@@ -0,0 +1,85 @@
+"""
+Pareto-front visualization for habitat trade studies
+"""
+import plotly.graph_objects as go
+
+
+def create_pareto_front_plot(front: dict, current: dict = None) -> go.Figure:
+    """
+    Plots the non-dominated designs as mass vs NHV per person,
+    colored by habitability score.
+
+    Args:
+        front: Dictionary returned by pareto_sweep (dimensions + objectives)
+        current: Optional current design with mass_kg, nhv_per_person_m3 and habitability_score
+
+    Returns:
+        Plotly figure with the Pareto front
+    """
+    fig = go.Figure()
+
+    dim_names = [name for name in ("diameter", "length", "width", "height") if name in front]
+    custom = list(zip(*(front[name] for name in dim_names), front["habitability_score"]))
+    dims_hover = "<br>".join(
+        f"{name.capitalize()}: %{{customdata[{idx}]:.1f}} m" for idx, name in enumerate(dim_names)
+    )
+
+    fig.add_trace(go.Scatter(
+        x=front["mass_kg"],
+        y=front["nhv_per_person_m3"],
+        mode='markers',
+        marker=dict(
+            size=8,
+            color=front["habitability_score"],
+            colorscale=[[0, '#667eea'], [1, '#48bb78']],
+            showscale=True,
+            colorbar=dict(title=dict(text="Habitability", font=dict(color='#A0AEC0')),
+                          tickfont=dict(color='#A0AEC0')),
+            line=dict(color='#0B0F1A', width=1)
+        ),
+        customdata=custom,
+        name='Pareto Front',
+        hovertemplate="<b>Non-dominated design</b><br>" +
+                      "Mass: %{x:,.0f} kg<br>" +
+                      "NHV/person: %{y:.1f} m³<br>" +
+                      dims_hover + "<br>" +
+                      f"Habitability: %{{customdata[{len(dim_names)}]:.1f}}<extra></extra>"
+    ))
+
+    if current is not None:
+        fig.add_trace(go.Scatter(
+            x=[current["mass_kg"]],
+            y=[current["nhv_per_person_m3"]],
+            mode='markers',
+            marker=dict(size=16, symbol='star', color='#ed8936', line=dict(color='white', width=1)),
+            name='Current Design',
+            hovertemplate="<b>Current design</b><br>Mass: %{x:,.0f} kg<br>NHV/person: %{y:.1f} m³<extra></extra>"
+        ))
+
+    fig.update_layout(
+        xaxis=dict(title=dict(text="Structural Mass (kg)", font=dict(color='#A0AEC0')),
+                   gridcolor='rgba(160, 174, 192, 0.1)', tickfont=dict(color='#A0AEC0')),
+        yaxis=dict(title=dict(text="NHV per Person (m³)", font=dict(color='#A0AEC0')),
+                   gridcolor='rgba(160, 174, 192, 0.1)', tickfont=dict(color='#A0AEC0')),
+        plot_bgcolor='rgba(11, 15, 26, 0.95)',
+        paper_bgcolor='rgba(11, 15, 26, 0)',
+        height=500,
+        margin=dict(l=50, r=50, t=80, b=50),
+        title=dict(
+            text=f"<b>PARETO FRONT</b> · {len(front['mass_kg'])} Non-dominated Designs",
+            font=dict(size=18, color="#E2E8F0", family="Arial Black"),
+            x=0.5,
+            xanchor='center'
+        ),
+        legend=dict(
+            bgcolor='rgba(11, 15, 26, 0.9)',
+            bordercolor='#A68CFF',
+            borderwidth=2,
+            font=dict(color='#E2E8F0', size=11),
+            x=0.01,
+            y=0.99
+        ),
+        hovermode='closest'
+    )
+
+    return fig